@@ -0,0 +1,62 @@
+"""
+Benchmark for WeatherScript icon lookups.
+
+Compares the per-call filesystem lookup get_icon_path used to do (regex match, resource
+path resolution and two os.path.exists calls) with the in-memory IconIndex lookup.
+
+Usage:
+    python benchmarks/bench_icon_lookup.py [--iterations N]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from scripts.weather_icons import IconIndex  # noqa: E402
+from scripts.weather_script import get_resource_path  # noqa: E402
+
+ICON_CODES = ["01d", "01n", "02d", "02n", "03d", "03n", "04d", "04n", "10n", "50d", "50n"]
+
+
+def legacy_lookup(icon_code):
+    """The lookup path get_icon_path took on every call before the index existed."""
+    if not re.match(r'^[0-9]{2}[dn]$', icon_code):
+        return None
+    weather_dir = get_resource_path(os.path.join("assets", "weather"))
+    if not os.path.exists(weather_dir):
+        os.makedirs(weather_dir)
+    icon_path = os.path.join(weather_dir, f"weather_icon_{icon_code}.png")
+    if os.path.exists(icon_path):
+        return icon_path
+    return None
+
+
+def measure(label, lookup, iterations):
+    def run():
+        for icon_code in ICON_CODES:
+            lookup(icon_code)
+
+    seconds = min(timeit.repeat(run, number=iterations, repeat=5))
+    per_lookup_ns = seconds / (iterations * len(ICON_CODES)) * 1e9
+    print(f"{label:<10} {per_lookup_ns:>10.1f} ns/lookup")
+    return per_lookup_ns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    index = IconIndex(get_resource_path(os.path.join("assets", "weather")))
+    print(f"Indexed icons: {len(index)}")
+
+    before = measure("before", legacy_lookup, args.iterations)
+    after = measure("after", index.lookup, args.iterations)
+    print(f"speedup    {before / after:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
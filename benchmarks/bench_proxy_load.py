@@ -0,0 +1,237 @@
+"""
+Load and latency benchmark for the weather and recipe proxy Lambda handlers.
+
+Drives each lambda_handler in-process at a given concurrency against the fake upstreams
+in lambda/fake_upstreams.py, with injectable upstream latency and error rate. Requests
+pick locations and ingredient sets from a skewed (Zipf) popularity distribution, so the
+warm-container caches see a realistic mix of repeats.
+
+For every route it reports throughput, p50/p95/p99 latency, the status mix, the response
+cache hit ratio and upstream calls. Memory is measured in a separate sequential pass under
+tracemalloc: the peak traced memory of one request and the blocks a request leaves
+allocated. Results are written as JSON tagged with the git commit, and --compare prints
+the change against an earlier results file.
+
+Usage:
+    python benchmarks/bench_proxy_load.py [--requests N] [--concurrency N] [--latency-ms MS]
+        [--jitter-ms MS] [--error-rate R] [--keys N] [--skew S] [--route weather|recipe]
+        [--consolidated] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "lambda"))
+
+from fake_upstreams import FakePool  # noqa: E402
+from local_gateway import Functions, build_event  # noqa: E402
+
+CITIES = [
+    "London,GB", "Paris,FR", "New York,US", "Tokyo,JP", "Berlin,DE", "Madrid,ES", "Rome,IT",
+    "Oslo,NO", "Sydney,AU", "Toronto,CA", "Dublin,IE", "Lisbon,PT", "Vienna,AT", "Cairo,EG",
+]
+INGREDIENTS = [
+    "chicken", "tomato", "onion", "garlic", "rice", "beans", "potato", "leek", "carrot",
+    "cheese", "egg", "spinach", "pepper", "lemon", "basil", "mushroom",
+]
+ROUTES = {"weather": "GET /weather", "recipe": "GET /recipe"}
+
+
+def make_targets(route, keys, rng):
+    """Returns keys distinct request targets for route, most popular first."""
+    if route == "weather":
+        names = CITIES + [f"City {n}" for n in range(max(0, keys - len(CITIES)))]
+        return [f"/weather?location={name.replace(' ', '%20')}&fields=compact" for name in names[:keys]]
+    targets = []
+    for _ in range(keys):
+        ingredients = ",".join(rng.sample(INGREDIENTS, rng.randint(1, 3)))
+        targets.append(f"/recipe?ingredients={ingredients}&number={rng.choice([5, 10])}")
+    return targets
+
+
+def zipf_sampler(targets, skew, rng):
+    """Returns a function drawing targets with probability proportional to 1 / rank ** skew."""
+    weights = [1 / (rank ** skew) for rank in range(1, len(targets) + 1)]
+    return lambda: rng.choices(targets, weights)[0]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_route(route, args):
+    """Runs the load and memory passes for one route and returns its results."""
+    rng = random.Random(args.seed)
+    latency = args.latency_ms / 1000
+    jitter = args.jitter_ms / 1000
+    pool = FakePool(
+        latency=(lambda: max(0.0, rng.gauss(latency, jitter))) if jitter else latency,
+        error_rate=args.error_rate,
+        rng=random.Random(args.seed),
+    )
+    functions = Functions({ROUTES[route]: route}, pool, consolidated=args.consolidated, timeout=args.timeout)
+    handler_module = functions.modules[route]
+
+    targets = make_targets(route, args.keys, rng)
+    sample = zipf_sampler(targets, args.skew, rng)
+    events = [
+        build_event("GET", sample(), {"accept-encoding": "gzip, br"}, ROUTES[route])
+        for _ in range(args.requests)
+    ]
+
+    def invoke(event):
+        start = time.perf_counter()
+        response = functions.invoke(route, event)
+        return time.perf_counter() - start, response.get("statusCode", 200)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        outcomes = list(executor.map(invoke, events))
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = sorted(seconds * 1000 for seconds, _ in outcomes)
+    cache_stats = dict(handler_module.response_cache.stats)
+    lookups = cache_stats.get("hits", 0) + cache_stats.get("misses", 0)
+
+    result = {
+        "requests": len(outcomes),
+        "throughput_rps": round(len(outcomes) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies_ms), 3),
+            "p50": round(percentile(latencies_ms, 0.50), 3),
+            "p95": round(percentile(latencies_ms, 0.95), 3),
+            "p99": round(percentile(latencies_ms, 0.99), 3),
+            "max": round(latencies_ms[-1], 3),
+        },
+        "statuses": {str(status): count for status, count in sorted(Counter(s for _, s in outcomes).items())},
+        "cache_hit_ratio": round(cache_stats.get("hits", 0) / lookups, 4) if lookups else 0.0,
+        "cache": cache_stats,
+        "upstream": dict(pool.stats),
+    }
+    result["memory"] = measure_memory(functions, route, events[:args.memory_requests])
+    return result
+
+
+def measure_memory(functions, route, events):
+    """Peak traced memory of one request, and blocks left allocated per request, sequentially."""
+    if not events:
+        return {}
+    tracemalloc.start()
+    peaks = []
+    before = tracemalloc.take_snapshot()
+    for event in events:
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        functions.invoke(route, event)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return {
+        "requests": len(events),
+        "peak_kib_per_request": round(statistics.fmean(peaks) / 1024, 2),
+        "retained_blocks_per_request": round(retained / len(events), 2),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    for route, result in results["routes"].items():
+        latency = result["latency_ms"]
+        print(
+            f"{route:<8} {result['throughput_rps']:>9.1f} req/s  "
+            f"p50 {latency['p50']:>8.3f} ms  p95 {latency['p95']:>8.3f} ms  p99 {latency['p99']:>8.3f} ms  "
+            f"hit ratio {result['cache_hit_ratio']:.2%}  statuses {result['statuses']}"
+        )
+        memory = result["memory"]
+        if memory:
+            print(
+                f"{'':<8} {memory['peak_kib_per_request']:>9.2f} KiB peak/request  "
+                f"{memory['retained_blocks_per_request']:>7.2f} blocks retained/request  "
+                f"upstream {result['upstream']}"
+            )
+        previous = (baseline or {}).get("routes", {}).get(route)
+        if previous:
+            print(
+                f"{'':<8} vs {baseline.get('commit')}: throughput "
+                f"{change(previous['throughput_rps'], result['throughput_rps'])}, "
+                f"p50 {change(previous['latency_ms']['p50'], latency['p50'])}, "
+                f"p99 {change(previous['latency_ms']['p99'], latency['p99'])}"
+            )
+
+
+def change(before, after):
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before:+.1%}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--route", choices=sorted(ROUTES), action="append", help="Route to drive; default both")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mean fake upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="Standard deviation of the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--keys", type=int, default=200, help="Distinct locations or ingredient sets")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of key popularity")
+    parser.add_argument("--timeout", type=float, default=3.0, help="Function timeout in seconds")
+    parser.add_argument("--memory-requests", type=int, default=200)
+    parser.add_argument("--consolidated", action="store_true", help="Serve routes through lambda/proxy")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--log", action="store_true", help="Keep the handlers' debug logging")
+    args = parser.parse_args()
+
+    os.environ.setdefault("WEATHER_API_KEY", "bench")
+    os.environ.setdefault("SPOONACULAR_API_KEY", "bench")
+    if not args.log:
+        # Log records are still built, as in Lambda; only writing them out is skipped
+        logging.getLogger().handlers = [logging.NullHandler()]
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": int(time.time()),
+        "python": platform.python_version(),
+        "config": {name: value for name, value in vars(args).items() if name not in ("output", "compare", "log")},
+        "routes": {route: run_route(route, args) for route in (args.route or sorted(ROUTES))},
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
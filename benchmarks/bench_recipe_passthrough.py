@@ -0,0 +1,99 @@
+"""
+Benchmark for the recipe Lambda response path.
+
+Compares the json.loads/json.dumps round trip the handler used to do on every response
+with passing the upstream body through and with slicing the first few recipes out of it,
+on a synthetic 20-recipe findByIngredients response.
+
+Usage:
+    python benchmarks/bench_recipe_passthrough.py [--iterations N] [--recipes N]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lambda", "recipe"))
+
+from json_slice import first_items, looks_like_json_array  # noqa: E402
+
+
+def make_ingredient(n):
+    return {
+        "id": 11000 + n,
+        "amount": 1.5,
+        "unit": "cups",
+        "unitLong": "cups",
+        "unitShort": "cup",
+        "aisle": "Produce",
+        "name": f"ingredient {n}",
+        "original": f"1 1/2 cups chopped ingredient {n}",
+        "originalName": f"chopped ingredient {n}",
+        "meta": ["chopped"],
+        "image": f"https://img.spoonacular.com/ingredients_100x100/ingredient-{n}.jpg",
+    }
+
+
+def make_response(recipes):
+    """A findByIngredients response shaped like Spoonacular's."""
+    return json.dumps([
+        {
+            "id": 600000 + n,
+            "title": f"Recipe number {n} with chicken and tomato",
+            "image": f"https://img.spoonacular.com/recipes/{600000 + n}-312x231.jpg",
+            "imageType": "jpg",
+            "usedIngredientCount": 2,
+            "missedIngredientCount": 3,
+            "missedIngredients": [make_ingredient(i) for i in range(3)],
+            "usedIngredients": [make_ingredient(i) for i in range(3, 5)],
+            "unusedIngredients": [],
+            "likes": n * 7,
+        }
+        for n in range(recipes)
+    ])
+
+
+def round_trip(body):
+    return json.dumps(json.loads(body))
+
+
+def pass_through(body):
+    if not looks_like_json_array(body):
+        raise ValueError("not an array")
+    return body
+
+
+def slice_five(body):
+    return first_items(body, 5)[0]
+
+
+def measure(label, handle, body, iterations):
+    seconds = min(timeit.repeat(lambda: handle(body), number=iterations, repeat=5))
+    tracemalloc.start()
+    handle(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_call_us = seconds / iterations * 1e6
+    print(f"{label:<14} {per_call_us:>10.1f} us/response {peak / 1024:>10.1f} KiB peak")
+    return per_call_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--recipes", type=int, default=20)
+    args = parser.parse_args()
+
+    body = make_response(args.recipes)
+    print(f"Response size: {len(body)} bytes, {args.recipes} recipes")
+
+    before = measure("round trip", round_trip, body, args.iterations)
+    after = measure("pass-through", pass_through, body, args.iterations)
+    sliced = measure("slice 5", slice_five, body, args.iterations)
+    print(f"speedup        {before / after:>10.1f}x pass-through, {before / sliced:.1f}x slice 5")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from scripts.city_index import CityIndex  # noqa: E402
+
+DEFAULT_OUTPUT = os.path.join("src", "assets", "cities.tsv")
+
+# Column positions in a GeoNames "cities" dump, see https://download.geonames.org/export/dump/
+GEONAMES_ID = 0
+GEONAMES_NAME = 1
+GEONAMES_COUNTRY = 8
+GEONAMES_POPULATION = 14
+
+
+def read_geonames(path, min_population):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) <= GEONAMES_POPULATION:
+                continue
+            population = int(fields[GEONAMES_POPULATION] or 0)
+            if population < min_population:
+                continue
+            yield CityIndex.make_city(
+                fields[GEONAMES_NAME],
+                fields[GEONAMES_COUNTRY],
+                population,
+                fields[GEONAMES_ID],
+            )
+
+
+def main():
+    """Builds the offline city index used for weather location autocomplete from a GeoNames dump."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("geonames_file", help="e.g. cities15000.txt from download.geonames.org")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--min-population", type=int, default=15000)
+    args = parser.parse_args()
+
+    index = CityIndex(read_geonames(args.geonames_file, args.min_population))
+    index.save(args.output)
+    print(f"Wrote {len(index)} cities to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
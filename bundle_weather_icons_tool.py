@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from scripts.weather_icons import ALL_ICON_CODES  # noqa: E402
+from scripts.weather_script import default_icon_index, prefetch_icons  # noqa: E402
+
+
+def main():
+    """Downloads every OpenWeather icon into src/assets/weather so releases ship the full set."""
+    icon_index = default_icon_index()
+    downloads = prefetch_icons(icon_index)
+    for future in downloads.values():
+        future.result()
+
+    missing = sorted(set(ALL_ICON_CODES) - icon_index.codes())
+    if missing:
+        print(f"Failed to bundle weather icons: {', '.join(missing)}")
+        sys.exit(1)
+    print(f"All {len(ALL_ICON_CODES)} weather icons bundled in {icon_index.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Modules in lambda/common are packaged into every function, beside its handler.py.
+import base64
+import gzip
+import logging
+
+from env import env_int
+
+try:
+    import brotli
+except ImportError:  # Not in the Lambda runtime; used when bundled into the package
+    brotli = None
+
+DEFAULT_MIN_BYTES = 1024  # Bodies smaller than this are sent as-is
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def supported_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding):
+    """Picks the best supported encoding the client accepts, or None. Brotli wins ties."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in supported_encodings():
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress_response(response, event):
+    """Compresses response's body when the request accepts it and the body is big enough.
+
+    A compressed body is base64-encoded with isBase64Encoded set, as API Gateway expects.
+    """
+    body = response.get("body")
+    if not body or response.get("isBase64Encoded"):
+        return response
+
+    data = body.encode("utf-8")
+    if len(data) < _min_bytes():
+        return response
+
+    headers = {**response.get("headers", {}), "Vary": "Accept-Encoding"}
+    response["headers"] = headers
+    request_headers = event.get("headers") or {}
+    accept_encoding = next(
+        (value for name, value in request_headers.items() if name.lower() == "accept-encoding"), ""
+    )
+    encoding = negotiate(accept_encoding)
+    if encoding is None:
+        return response
+
+    if encoding == "br":
+        compressed = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if len(compressed) >= len(data):
+        return response
+
+    logging.debug(f"Compressed response with {encoding}: {len(data)} -> {len(compressed)} bytes")
+    response["body"] = base64.b64encode(compressed).decode("ascii")
+    response["isBase64Encoded"] = True
+    headers["Content-Encoding"] = encoding
+    return response
+
+
+def _min_bytes():
+    return env_int("COMPRESSION_MIN_BYTES", DEFAULT_MIN_BYTES)
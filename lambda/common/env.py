@@ -0,0 +1,12 @@
+# Modules in lambda/common are packaged into every function, beside its handler.py.
+import logging
+import os
+
+
+def env_int(name, default):
+    """Integer setting from the environment, or default when it is unset or not an integer."""
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        logging.warning(f"Ignoring non-integer {name}, using {default}")
+        return default
@@ -0,0 +1,79 @@
+# Modules in lambda/common are packaged into every function, beside its handler.py.
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from env import env_int
+
+
+class ResponseCache:
+    """Bounded LRU of upstream responses that lives as long as the warm container.
+
+    Negative results (unknown locations, empty searches) are kept for a shorter TTL so
+    repeated bad queries do not go upstream either. Safe to share between threads.
+    """
+
+    def __init__(self, max_entries=256, ttl=300, negative_ttl=60, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+        self.stats = Counter()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, max_entries=256, ttl=300, negative_ttl=60):
+        """Reads RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL and RESPONSE_CACHE_NEGATIVE_TTL, falling back to the given defaults."""
+        return cls(
+            max_entries=env_int("RESPONSE_CACHE_SIZE", max_entries),
+            ttl=env_int("RESPONSE_CACHE_TTL", ttl),
+            negative_ttl=env_int("RESPONSE_CACHE_NEGATIVE_TTL", negative_ttl),
+        )
+
+    def get(self, key):
+        """Returns the cached value for key, or None when it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                hit = True
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                    self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                hit = False
+        logging.debug(f"Response cache {'hit' if hit else 'miss'} for {key}: {self.summary()}")
+        return entry[1] if hit else None
+
+    def set(self, key, value, negative=False):
+        if self.max_entries <= 0:
+            return
+        ttl = self.negative_ttl if negative else self.ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.stats.clear()
+
+    def summary(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = self.stats["hits"] / lookups if lookups else 0.0
+        return (
+            f"hits={self.stats['hits']} misses={self.stats['misses']} "
+            f"size={len(self._entries)} hit_rate={hit_rate:.2f}"
+        )
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,73 @@
+# Modules in lambda/common are packaged into every function, beside its handler.py.
+import urllib3
+from urllib3.exceptions import MaxRetryError, TimeoutError as Urllib3TimeoutError
+
+from env import env_int
+
+DEFAULT_BUDGET_MS = 5000  # Upper bound on time spent upstream, whatever the Lambda timeout
+RESPONSE_RESERVE_MS = 250  # Kept back from the invocation deadline to build and return a 504
+MAX_CONNECT_TIMEOUT = 2.0
+CONNECT_RETRIES = 2
+
+_shared_pool = None
+
+
+class UpstreamTimeout(Exception):
+    """The upstream did not answer within the invocation's remaining time."""
+
+
+def build_pool():
+    """PoolManager for the function's upstream. Pool size comes from UPSTREAM_POOL_SIZE.
+
+    Only connection failures of idempotent GETs are retried. A read is never repeated: a
+    second read would run past the deadline the first one was sized for.
+    """
+    retries = urllib3.Retry(
+        total=CONNECT_RETRIES,
+        connect=CONNECT_RETRIES,
+        read=0,
+        status=0,
+        other=0,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        backoff_factor=0.1,
+    )
+    return urllib3.PoolManager(maxsize=env_int("UPSTREAM_POOL_SIZE", 10), retries=retries)
+
+
+def shared_pool():
+    """Returns one PoolManager per container, shared by every handler loaded into it."""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = build_pool()
+    return _shared_pool
+
+
+def budget_ms(context):
+    """Milliseconds the upstream call may take: the configured budget, capped by the deadline."""
+    budget = env_int("UPSTREAM_BUDGET_MS", DEFAULT_BUDGET_MS)
+    if context is not None:
+        budget = min(budget, context.get_remaining_time_in_millis() - RESPONSE_RESERVE_MS)
+    return budget
+
+
+def timeout_for(budget):
+    """Splits a budget in milliseconds so every connect attempt plus one read fit inside it."""
+    total = budget / 1000
+    connect = min(MAX_CONNECT_TIMEOUT, total / (CONNECT_RETRIES + 1) / 2)
+    read = total - connect * (CONNECT_RETRIES + 1)
+    return urllib3.Timeout(connect=connect, read=read)
+
+
+def get(http, url, context):
+    """GETs url within the invocation's deadline, raising UpstreamTimeout when it cannot."""
+    budget = budget_ms(context)
+    if budget <= 0:
+        raise UpstreamTimeout("No time left for the upstream request")
+    try:
+        return http.request("GET", url, timeout=timeout_for(budget))
+    except Urllib3TimeoutError as e:
+        raise UpstreamTimeout(str(e)) from e
+    except MaxRetryError as e:
+        if isinstance(e.reason, Urllib3TimeoutError):
+            raise UpstreamTimeout(str(e.reason)) from e
+        raise
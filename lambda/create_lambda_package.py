@@ -1,6 +1,15 @@
-import zipfile
-import os
+import argparse
+import fnmatch
+import hashlib
 import logging
+import os
+import py_compile
+import re
+import subprocess
+import sys
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -8,43 +17,340 @@ logging.basicConfig(
 logging.getLogger("urllib3").setLevel(logging.WARNING)
 logging.getLogger("requests").setLevel(logging.WARNING)
 
-def create_lambda_package(lambda_dir, output_name):
-    """Creates a deployment package for AWS Lambda functions."""
-    zip_path = os.path.join(lambda_dir, output_name)
+# The consolidated function, which serves every other function's route from one artifact
+PROXY_DIR = 'proxy'
+# Modules shared by every function, added to the root of each package
+COMMON_DIR = 'common'
+OUTPUT_NAME = 'deployment_package.zip'
+IMPORT_REPORT_SUFFIX = '.importtime.txt'
+# Hash of the inputs a package was built from, kept beside it to skip unchanged rebuilds
+INPUT_HASH_SUFFIX = '.inputs.sha256'
+
+# Fixed zip metadata, so the same inputs always give the same bytes and source_code_hash
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ZIP_FILE_MODE = 0o100644
+ZIP_COMPRESS_LEVEL = 9
+
+# The runtime in terraform/main.tf. Bytecode is only used by an interpreter with the same cache tag.
+RUNTIME_CACHE_TAG = 'cpython-310'
+# Optimization level of the precompiled bytecode. Levels 1 and 2 (python -O, -OO) are only
+# loaded by an interpreter running at that level, so they need PYTHONOPTIMIZE set to the same
+# level in the function's environment; otherwise the runtime compiles the sources at start.
+DEFAULT_BYTECODE_OPTIMIZATION = 0
+
+# Files and directories of vendored dependencies that are never imported at run time
+STRIPPED_DIRS = {'tests', 'test', 'docs', 'doc', 'examples', 'benchmarks'}
+STRIPPED_FILES = ['*.md', '*.rst', '*.pyi', '*.c', '*.h', '*.pyx', '*.pxd', 'py.typed', 'LICENSE*', 'NOTICE*']
+# Only the metadata importlib.metadata reads is kept from *.dist-info directories
+KEPT_DIST_INFO = {'METADATA', 'entry_points.txt', 'top_level.txt'}
 
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(lambda_dir):
-            # Skip __pycache__ directories and the output zip file itself
-            if '__pycache__' in root or output_name in root:
+IMPORT_TIME_PATTERN = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def function_dirs(script_dir):
+    """Returns the names of the function directories under script_dir, those with a handler.py."""
+    return sorted(
+        item for item in os.listdir(script_dir)
+        if os.path.isfile(os.path.join(script_dir, item, 'handler.py'))
+        and not item.startswith('.') and not item.startswith('__')
+    )
+
+
+def collect_files(source_dir, prefix=''):
+    """Returns (file path, archive name) for source_dir's files, skipping caches and build output."""
+    entries = []
+    for root, dirs, files in os.walk(source_dir):
+        # Skip __pycache__ directories
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for file in sorted(files):
+            # Skip this packaging script
+            if file == 'create_lambda_package.py':
                 continue
-            # Skip other lambda function directories
-            if any(other_dir in root for other_dir in ['weather', 'recipe'] if other_dir not in lambda_dir):
+            if file.endswith(('.zip', IMPORT_REPORT_SUFFIX, INPUT_HASH_SUFFIX)):
                 continue
-            for file in files:
-                # Skip this packaging script
-                if file == 'create_lambda_package.py':
-                    continue
-                if file.endswith('.zip'):
-                    continue
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, lambda_dir)
-                zipf.write(file_path, arcname)
-
-    logging.debug(f"Created deployment package at {zip_path}")
+            file_path = os.path.join(root, file)
+            arcname = os.path.join(prefix, os.path.relpath(file_path, source_dir))
+            entries.append((file_path, arcname))
+    return entries
+
+
+def with_common(entries, common_dir):
+    """Adds the shared modules in common_dir to the root of a package's entries.
+
+    A function file with the same name as a shared module would shadow it, so that is an error.
+    """
+    if not common_dir or not os.path.isdir(common_dir):
+        return entries
+    own = {arcname for _, arcname in entries}
+    shared = collect_files(common_dir)
+    clashes = sorted(arcname for _, arcname in shared if arcname in own)
+    if clashes:
+        raise ValueError(f"{', '.join(clashes)} in {common_dir} clash with a function's own files")
+    return entries + shared
+
+
+def is_stripped(arcname, own_dirs=()):
+    """Whether a cold-start package leaves arcname out: tests, docs and dist-info bloat.
+
+    Files at the top level or directly in own_dirs (the routes of the consolidated
+    package) are the functions' own code and always kept.
+    """
+    directories, file = os.path.split(arcname.replace(os.sep, '/'))
+    directories = directories.split('/') if directories else []
+    if not directories or (len(directories) == 1 and directories[0] in own_dirs):
+        return False
+    if any(part in STRIPPED_DIRS for part in directories):
+        return True
+    if directories[-1].endswith('.dist-info'):
+        return file not in KEPT_DIST_INFO
+    return any(fnmatch.fnmatch(file, pattern) for pattern in STRIPPED_FILES)
+
+
+def bytecode_arcname(arcname, optimize=DEFAULT_BYTECODE_OPTIMIZATION):
+    """Where the runtime looks for arcname's cached bytecode at optimization level optimize."""
+    directory, file = os.path.split(arcname)
+    level = f".opt-{optimize}" if optimize else ''
+    return os.path.join(directory, '__pycache__', f"{file[:-3]}.{sys.implementation.cache_tag}{level}.pyc")
+
+
+def measure_imports(source_dir, statement='import handler', search_path=()):
+    """Runs statement under python -X importtime in source_dir, with search_path on PYTHONPATH.
+
+    Returns [(module, self us, cumulative us, depth)] in the order the imports finished.
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1', PYTHONPATH=os.pathsep.join(search_path))
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=source_dir, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing the handler in {source_dir} failed: {completed.stderr.strip()[-500:]}")
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return imports
+
+
+def write_import_report(report_path, imports, top=40):
+    """Writes the slowest imports by cumulative time, after the total of the top-level ones.
+
+    The total includes the imports of interpreter startup (site, encodings...), which the
+    Lambda runtime pays too.
+    """
+    total = sum(cumulative for _, _, cumulative, depth in imports if depth == 0)
+    lines = [f"Total import time: {total / 1000:.1f} ms", "", f"{'cumulative ms':>14} {'self ms':>9}  module"]
+    for module, self_us, cumulative_us, depth in sorted(imports, key=lambda item: -item[2])[:top]:
+        lines.append(f"{cumulative_us / 1000:>14.2f} {self_us / 1000:>9.2f}  {'  ' * depth}{module}")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    logging.debug(f"Handler import time {total / 1000:.1f} ms, report at {report_path}")
+
+
+def import_order(entries, imports):
+    """Orders entries so the files imported at startup come first, in import order."""
+    rank = {}
+    for position, (module, _, _, _) in enumerate(imports):
+        path = module.replace('.', '/')
+        for candidate in (f"{path}.py", f"{path}/__init__.py"):
+            rank.setdefault(candidate, position)
+
+    def key(entry):
+        arcname = entry[1].replace(os.sep, '/')
+        # Route directories of the consolidated package are imported by bare module name
+        unprefixed = arcname.split('/', 1)[1] if '/' in arcname else arcname
+        return (min(rank.get(arcname, len(rank)), rank.get(unprefixed, len(rank))), arcname)
+
+    return sorted(entries, key=key)
+
+
+def write_entry(zipf, arcname, data):
+    """Adds data to zipf with fixed metadata, independent of the file's timestamp and mode."""
+    info = zipfile.ZipInfo(arcname.replace(os.sep, '/'), date_time=ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = ZIP_FILE_MODE << 16
+    zipf.writestr(info, data, compresslevel=ZIP_COMPRESS_LEVEL)
+
+
+def compile_bytecode(file_path, arcname, build_dir, optimize=DEFAULT_BYTECODE_OPTIMIZATION):
+    """Returns file_path compiled at optimization level optimize as unchecked-hash bytecode."""
+    # Lambda's /var/task is read-only, so without this every cold start recompiles.
+    # Unchecked-hash bytecode has no timestamp, so it is reproducible and never goes stale.
+    compiled = os.path.join(build_dir, 'module.pyc')
+    py_compile.compile(
+        file_path, cfile=compiled, dfile=arcname, doraise=True,
+        optimize=optimize,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+    with open(compiled, 'rb') as f:
+        return f.read()
+
+
+def write_package(zip_path, entries, cold_start=False, imports=None, own_dirs=(),
+                  optimize=DEFAULT_BYTECODE_OPTIMIZATION):
+    """Writes entries to zip_path; cold_start strips bloat and adds bytecode at level optimize.
+
+    The zip is written beside zip_path and moved into place, so an interrupted build never
+    leaves a partial package behind.
+    """
+    if cold_start:
+        entries = [entry for entry in entries if not is_stripped(entry[1], own_dirs)]
+        if imports:
+            entries = import_order(entries, imports)
+        if sys.implementation.cache_tag != RUNTIME_CACHE_TAG:
+            logging.warning(
+                f"Packaging with {sys.implementation.cache_tag} bytecode, which a {RUNTIME_CACHE_TAG} "
+                f"runtime ignores; run the packager with the runtime's Python version"
+            )
+
+    partial_path = zip_path[:-len('.zip')] + '.partial.zip'
+    with zipfile.ZipFile(partial_path, 'w') as zipf, tempfile.TemporaryDirectory() as build_dir:
+        for file_path, arcname in entries:
+            with open(file_path, 'rb') as f:
+                write_entry(zipf, arcname, f.read())
+            if cold_start and arcname.endswith('.py'):
+                bytecode = compile_bytecode(file_path, arcname, build_dir, optimize)
+                write_entry(zipf, bytecode_arcname(arcname, optimize), bytecode)
+    os.replace(partial_path, zip_path)
+
+
+def input_hash(entries, cold_start=False, optimize=DEFAULT_BYTECODE_OPTIMIZATION):
+    """SHA-256 over everything that decides a package's bytes.
+
+    That is the archive names and contents, the mode, the bytecode's interpreter and
+    optimization level and this script itself, so a packaging change rebuilds everything.
+    """
+    digest = hashlib.sha256()
+    with open(os.path.abspath(__file__), 'rb') as f:
+        digest.update(f.read())
+    bytecode = f"{sys.implementation.cache_tag};optimize={optimize}" if cold_start else ''
+    digest.update(f"cold_start={cold_start};{bytecode}".encode())
+    for file_path, arcname in sorted(entries, key=lambda entry: entry[1]):
+        digest.update(arcname.replace(os.sep, '/').encode('utf-8') + b'\0')
+        with open(file_path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def is_up_to_date(zip_path, digest):
+    """Whether zip_path exists and was built from inputs hashing to digest."""
+    hash_path = zip_path[:-len('.zip')] + INPUT_HASH_SUFFIX
+    if not os.path.exists(zip_path) or not os.path.exists(hash_path):
+        return False
+    with open(hash_path, encoding='utf-8') as f:
+        return f.read().strip() == digest
+
+
+def build_package(zip_path, entries, cold_start=False, force=False, import_statement=None, own_dirs=(),
+                  search_path=(), optimize=DEFAULT_BYTECODE_OPTIMIZATION):
+    """Builds zip_path from entries unless it is already built from the same inputs.
+
+    search_path holds the directories of packaged files from outside the package's own
+    directory, for measuring the handler's imports. Returns whether the package was (re)built.
+    """
+    digest = input_hash(entries, cold_start, optimize)
+    if not force and is_up_to_date(zip_path, digest):
+        logging.debug(f"Deployment package at {zip_path} is up to date, skipping")
+        return False
+
+    hash_path = zip_path[:-len('.zip')] + INPUT_HASH_SUFFIX
+    if os.path.exists(hash_path):
+        os.remove(hash_path)
+    imports = None
+    if cold_start:
+        source_dir = os.path.dirname(zip_path)
+        imports = measure_imports(source_dir, import_statement or 'import handler', search_path)
+        write_import_report(zip_path[:-len('.zip')] + IMPORT_REPORT_SUFFIX, imports)
+    write_package(zip_path, entries, cold_start, imports, own_dirs, optimize)
+    with open(hash_path, 'w', encoding='utf-8') as f:
+        f.write(digest + '\n')
+    return True
+
+
+def create_lambda_package(lambda_dir, output_name, cold_start=False, force=False, common_dir=None,
+                          optimize=DEFAULT_BYTECODE_OPTIMIZATION):
+    """Creates a deployment package for AWS Lambda functions.
+
+    The shared modules in common_dir, by default the common directory beside lambda_dir,
+    are packaged next to the handler. With cold_start the package is built for fast cold
+    starts, with bytecode at level optimize, and the handler's import times are written
+    next to it. Returns whether the package was (re)built.
+    """
+    zip_path = os.path.join(lambda_dir, output_name)
+    common_dir = common_dir or os.path.join(os.path.dirname(lambda_dir), COMMON_DIR)
+    entries = with_common(collect_files(lambda_dir), common_dir)
+    built = build_package(zip_path, entries, cold_start, force, search_path=[common_dir], optimize=optimize)
+    if built:
+        logging.debug(f"Created deployment package at {zip_path}")
+    return built
+
+
+def create_proxy_package(proxy_dir, route_dirs, output_name, cold_start=False, force=False, common_dir=None,
+                         optimize=DEFAULT_BYTECODE_OPTIMIZATION):
+    """Creates one deployment package for the consolidated proxy and every route it serves.
+
+    The proxy's files and the shared modules go at the root of the zip and each route
+    directory beside them, the layout lambda/proxy/handler.py looks for. Returns whether
+    the package was (re)built.
+    """
+    zip_path = os.path.join(proxy_dir, output_name)
+    common_dir = common_dir or os.path.join(os.path.dirname(proxy_dir), COMMON_DIR)
+    entries = with_common(collect_files(proxy_dir), common_dir)
+    route_names = [os.path.basename(route_dir) for route_dir in route_dirs]
+    for route_dir, name in zip(route_dirs, route_names):
+        entries.extend(collect_files(route_dir, name))
+    # Every route is loaded, as a container serving all of them would end up doing
+    statement = 'import handler\nfor name in sorted(set(handler.ROUTES.values())): handler.load_route(name)'
+    built = build_package(zip_path, entries, cold_start, force, statement, route_names, [common_dir], optimize)
+    if built:
+        logging.debug(f"Created consolidated proxy package at {zip_path}")
+    return built
+
+
+def package_function(script_dir, name, cold_start=False, force=False, optimize=DEFAULT_BYTECODE_OPTIMIZATION):
+    """Packages the function directory name under script_dir; returns (name, whether built)."""
+    item_path = os.path.join(script_dir, name)
+    logging.debug(f"Creating lambda package for directory: {item_path}")
+    if name == PROXY_DIR:
+        routes = [os.path.join(script_dir, other) for other in function_dirs(script_dir) if other != PROXY_DIR]
+        return name, create_proxy_package(item_path, routes, OUTPUT_NAME, cold_start, force, optimize=optimize)
+    return name, create_lambda_package(item_path, OUTPUT_NAME, cold_start, force, optimize=optimize)
+
+
+def package_all(script_dir, cold_start=False, force=False, jobs=None, optimize=DEFAULT_BYTECODE_OPTIMIZATION):
+    """Packages every function under script_dir, one process each; returns {name: whether built}."""
+    functions = function_dirs(script_dir)
+    with ProcessPoolExecutor(max_workers=jobs or min(len(functions), os.cpu_count() or 1) or 1) as executor:
+        futures = [
+            executor.submit(package_function, script_dir, name, cold_start, force, optimize)
+            for name in functions
+        ]
+        return dict(future.result() for future in futures)
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the deployment package of every Lambda function.")
+    parser.add_argument(
+        '--cold-start', action='store_true',
+        help="Precompile bytecode, strip vendored tests, docs and dist-info, order the zip "
+             "by import and report the handler's import times",
+    )
+    parser.add_argument(
+        '--optimize', type=int, choices=[0, 1, 2], default=DEFAULT_BYTECODE_OPTIMIZATION,
+        help="Optimization level of the --cold-start bytecode. Levels 1 and 2 are written as "
+             ".opt-N.pyc and only used when the function sets PYTHONOPTIMIZE to the same level",
+    )
+    parser.add_argument('--force', action='store_true', help="Rebuild packages whose inputs are unchanged")
+    parser.add_argument('--jobs', type=int, help="Packages built in parallel; defaults to one per function")
+    args = parser.parse_args()
+
     try:
         script_dir = os.path.dirname(os.path.abspath(__file__))
-        for item in os.listdir(script_dir):
-            item_path = os.path.join(script_dir, item)
-
-            if os.path.isdir(item_path) and not item.startswith('.') and not item.startswith('__'):
-                logging.debug(f"Creating lambda package for directory: {item_path}/{item}")
-                create_lambda_package(item_path, 'deployment_package.zip')
-
-        logging.debug("All lambda packages created successfully.")
+        results = package_all(script_dir, args.cold_start, args.force, args.jobs, args.optimize)
+        built = sorted(name for name, was_built in results.items() if was_built)
+        unchanged = sorted(name for name, was_built in results.items() if not was_built)
+        logging.debug(f"All lambda packages created successfully. Built: {built}, unchanged: {unchanged}")
     except Exception as e:
         logging.error(f"Error creating lambda packages: {e}")
-
-
-    
\ No newline at end of file
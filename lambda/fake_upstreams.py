@@ -0,0 +1,142 @@
+"""
+Fake OpenWeather and Spoonacular upstreams for running the Lambda handlers offline.
+
+FakePool stands in for a handler's urllib3.PoolManager. It answers each request with the
+responder registered for the URL's host, after an optional injected latency, and fails a
+configurable share of requests with a 500. A latency past the request's read timeout
+raises ReadTimeoutError, as urllib3 would.
+"""
+import json
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from urllib.parse import parse_qs, urlsplit
+
+from urllib3.exceptions import ReadTimeoutError
+
+OPENWEATHER_HOST = "api.openweathermap.org"
+SPOONACULAR_HOST = "api.spoonacular.com"
+OBSERVATION_PERIOD = 600  # OpenWeather publishes a new observation about every 10 minutes
+CONDITIONS = [
+    (800, "Clear", "clear sky", "01"),
+    (802, "Clouds", "scattered clouds", "03"),
+    (804, "Clouds", "overcast clouds", "04"),
+    (500, "Rain", "light rain", "10"),
+    (701, "Mist", "mist", "50"),
+]
+
+
+class FakeResponse:
+    """The parts of urllib3.HTTPResponse the handlers read."""
+
+    def __init__(self, status, data=b"", headers=None):
+        self.status = status
+        self.data = data
+        self.headers = headers or {"Content-Type": "application/json"}
+
+
+def _seed(text):
+    return zlib.crc32(text.lower().encode("utf-8"))
+
+
+def openweather(url, clock=time.time):
+    """Answers /data/2.5/weather with a stable made-up observation per location.
+
+    Locations starting with "nowhere" are unknown and get a 404.
+    """
+    params = {name: values[0] for name, values in parse_qs(urlsplit(url).query).items()}
+    location = params.get("q") or params.get("id", "")
+    if not location or location.lower().startswith("nowhere"):
+        return 404, json.dumps({"cod": "404", "message": "city not found"}).encode("utf-8")
+
+    seed = _seed(location)
+    condition, main, description, icon = CONDITIONS[seed % len(CONDITIONS)]
+    observed_at = int(clock()) // OBSERVATION_PERIOD * OBSERVATION_PERIOD
+    document = {
+        "coord": {"lon": seed % 360 - 180, "lat": seed % 180 - 90},
+        "weather": [{"id": condition, "main": main, "description": description, "icon": f"{icon}d"}],
+        "base": "stations",
+        "main": {
+            "temp": round((seed % 400) / 10 - 10, 2),
+            "feels_like": round((seed % 400) / 10 - 12, 2),
+            "pressure": 1000 + seed % 40,
+            "humidity": seed % 100,
+        },
+        "visibility": 10000,
+        "wind": {"speed": (seed % 120) / 10, "deg": seed % 360},
+        "dt": observed_at,
+        "timezone": 0,
+        "id": seed % 10_000_000,
+        "name": location.split(",")[0].title(),
+        "cod": 200,
+    }
+    return 200, json.dumps(document).encode("utf-8")
+
+
+def spoonacular(url):
+    """Answers /recipes/findByIngredients with number made-up recipes using the ingredients."""
+    params = {name: values[0] for name, values in parse_qs(urlsplit(url).query).items()}
+    ingredients = [item for item in params.get("ingredients", "").split(",") if item]
+    number = int(params.get("number", 10))
+    recipes = [
+        {
+            "id": _seed(f"{','.join(ingredients)}:{n}") % 1_000_000,
+            "title": f"{' and '.join(ingredients).title()} recipe {n + 1}",
+            "image": f"https://img.spoonacular.com/recipes/{n}-312x231.jpg",
+            "imageType": "jpg",
+            "usedIngredientCount": len(ingredients),
+            "missedIngredientCount": n % 3,
+            "usedIngredients": [{"id": _seed(name) % 100_000, "name": name} for name in ingredients],
+            "missedIngredients": [],
+            "likes": n * 7,
+        }
+        for n in range(number)
+    ]
+    return 200, json.dumps(recipes).encode("utf-8")
+
+
+class FakePool:
+    """Drop-in for urllib3.PoolManager that serves requests from in-process responders.
+
+    responders maps a host to a callable taking the URL and returning (status, body).
+    latency is seconds per request, or a callable returning it; error_rate is the share of
+    requests answered with a 500. Counts of requests by host and outcome are kept in stats.
+    """
+
+    def __init__(self, responders=None, latency=0.0, error_rate=0.0, rng=None):
+        self.responders = responders or {OPENWEATHER_HOST: openweather, SPOONACULAR_HOST: spoonacular}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = rng or random.Random()
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def request(self, method, url, timeout=None, **kwargs):
+        host = urlsplit(url).hostname
+        with self._lock:
+            self.stats[host] += 1
+            fail = self.rng.random() < self.error_rate
+        delay = self.latency() if callable(self.latency) else self.latency
+        read_timeout = getattr(timeout, "read_timeout", None)
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            self._count("timeouts")
+            raise ReadTimeoutError(self, url, f"Read timed out. (read timeout={read_timeout})")
+        if delay > 0:
+            time.sleep(delay)
+
+        responder = self.responders.get(host)
+        if responder is None:
+            self._count("unknown_host")
+            return FakeResponse(502, b'{"message": "No fake upstream for this host"}')
+        if fail:
+            self._count("injected_errors")
+            return FakeResponse(500, b'{"message": "Injected upstream error"}')
+        status, body = responder(url)
+        return FakeResponse(status, body)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
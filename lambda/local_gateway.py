@@ -0,0 +1,304 @@
+"""
+Local API Gateway HTTP API (payload format 2.0) emulator for the proxy Lambdas.
+
+Serves the routes declared in terraform/main.tf by turning each HTTP request into an API
+Gateway v2 proxy event and invoking the real lambda_handler of the function behind it.
+Functions run in-process, each with its own copy of its modules like separate Lambda
+functions, or in worker processes that each act as one warm container. Upstreams are the
+fakes in fake_upstreams.py unless --upstream real is given.
+
+Usage:
+    python lambda/local_gateway.py [--port 3000] [--workers N] [--consolidated]
+                                   [--upstream fake|real] [--latency-ms MS] [--error-rate R]
+
+Point the desktop app at it by setting api_gateway_url in src/config/api_config.json to
+the printed URL.
+"""
+import argparse
+import base64
+import importlib.util
+import json
+import logging
+import os
+import re
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from fake_upstreams import FakePool
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logging.getLogger("urllib3").setLevel(logging.WARNING)
+logging.getLogger("requests").setLevel(logging.WARNING)
+
+LAMBDA_DIR = os.path.dirname(os.path.abspath(__file__))
+COMMON_DIR = os.path.join(LAMBDA_DIR, "common")
+TERRAFORM_MAIN = os.path.join(os.path.dirname(LAMBDA_DIR), "terraform", "main.tf")
+ROUTE_KEY_PATTERN = re.compile(r'route_key\s*=\s*"([A-Z]+ /[^"]*)"')
+DEFAULT_TIMEOUT = 3.0  # Seconds; the Lambda default, which terraform/main.tf does not override
+PROXY_FUNCTION = "proxy"
+
+
+def terraform_routes(path=TERRAFORM_MAIN):
+    """Returns {route key: function directory} for the routes in terraform/main.tf.
+
+    Each route is served by the function directory named after its first path segment,
+    which is how the functions in main.tf are laid out ("GET /weather" -> lambda/weather).
+    """
+    with open(path, encoding="utf-8") as f:
+        route_keys = ROUTE_KEY_PATTERN.findall(f.read())
+    return {key: key.split(" ", 1)[1].strip("/").split("/")[0] for key in route_keys}
+
+
+def load_function(name):
+    """Imports lambda/<name>/handler.py as its own module, as a separate function would see it.
+
+    The function's sibling modules and those in lambda/common are imported fresh and then
+    dropped from sys.modules, so each function keeps its own copy of the shared modules
+    (upstream, response_cache...), as it does in its own package.
+    """
+    directory = os.path.join(LAMBDA_DIR, name)
+    paths = [path for path in (directory, COMMON_DIR) if os.path.isdir(path)]
+    siblings = [file[:-3] for path in paths for file in os.listdir(path) if file.endswith(".py")]
+    sys.path[:0] = paths
+    try:
+        for sibling in siblings:
+            sys.modules.pop(sibling, None)
+        spec = importlib.util.spec_from_file_location(f"{name}_function", os.path.join(directory, "handler.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        for path in paths:
+            sys.path.remove(path)
+        for sibling in siblings:
+            sys.modules.pop(sibling, None)
+
+
+class LambdaContext:
+    """The parts of the Lambda context object the handlers use."""
+
+    def __init__(self, function_name, timeout=DEFAULT_TIMEOUT):
+        self.function_name = function_name
+        self.aws_request_id = str(uuid.uuid4())
+        self.memory_limit_in_mb = 128
+        self._deadline = time.monotonic() + timeout
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+class Functions:
+    """The loaded functions of one container set, invoked by function name.
+
+    With consolidated, every route is served by the lambda/proxy function instead, so all
+    of them share one set of modules as in the consolidated deployment.
+    """
+
+    def __init__(self, routes, upstream_pool=None, consolidated=False, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.handlers = {}
+        # Function name -> the handler module behind it, for its pool and cache
+        self.modules = {}
+        proxy = load_function(PROXY_FUNCTION) if consolidated else None
+        for name in sorted(set(routes.values())):
+            if proxy is not None:
+                proxy.load_route(name)
+                module = sys.modules[f"{name}_route"]
+                self.handlers[name] = proxy.lambda_handler
+            else:
+                module = load_function(name)
+                self.handlers[name] = module.lambda_handler
+            if upstream_pool is not None:
+                module.http = upstream_pool
+            self.modules[name] = module
+
+    def invoke(self, name, event):
+        return self.handlers[name](event, LambdaContext(name, self.timeout))
+
+
+_worker_functions = None
+
+
+def _init_worker(routes, upstream_options, consolidated, timeout):
+    global _worker_functions
+    pool = FakePool(**upstream_options) if upstream_options is not None else None
+    _worker_functions = Functions(routes, pool, consolidated, timeout)
+
+
+def _invoke_in_worker(name, event):
+    return _worker_functions.invoke(name, event)
+
+
+class WorkerFunctions:
+    """Runs the functions in worker processes, each one a warm container serving every route."""
+
+    def __init__(self, workers, routes, upstream_options=None, consolidated=False, timeout=DEFAULT_TIMEOUT):
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(routes, upstream_options, consolidated, timeout),
+        )
+
+    def invoke(self, name, event):
+        return self.executor.submit(_invoke_in_worker, name, event).result()
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+
+def build_event(method, target, headers, route_key, body=b"", source_ip="127.0.0.1"):
+    """Builds the API Gateway v2 proxy event for one HTTP request."""
+    parts = urlsplit(target)
+    query = {}
+    for name, value in parse_qsl(parts.query, keep_blank_values=True):
+        # API Gateway joins repeated query parameters with commas
+        query[name] = f"{query[name]},{value}" if name in query else value
+    merged_headers = {}
+    for name, value in headers.items():
+        name = name.lower()
+        merged_headers[name] = f"{merged_headers[name]},{value}" if name in merged_headers else value
+    now = time.time()
+    event = {
+        "version": "2.0",
+        "routeKey": route_key,
+        "rawPath": parts.path,
+        "rawQueryString": parts.query,
+        "headers": merged_headers,
+        "requestContext": {
+            "accountId": "000000000000",
+            "apiId": "local",
+            "domainName": merged_headers.get("host", "localhost"),
+            "domainPrefix": "localhost",
+            "http": {
+                "method": method,
+                "path": parts.path,
+                "protocol": "HTTP/1.1",
+                "sourceIp": source_ip,
+                "userAgent": merged_headers.get("user-agent", ""),
+            },
+            "requestId": uuid.uuid4().hex,
+            "routeKey": route_key,
+            "stage": "$default",
+            "time": time.strftime("%d/%b/%Y:%H:%M:%S +0000", time.gmtime(now)),
+            "timeEpoch": int(now * 1000),
+        },
+        "isBase64Encoded": False,
+    }
+    if query:
+        event["queryStringParameters"] = query
+    if body:
+        event["body"] = base64.b64encode(body).decode("ascii")
+        event["isBase64Encoded"] = True
+    return event
+
+
+def decode_response(result):
+    """Returns (status, headers, body bytes) for a handler's result, as API Gateway reads it."""
+    if not isinstance(result, dict) or "statusCode" not in result:
+        # Format 2.0 treats anything else as a JSON body for a 200
+        return 200, {"Content-Type": "application/json"}, json.dumps(result).encode("utf-8")
+    body = result.get("body") or ""
+    if result.get("isBase64Encoded"):
+        data = base64.b64decode(body)
+    else:
+        data = body.encode("utf-8")
+    return result["statusCode"], dict(result.get("headers") or {}), data
+
+
+class GatewayHandler(BaseHTTPRequestHandler):
+    """Matches requests to routes and writes back the invoked function's response."""
+
+    protocol_version = "HTTP/1.1"
+    routes = {}
+    functions = None
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        path = urlsplit(self.path).path.rstrip("/") or "/"
+        route_key = f"{self.command} {path}"
+        name = self.routes.get(route_key)
+        if name is None:
+            self._send(404, {"Content-Type": "application/json"}, b'{"message":"Not Found"}')
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        event = build_event(self.command, self.path, self.headers, route_key, body, self.client_address[0])
+        try:
+            status, headers, data = decode_response(self.functions.invoke(name, event))
+        except Exception as e:
+            logging.error(f"Function {name} failed: {e}")
+            status, headers, data = 502, {"Content-Type": "application/json"}, b'{"message":"Internal Server Error"}'
+        self._send(status, headers, data)
+
+    def _send(self, status, headers, data):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD" and data:
+            self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} - {format % args}")
+
+
+def create_server(functions, routes, host="127.0.0.1", port=3000):
+    """Returns a ThreadingHTTPServer serving routes with functions; port 0 picks a free one."""
+    handler = type("BoundGatewayHandler", (GatewayHandler,), {"routes": routes, "functions": functions})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the proxy Lambdas behind a local API Gateway.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes; 0 runs functions in-process")
+    parser.add_argument("--consolidated", action="store_true", help="Serve every route from lambda/proxy")
+    parser.add_argument("--upstream", choices=["fake", "real"], default="fake")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency of each fake upstream request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake upstream requests that fail")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Function timeout in seconds")
+    args = parser.parse_args()
+
+    if args.upstream == "fake":
+        upstream_options = {"latency": args.latency_ms / 1000, "error_rate": args.error_rate}
+        # The handlers refuse to run without keys, which the fakes never check
+        os.environ.setdefault("WEATHER_API_KEY", "local")
+        os.environ.setdefault("SPOONACULAR_API_KEY", "local")
+    else:
+        upstream_options = None
+
+    routes = terraform_routes()
+    if args.workers > 0:
+        functions = WorkerFunctions(args.workers, routes, upstream_options, args.consolidated, args.timeout)
+    else:
+        pool = FakePool(**upstream_options) if upstream_options is not None else None
+        functions = Functions(routes, pool, args.consolidated, args.timeout)
+
+    server = create_server(functions, routes, args.host, args.port)
+    logging.info(f"Serving {', '.join(routes)} at http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if isinstance(functions, WorkerFunctions):
+            functions.shutdown()
+
+
+if __name__ == "__main__":
+    main()
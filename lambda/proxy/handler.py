@@ -0,0 +1,84 @@
+import importlib.util
+import json
+import logging
+import os
+import sys
+import threading
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logging.getLogger("urllib3").setLevel(logging.WARNING)
+logging.getLogger("requests").setLevel(logging.WARNING)
+
+# API Gateway route key -> function directory whose handler.py serves it. A route is any
+# directory with a handler.py exposing lambda_handler(event, context).
+ROUTES = {
+    "GET /weather": "weather",
+    "GET /recipe": "recipe",
+}
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Packaged, the route directories sit next to this file; in the source tree, next to lambda/proxy
+ROUTES_ROOT = os.getenv("PROXY_ROUTES_ROOT") or (
+    HERE if all(os.path.isdir(os.path.join(HERE, name)) for name in ROUTES.values())
+    else os.path.dirname(HERE)
+)
+# Packaged, the shared modules sit next to this file; in the source tree, in lambda/common
+COMMON_DIR = os.path.join(ROUTES_ROOT, "common")
+
+_route_handlers = {}
+_route_lock = threading.Lock()
+
+
+def route_key(event):
+    """Returns "METHOD /path" for an API Gateway v2 event, from routeKey or else rawPath."""
+    key = event.get("routeKey")
+    if key and key != "$default":
+        return key
+
+    request_context = event.get("requestContext") or {}
+    # Payload format 1.0 events carry httpMethod and path instead
+    method = (request_context.get("http") or {}).get("method") or event.get("httpMethod") or "GET"
+    path = event.get("rawPath") or event.get("path") or "/"
+    stage = request_context.get("stage")
+    if stage and stage != "$default" and path.startswith(f"/{stage}/"):
+        path = path[len(stage) + 1:]
+    return f"{method.upper()} {path.rstrip('/') or '/'}"
+
+
+def load_route(name):
+    """Imports <name>/handler.py once per container as the module <name>_route.
+
+    The route directory goes on sys.path so the handler's bare-name sibling imports resolve.
+    The shared modules (upstream, response_cache, compression) are imported once and serve
+    every route, including the PoolManager.
+    """
+    with _route_lock:
+        if name in _route_handlers:
+            return _route_handlers[name]
+        route_dir = os.path.join(ROUTES_ROOT, name)
+        for directory in (COMMON_DIR, route_dir):
+            if os.path.isdir(directory) and directory not in sys.path:
+                sys.path.append(directory)
+        spec = importlib.util.spec_from_file_location(f"{name}_route", os.path.join(route_dir, "handler.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        logging.debug(f"Loaded route module {spec.name} from {route_dir}")
+        _route_handlers[name] = module.lambda_handler
+        return module.lambda_handler
+
+
+def lambda_handler(event, context):
+    """AWS Lambda function serving every proxy route from one warm container."""
+    key = route_key(event)
+    name = ROUTES.get(key)
+    if name is None:
+        logging.warning(f"No route for {key}")
+        return {
+            "statusCode": 404,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"error": "Route not found"}),
+        }
+    return load_route(name)(event, context)
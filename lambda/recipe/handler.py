@@ -1,7 +1,21 @@
 import json
 import os
-import urllib3
 import logging
+from urllib.parse import urlencode
+
+import compression
+import upstream
+from ingredients import (
+    DEFAULT_NUMBER,
+    canonical_ignore_pantry,
+    canonical_ingredients,
+    canonical_ranking,
+    fetch_number,
+    parse_number,
+    search_key,
+)
+from json_slice import first_items, looks_like_json_array
+from response_cache import ResponseCache
 
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -9,17 +23,50 @@ logging.basicConfig(
 logging.getLogger("urllib3").setLevel(logging.WARNING)
 logging.getLogger("requests").setLevel(logging.WARNING)
 
-http = urllib3.PoolManager()
+http = upstream.shared_pool()
+# Search results for an ingredient set rarely change, so they can be kept for an hour
+response_cache = ResponseCache.from_env(max_entries=256, ttl=3600, negative_ttl=300)
+
+
+def fetch_recipes(url, context):
+    """Returns (status, body) from Spoonacular. The body is the JSON array text, or None unless status is 200."""
+    response = upstream.get(http, url, context)
+    logging.debug(f"Recipe API response status: {response.status}")
+    if response.status != 200:
+        return response.status, None
+    body = response.data.decode("utf-8")
+    if not looks_like_json_array(body):
+        raise json.JSONDecodeError("Expected a JSON array of recipes", body, 0)
+    return 200, body
+
+
+def select_recipes(body, fetched, number):
+    """Returns the JSON text for the first number recipes of a result fetched with number=fetched.
+
+    Returns None when the result holds too few. The body is passed through untouched when
+    every recipe in it is wanted; otherwise only the wanted recipes are scanned.
+    """
+    if number < fetched:
+        return first_items(body, number)[0]
+    if number == fetched:
+        return body
+    # A result shorter than what was fetched is complete, so it can serve any number
+    if first_items(body, fetched)[1] < fetched:
+        return body
+    return None
 
 
 def lambda_handler(event, context):
     """AWS Lambda function to fetch recipe data from an external API and return it as JSON."""
-    ingredients = event.get("queryStringParameters", {}).get(
-        "ingredients", "chicken,tomato"
-    )
-    number_of_recipes = event.get("queryStringParameters", {}).get("number", "5")
-    ignore_pantry = event.get("queryStringParameters", {}).get("ignorePantry", "true")
-    ranking = event.get("queryStringParameters", {}).get("ranking", "1")
+    return compression.compress_response(build_response(event, context), event)
+
+
+def build_response(event, context):
+    params = event.get("queryStringParameters") or {}
+    ingredients = canonical_ingredients(params.get("ingredients", "chicken,tomato"))
+    number_of_recipes = parse_number(params.get("number", DEFAULT_NUMBER))
+    ignore_pantry = canonical_ignore_pantry(params.get("ignorePantry", "true"))
+    ranking = canonical_ranking(params.get("ranking", "1"))
     api_key = os.getenv("SPOONACULAR_API_KEY")
 
     if not api_key:
@@ -27,31 +74,58 @@ def lambda_handler(event, context):
             "statusCode": 500,
             "body": json.dumps({"error": "API key not configured"}),
         }
-    url = f"https://api.spoonacular.com/recipes/findByIngredients?ingredients={ingredients}&apiKey={api_key}&number={number_of_recipes}&ignorePantry={ignore_pantry}&ranking={ranking}"
+    if not ingredients:
+        return {
+            "statusCode": 400,
+            "body": json.dumps({"error": "No ingredients given"}),
+        }
+
+    cache_key = search_key(ingredients, ignore_pantry, ranking)
 
     try:
-        response = http.request("GET", url)
-        logging.debug(f"Recipe API response status: {response.status}")
-        if response.status == 429:
-            return {
-                "statusCode": 429,
-                "body": json.dumps(
-                    {"error": "Rate limit exceeded, please try again later"}
-                ),
-            }
-        if response.status != 200:
-            return {
-                "statusCode": response.status,
-                "body": json.dumps({"error": "Failed to fetch recipe data"}),
-            }
-        recipe_data = json.loads(response.data.decode("utf-8"))
+        cached = response_cache.get(cache_key)
+        recipe_body = select_recipes(*cached, number_of_recipes) if cached else None
+        if recipe_body is None:
+            fetched = fetch_number(number_of_recipes)
+            url = "https://api.spoonacular.com/recipes/findByIngredients?" + urlencode({
+                "ingredients": ",".join(ingredients),
+                "apiKey": api_key,
+                "number": fetched,
+                "ignorePantry": ignore_pantry,
+                "ranking": ranking,
+            })
+            status, body = fetch_recipes(url, context)
+            if status == 429:
+                return {
+                    "statusCode": 429,
+                    "body": json.dumps(
+                        {"error": "Rate limit exceeded, please try again later"}
+                    ),
+                }
+            if status != 200:
+                return {
+                    "statusCode": status,
+                    "body": json.dumps({"error": "Failed to fetch recipe data"}),
+                }
+            empty = first_items(body, 1)[1] == 0
+            response_cache.set(cache_key, (body, fetched), negative=empty)
+            recipe_body = select_recipes(body, fetched, number_of_recipes)
+        else:
+            logging.debug(f"Serving cached recipes for: {cache_key}")
         return {
             "statusCode": 200,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps(recipe_data),
+            "body": recipe_body,
+        }
+
+    except upstream.UpstreamTimeout as e:
+        logging.error(f"Recipe API timed out: {e}")
+        return {
+            "statusCode": 504,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"error": "Recipe service timed out, please try again"}),
         }
-    
-    except json.JSONDecodeError as e:
+    except (ValueError, IndexError) as e:
         logging.error(f"JSON decode error: {e}")
         return {
             "statusCode": 500,
@@ -0,0 +1,45 @@
+# Canonical recipe search keys, so equivalent ingredient lists share one upstream call.
+import unicodedata
+
+DEFAULT_NUMBER = 5
+MAX_NUMBER = 100  # Spoonacular's own limit for findByIngredients
+# Searches always ask for at least this many recipes so later, larger requests can be
+# sliced from the cached result; extra results cost a fraction of a quota point
+MIN_FETCH_NUMBER = 10
+
+
+def canonical_ingredients(raw):
+    """Trims, lowercases, deduplicates and sorts a comma-separated ingredient list."""
+    names = set()
+    for ingredient in str(raw).split(","):
+        name = " ".join(unicodedata.normalize("NFKC", ingredient).casefold().split())
+        if name:
+            names.add(name)
+    return tuple(sorted(names))
+
+
+def parse_number(value, default=DEFAULT_NUMBER):
+    """Returns the requested number of recipes, clamped to 1..MAX_NUMBER."""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = default
+    return min(MAX_NUMBER, max(1, number))
+
+
+def canonical_ignore_pantry(value):
+    return "false" if str(value).strip().lower() in ("false", "0", "no") else "true"
+
+
+def canonical_ranking(value):
+    return "2" if str(value).strip() == "2" else "1"
+
+
+def search_key(ingredients, ignore_pantry, ranking):
+    """Cache key for a search. number is left out: smaller requests are slices of larger ones."""
+    return f"{','.join(ingredients)}|{ignore_pantry}|{ranking}"
+
+
+def fetch_number(number):
+    return max(number, MIN_FETCH_NUMBER)
+
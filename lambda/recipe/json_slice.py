@@ -0,0 +1,41 @@
+# Works on upstream JSON arrays as text, so results can be passed through or trimmed
+# without a json.loads/json.dumps round trip.
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def looks_like_json_array(text):
+    """Cheap sanity check for a pass-through body. Only the outer brackets are checked."""
+    stripped = text.strip()
+    return stripped[:1] == "[" and stripped[-1:] == "]"
+
+
+def first_items(text, number):
+    """Returns (array_text, count) for the first number elements of a JSON array.
+
+    Only those elements are scanned, and the returned text is a slice of the original, so
+    nothing is re-serialized.
+    """
+    index = text.index("[") + 1
+    end = index
+    count = 0
+    while count < number:
+        index = _skip_whitespace(text, index)
+        if text[index] == "]":
+            break
+        if count:
+            if text[index] != ",":
+                raise ValueError(f"Expected ',' at position {index}")
+            index = _skip_whitespace(text, index + 1)
+        _, index = _decoder.raw_decode(text, index)
+        end = index
+        count += 1
+    return text[:end] + "]", count
+
+
+def _skip_whitespace(text, index):
+    while text[index] in _WHITESPACE:
+        index += 1
+    return index
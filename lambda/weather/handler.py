@@ -1,7 +1,17 @@
 import json
 import os
-import urllib3
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import urlencode
+
+import compression
+import locations
+import projection
+import upstream
+from env import env_int
+from observation import Observation
+from response_cache import ResponseCache
 
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -9,32 +19,147 @@ logging.basicConfig(
 logging.getLogger("urllib3").setLevel(logging.WARNING)
 logging.getLogger("requests").setLevel(logging.WARNING)
 
-http = urllib3.PoolManager()
+http = upstream.shared_pool()
+# Observations change about every ten minutes, so a short TTL still absorbs most repeats
+response_cache = ResponseCache.from_env(max_entries=256, ttl=300, negative_ttl=60)
+
+MAX_BATCH_LOCATIONS = 50
+DEFAULT_BATCH_WORKERS = 8  # Threads per batch; they share the PoolManager's connections
+BATCH_ERRORS = {
+    404: 'Location not found',
+    500: 'Internal server error',
+    504: 'Weather service timed out',
+}
+
+
+def observation_headers(observed_at):
+    """Validators for an observation: the ETag is its OpenWeather dt, quoted."""
+    return {
+        'ETag': f'"{observed_at}"',
+        'Last-Modified': formatdate(observed_at, usegmt=True),
+    }
+
+
+def client_observed_at(headers, params):
+    """Returns the dt of the client's cached observation, or None when it sent no validator.
+
+    Accepts If-None-Match (as issued in ETag), If-Modified-Since, or a numeric since= parameter.
+    """
+    candidates = []
+    for tag in headers.get('if-none-match', '').split(','):
+        tag = tag.strip().removeprefix('W/').strip('"')
+        if tag.isdigit():
+            candidates.append(int(tag))
+    if headers.get('if-modified-since'):
+        try:
+            candidates.append(int(parsedate_to_datetime(headers['if-modified-since']).timestamp()))
+        except (TypeError, ValueError):
+            pass
+    if str(params.get('since', '')).isdigit():
+        candidates.append(int(params['since']))
+    return max(candidates) if candidates else None
+
+
+def encode_weather(observation, fields):
+    """Passes the upstream body through, or serializes only the requested fields without whitespace."""
+    if fields is None:
+        return observation.body
+    return json.dumps(projection.project(observation.document(), fields), separators=(',', ':'))
+
+
+def weather_url(lookup, api_key):
+    return 'https://api.openweathermap.org/data/2.5/weather?' + urlencode(
+        {**lookup, 'appid': api_key, 'units': 'metric'}
+    )
+
+
+def fetch_weather(url, context):
+    """Returns (status, observation) from OpenWeather. The observation is None unless status is 200."""
+    response = upstream.get(http, url, context)
+    logging.debug(f"Weather API response status: {response.status}")
+    if response.status != 200:
+        return response.status, None
+    return 200, Observation.from_bytes(response.data)
+
+
+def get_observation(cache_key, url, context):
+    """Returns (status, observation) for url, from the warm-container cache when possible."""
+    cached = response_cache.get(cache_key)
+    if cached is None:
+        cached = fetch_weather(url, context)
+        status = cached[0]
+        if status == 200:
+            response_cache.set(cache_key, cached)
+        elif status == 404:
+            response_cache.set(cache_key, cached, negative=True)
+    return cached
+
 
 def lambda_handler(event, context):
     """AWS Lambda function to fetch weather data from an external API and return it as JSON."""
-    location = event.get('queryStringParameters', {}).get('location', 'New York')
+    return compression.compress_response(build_response(event, context), event)
+
+
+def build_response(event, context):
+    params = event.get('queryStringParameters') or {}
+    fields = projection.parse_fields(params.get('fields'))
     api_key = os.getenv('WEATHER_API_KEY')
     if not api_key:
         return {
             'statusCode': 500,
             'body': json.dumps({'error': 'API key not configured'})
         }
-    url = f'https://api.openweathermap.org/data/2.5/weather?q={location}&appid={api_key}&units=metric'
+    if params.get('locations'):
+        return build_batch_response(params['locations'], fields, api_key, context)
+
+    headers = {name.lower(): value for name, value in (event.get('headers') or {}).items()}
+    location_key, query = locations.canonicalize(params.get('location', 'New York'))
+    city_id = params.get('id', '')
+    # A known city ID is unambiguous, so prefer it over the name
+    lookup = {'id': city_id} if city_id.isdigit() else {'q': query}
+    url = weather_url(lookup, api_key)
+    logging.debug(
+        f"Weather request for {location_key}: {dict(locations.stats)}, "
+        f"repeat rate {locations.hit_rate():.2f}"
+    )
+
+    # Cache by what OpenWeather is asked for; projection and validators are per request
+    cache_key = f"id:{city_id}" if 'id' in lookup else location_key
 
     try:
-        response = http.request('GET', url)
-        logging.debug(f"Weather API response status: {response.status}")
-        if response.status != 200:
+        status, observation = get_observation(cache_key, url, context)
+        if status != 200:
             return {
-                'statusCode': response.status,
+                'statusCode': status,
                 'body': json.dumps({'error': 'Failed to fetch weather data'})
             }
-        weather_data = json.loads(response.data.decode('utf-8'))
+        observed_at = observation.observed_at
+        if observed_at is None:
+            return {
+                'statusCode': 200,
+                'headers': {'Content-Type': 'application/json'},
+                'body': encode_weather(observation, fields)
+            }
+
+        # An unchanged observation need not be sent back through API Gateway
+        known_observed_at = client_observed_at(headers, params)
+        if known_observed_at is not None and observed_at <= known_observed_at:
+            logging.debug(f"Weather for {location_key} unchanged since {observed_at}, returning 304")
+            return {
+                'statusCode': 304,
+                'headers': observation_headers(observed_at),
+            }
         return {
             'statusCode': 200,
+            'headers': {'Content-Type': 'application/json', **observation_headers(observed_at)},
+            'body': encode_weather(observation, fields)
+        }
+    except upstream.UpstreamTimeout as e:
+        logging.error(f"Weather API timed out: {e}")
+        return {
+            'statusCode': 504,
             'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps(weather_data)
+            'body': json.dumps({'error': 'Weather service timed out, please try again'})
         }
     except Exception as e:
         logging.error(f"Error fetching weather data: {e}")
@@ -43,3 +168,97 @@ def lambda_handler(event, context):
             'headers': {'Content-Type': 'application/json'},
             'body': json.dumps({'error': 'Internal server error'})
         }
+
+
+def build_batch_response(raw_locations, fields, api_key, context):
+    """Fetches every location in locations=a,b,c concurrently and combines the results.
+
+    Each result carries its own status, so one bad location does not fail the batch.
+    """
+    names = parse_locations(raw_locations)
+    if not names or len(names) > MAX_BATCH_LOCATIONS:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': f'Give between 1 and {MAX_BATCH_LOCATIONS} locations'})
+        }
+
+    # Equivalent spellings within one batch share a single upstream call
+    keys = []
+    urls = {}
+    for name in names:
+        location_key, query = locations.canonicalize(name)
+        keys.append(location_key)
+        urls.setdefault(location_key, weather_url({'q': query}, api_key))
+
+    workers = min(env_int('BATCH_WORKERS', DEFAULT_BATCH_WORKERS), len(urls))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            key: executor.submit(get_batch_observation, key, url, context)
+            for key, url in urls.items()
+        }
+        outcomes = {key: future.result() for key, future in futures.items()}
+    logging.debug(f"Weather batch of {len(names)} locations: {response_cache.summary()}")
+
+    items = [batch_item(name, *outcomes[key], fields) for name, key in zip(names, keys)]
+    return {
+        'statusCode': 200,
+        'headers': {'Content-Type': 'application/json'},
+        'body': '{"results":[' + ','.join(items) + ']}'
+    }
+
+
+def parse_locations(value):
+    """Splits a locations= value into location strings.
+
+    Items are separated by ';' or '|' when either is present. Otherwise they are separated
+    by ',', and a country code is taken as the country of the item before it, so
+    "London,GB,Paris" is London, GB and Paris. Codes that are also city aliases are cities:
+    "NYC,LA,SF" is three locations.
+    """
+    if ';' in value or '|' in value:
+        items = value.replace('|', ';').split(';')
+        return [item.strip() for item in items if item.strip()]
+
+    names = []
+    for item in (item.strip() for item in value.split(',')):
+        if not item:
+            continue
+        if names and locations.is_country_code(item):
+            names[-1] = f"{names[-1]},{item}"
+        else:
+            names.append(item)
+    return names
+
+
+def get_batch_observation(cache_key, url, context):
+    """get_observation for a batch worker: failures become a status instead of an exception."""
+    try:
+        return get_observation(cache_key, url, context)
+    except upstream.UpstreamTimeout as e:
+        logging.error(f"Weather API timed out for {cache_key}: {e}")
+        return 504, None
+    except Exception as e:
+        logging.error(f"Error fetching weather data for {cache_key}: {e}")
+        return 500, None
+
+
+def batch_item(name, status, observation, fields):
+    """One result of a batch. Observation bodies are spliced in as text, not re-serialized.
+
+    Each body is parsed once first, so a malformed upstream body fails its own result
+    instead of making the whole batch invalid JSON.
+    """
+    if status == 200:
+        try:
+            # Parsed once per observation; cached observations keep their document
+            observation.document()
+            weather = encode_weather(observation, fields)
+        except ValueError as e:
+            logging.error(f"Invalid weather data for {name}: {e}")
+            status = 500
+        else:
+            return f'{{"location":{json.dumps(name)},"status":200,"weather":{weather}}}'
+    return json.dumps(
+        {'location': name, 'status': status, 'error': BATCH_ERRORS.get(status, 'Failed to fetch weather data')},
+        separators=(',', ':'),
+    )
@@ -0,0 +1,125 @@
+# Mirrors src/scripts/location_canonicalizer.py so the desktop client and the proxy fold
+# locations to the same keys. tests/unit/lambdas/test_locations.py fails when they diverge.
+import unicodedata
+from collections import Counter, OrderedDict
+
+RECENT_KEYS_LIMIT = 256  # Canonical keys remembered per warm container for repeat tracking
+
+# Per-container counters; a high repeat share means a response cache would pay off
+stats = Counter()
+_recent_keys = OrderedDict()
+
+COUNTRY_ALIASES = {
+    "usa": "US",
+    "united states": "US",
+    "united states of america": "US",
+    "america": "US",
+    "uk": "GB",
+    "united kingdom": "GB",
+    "great britain": "GB",
+    "england": "GB",
+    "scotland": "GB",
+    "wales": "GB",
+    "canada": "CA",
+    "france": "FR",
+    "germany": "DE",
+    "deutschland": "DE",
+    "spain": "ES",
+    "italy": "IT",
+    "japan": "JP",
+    "china": "CN",
+    "india": "IN",
+    "brazil": "BR",
+    "mexico": "MX",
+    "australia": "AU",
+    "iceland": "IS",
+}
+
+CITY_ALIASES = {
+    "nyc": "new york",
+    "new york city": "new york",
+    "la": "los angeles",
+    "sf": "san francisco",
+    "washington dc": "washington",
+    "washington d c": "washington",
+    "st petersburg": "saint petersburg",
+    "bombay": "mumbai",
+    "calcutta": "kolkata",
+    "madras": "chennai",
+    "peking": "beijing",
+    "kiev": "kyiv",
+    "saigon": "ho chi minh city",
+    "rangoon": "yangon",
+}
+
+# ISO 3166-1 alpha-2, plus UK, which is reserved for the United Kingdom and OpenWeather accepts
+COUNTRY_CODES = frozenset("""
+    AD AE AF AG AI AL AM AO AQ AR AS AT AU AW AX AZ BA BB BD BE BF BG BH BI BJ BL BM BN BO BQ
+    BR BS BT BV BW BY BZ CA CC CD CF CG CH CI CK CL CM CN CO CR CU CV CW CX CY CZ DE DJ DK DM
+    DO DZ EC EE EG EH ER ES ET FI FJ FK FM FO FR GA GB GD GE GF GG GH GI GL GM GN GP GQ GR GS
+    GT GU GW GY HK HM HN HR HT HU ID IE IL IM IN IO IQ IR IS IT JE JM JO JP KE KG KH KI KM KN
+    KP KR KW KY KZ LA LB LC LI LK LR LS LT LU LV LY MA MC MD ME MF MG MH MK ML MM MN MO MP MQ
+    MR MS MT MU MV MW MX MY MZ NA NC NE NF NG NI NL NO NP NR NU NZ OM PA PE PF PG PH PK PL PM
+    PN PR PS PT PW PY QA RE RO RS RU RW SA SB SC SD SE SG SH SI SJ SK SL SM SN SO SR SS ST SV
+    SX SY SZ TC TD TF TG TH TJ TK TL TM TN TO TR TT TV TW TZ UA UG UK UM US UY UZ VA VC VE VG
+    VI VN VU WF WS YE YT ZA ZM ZW
+""".split())
+
+
+def is_country_code(item):
+    """Whether item is a country code, and not also a city alias such as "LA" or "SF"."""
+    item = str(item).strip()
+    return item.upper() in COUNTRY_CODES and normalize_city_name(item) not in CITY_ALIASES
+
+
+def normalize_city_name(name):
+    """Folds accents, case, punctuation and whitespace into a lookup key."""
+    decomposed = unicodedata.normalize("NFKD", str(name))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    cleaned = "".join(ch if ch.isalnum() else " " for ch in stripped.casefold())
+    return " ".join(cleaned.split())
+
+
+def split_country(query):
+    """Splits "Paris, FR" into ("Paris", "FR"). The country is None when absent."""
+    name, sep, country = str(query).rpartition(",")
+    country = country.strip()
+    if sep and len(country) == 2 and country.isalpha():
+        return name, country.upper()
+    return str(query), None
+
+
+def parse_location(location):
+    """Folds a free-form location into (name, country) with aliases applied."""
+    name, country = split_country(location)
+    if country is None and "," in name:
+        head, _, tail = name.rpartition(",")
+        alias = COUNTRY_ALIASES.get(normalize_city_name(tail))
+        if alias:
+            name, country = head, alias
+
+    name = normalize_city_name(name)
+    return CITY_ALIASES.get(name, name), country
+
+
+def canonicalize(location):
+    """Returns (key, query): the cache key and the value sent as OpenWeather's q parameter."""
+    name, country = parse_location(location)
+    key = f"{name},{country.lower()}" if country else name
+
+    stats["requests"] += 1
+    if key != " ".join(str(location).split()):
+        stats["rewritten"] += 1
+    if key in _recent_keys:
+        stats["repeats"] += 1
+        _recent_keys.move_to_end(key)
+    else:
+        _recent_keys[key] = None
+        if len(_recent_keys) > RECENT_KEYS_LIMIT:
+            _recent_keys.popitem(last=False)
+    return key, f"{name},{country}" if country else name
+
+
+def hit_rate():
+    """Share of canonicalized requests whose key was seen recently in this container."""
+    return stats["repeats"] / stats["requests"] if stats["requests"] else 0.0
@@ -0,0 +1,31 @@
+# Upstream weather bodies are kept as text and passed through; they are only parsed when a
+# projection needs the document.
+import json
+import re
+
+# OpenWeather's current weather document has a single "dt" key, at the top level
+DT_PATTERN = re.compile(r'"dt"\s*:\s*(\d+)')
+
+
+class Observation:
+    """An OpenWeather current weather body, parsed lazily."""
+
+    def __init__(self, body):
+        self.body = body
+        match = DT_PATTERN.search(body)
+        self.observed_at = int(match.group(1)) if match else None
+        self._document = None
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Decodes an upstream body, raising ValueError when it is obviously not a JSON object."""
+        body = data.decode('utf-8')
+        stripped = body.strip()
+        if stripped[:1] != '{' or stripped[-1:] != '}':
+            raise ValueError("Weather response is not a JSON object")
+        return cls(body)
+
+    def document(self):
+        if self._document is None:
+            self._document = json.loads(self.body)
+        return self._document
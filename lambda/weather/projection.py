@@ -0,0 +1,45 @@
+# Field projection for weather responses. Paths are dotted ("main.temp"); a path through a
+# list ("weather.main") is applied to every element.
+
+# What the desktop client reads, available as fields=compact
+COMPACT_FIELDS = (
+    "dt",
+    "weather.main",
+    "weather.description",
+    "weather.icon",
+    "main.temp",
+    "main.humidity",
+)
+
+
+def parse_fields(value):
+    """Returns the requested field paths, or None when the full document was asked for."""
+    if not value:
+        return None
+    if value.strip() == "compact":
+        return COMPACT_FIELDS
+    paths = tuple(path.strip() for path in value.split(",") if path.strip())
+    return paths or None
+
+
+def project(document, paths):
+    """Copies only the given paths out of document. Missing paths are skipped."""
+    projected = {}
+    for path in paths:
+        _copy_path(document, projected, path.split("."))
+    return projected
+
+
+def _copy_path(source, target, parts):
+    head, rest = parts[0], parts[1:]
+    if not isinstance(source, dict) or head not in source:
+        return
+    value = source[head]
+    if not rest:
+        target[head] = value
+    elif isinstance(value, dict):
+        _copy_path(value, target.setdefault(head, {}), rest)
+    elif isinstance(value, list):
+        items = target.setdefault(head, [{} for _ in value])
+        for item, projected_item in zip(value, items):
+            _copy_path(item, projected_item, rest)
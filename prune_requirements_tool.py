@@ -0,0 +1,358 @@
+"""
+Computes the minimal requirements of each build target from its static import closure.
+
+Targets are the desktop app (src/main.py) and every Lambda function (lambda/*/handler.py).
+Starting from a target's entry points, every import statement of every local module it
+reaches is followed; imports that leave the target's own sources are stdlib modules or
+third-party packages. Third-party packages are mapped to their distributions, and those
+become the target's requirements, written one file per target.
+
+Imports inside try/except ImportError, and imports of distributions that pyproject.toml
+lists under optional-dependencies, are reported as optional rather than required.
+Dynamic imports (importlib) are invisible to this analysis; the consolidated proxy's routes,
+which it loads that way, are added as extra entry points.
+
+The size report compares the installed size of each target's distributions, including
+their dependencies, with everything in requirements.txt. Sizes are only known for
+distributions installed in the running environment.
+
+Usage:
+    python prune_requirements_tool.py [--output-dir build/requirements] [--json report.json]
+"""
+import argparse
+import ast
+import importlib.metadata
+import json
+import os
+import re
+import sys
+
+try:
+    import tomllib
+except ImportError:  # Python 3.10
+    tomllib = None
+
+try:
+    from packaging.requirements import InvalidRequirement, Requirement
+except ImportError:
+    Requirement = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT_DIR = os.path.join("build", "requirements")
+
+# Import names whose distribution is named differently, for when it is not installed here
+KNOWN_DISTRIBUTIONS = {
+    "PIL": "pillow",
+    "bs4": "beautifulsoup4",
+    "brotli": "Brotli",
+    "crewai_tools": "crewai-tools",
+    "cv2": "opencv-python",
+    "langchain_openai": "langchain-openai",
+    "yaml": "PyYAML",
+}
+# The Lambda Python runtime ships these, so the functions need not package them
+LAMBDA_RUNTIME_PROVIDED = {"boto3", "botocore", "jmespath", "python-dateutil", "s3transfer", "six", "urllib3"}
+PROXY_FUNCTION = "proxy"
+COMMON_FUNCTION_DIR = "common"
+REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+def canonical_name(name):
+    """PEP 503 normalized distribution name."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def build_targets(root=ROOT):
+    """Returns {target: (entry points, search paths, runtime-provided distributions)}."""
+    targets = {"desktop": ([os.path.join(root, "src", "main.py")], [os.path.join(root, "src")], set())}
+    lambda_dir = os.path.join(root, "lambda")
+    functions = sorted(
+        name for name in os.listdir(lambda_dir)
+        if os.path.isfile(os.path.join(lambda_dir, name, "handler.py"))
+    )
+    for name in functions:
+        function_dirs = [os.path.join(lambda_dir, name)]
+        if name == PROXY_FUNCTION:
+            function_dirs += [os.path.join(lambda_dir, other) for other in functions if other != PROXY_FUNCTION]
+        targets[f"lambda-{name}"] = (
+            [os.path.join(directory, "handler.py") for directory in function_dirs],
+            # Every package also carries the shared modules in lambda/common
+            function_dirs + [os.path.join(lambda_dir, COMMON_FUNCTION_DIR)],
+            LAMBDA_RUNTIME_PROVIDED,
+        )
+    return targets
+
+
+class ImportCollector(ast.NodeVisitor):
+    """Collects (module, optional) for every import statement in a module."""
+
+    def __init__(self, package):
+        self.package = package
+        self.imports = []
+        self._optional_depth = 0
+
+    def visit_Try(self, node):
+        guarded = any(self._catches_import_error(handler.type) for handler in node.handlers)
+        self._optional_depth += guarded
+        for statement in node.body:
+            self.visit(statement)
+        self._optional_depth -= guarded
+        for part in node.handlers + node.orelse + node.finalbody:
+            self.visit(part)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.imports.append((alias.name, self._optional_depth > 0))
+
+    def visit_ImportFrom(self, node):
+        if node.level:
+            base = self.package.split(".")[:len(self.package.split(".")) - node.level + 1] if self.package else []
+            module = ".".join(base + ([node.module] if node.module else []))
+        else:
+            module = node.module
+        if not module:
+            return
+        self.imports.append((module, self._optional_depth > 0))
+        # "from package import name" may import the submodule package.name
+        for alias in node.names:
+            self.imports.append((f"{module}.{alias.name}", None))
+
+    @staticmethod
+    def _catches_import_error(handler_type):
+        """Whether an except clause names ImportError or ModuleNotFoundError.
+
+        Bare except and except Exception catch failed imports too, but they guard against
+        any error, so the imports they wrap still count as required.
+        """
+        if handler_type is None:
+            return False
+        names = handler_type.elts if isinstance(handler_type, ast.Tuple) else [handler_type]
+        return any(
+            isinstance(name, ast.Name) and name.id in ("ImportError", "ModuleNotFoundError")
+            for name in names
+        )
+
+
+def resolve_local(module, search_paths):
+    """Returns the file of module in search_paths, or None when it is not a local module."""
+    parts = module.split(".")
+    for path in search_paths:
+        base = os.path.join(path, *parts)
+        for candidate in (f"{base}.py", os.path.join(base, "__init__.py")):
+            if os.path.isfile(candidate):
+                return candidate
+    return None
+
+
+def import_closure(entry_points, search_paths):
+    """Follows imports from entry_points through local modules.
+
+    Returns (local files, {third-party top-level name: {"optional": bool, "importers": set}}).
+    An import is optional only when every import of that name is guarded.
+    """
+    local_files = set()
+    third_party = {}
+    pending = [(path, "") for path in entry_points]
+    while pending:
+        path, package = pending.pop()
+        if path in local_files:
+            continue
+        local_files.add(path)
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        collector = ImportCollector(package)
+        collector.visit(tree)
+
+        for module, optional in collector.imports:
+            parts = module.split(".")
+            # Importing a.b.c runs a/__init__.py and a/b/__init__.py first
+            for depth in range(1, len(parts) + 1):
+                module_name = ".".join(parts[:depth])
+                file = resolve_local(module_name, search_paths)
+                if file is not None:
+                    is_package = os.path.basename(file) == "__init__.py"
+                    pending.append((file, module_name if is_package else module_name.rpartition(".")[0]))
+            top = parts[0]
+            if optional is None or top in sys.stdlib_module_names or resolve_local(top, search_paths):
+                continue
+            entry = third_party.setdefault(top, {"optional": True, "importers": set()})
+            entry["optional"] = entry["optional"] and optional
+            entry["importers"].add(os.path.relpath(path, ROOT))
+    return local_files, third_party
+
+
+def distribution_for(import_name, installed=None):
+    """Returns the distribution providing import_name, installed or known, else the name itself."""
+    installed = installed if installed is not None else importlib.metadata.packages_distributions()
+    if import_name in installed:
+        return installed[import_name][0]
+    return KNOWN_DISTRIBUTIONS.get(import_name, import_name)
+
+
+def read_requirements(path):
+    """Returns {canonical name: requirement line}. requirements.txt here is UTF-16 encoded."""
+    with open(path, "rb") as f:
+        data = f.read()
+    encoding = "utf-16" if data[:2] in (b"\xff\xfe", b"\xfe\xff") else "utf-8"
+    requirements = {}
+    for line in data.decode(encoding).splitlines():
+        line = line.split("#", 1)[0].strip()
+        match = REQUIREMENT_NAME.match(line)
+        if match:
+            requirements[canonical_name(match.group(1))] = line
+    return requirements
+
+
+def read_extras(path):
+    """Returns {canonical name: extra} for pyproject.toml's optional-dependencies."""
+    if tomllib is None or not os.path.exists(path):
+        return {}
+    with open(path, "rb") as f:
+        extras = tomllib.load(f).get("project", {}).get("optional-dependencies", {})
+    return {
+        canonical_name(REQUIREMENT_NAME.match(requirement).group(1)): extra
+        for extra, requirements in extras.items()
+        for requirement in requirements
+        if REQUIREMENT_NAME.match(requirement)
+    }
+
+
+def applies(requirement):
+    """Whether a Requires-Dist entry applies here, without extras.
+
+    Environment markers are evaluated when packaging is installed; otherwise only entries
+    for extras are left out.
+    """
+    if Requirement is None:
+        return "extra ==" not in requirement.replace("extra==", "extra ==")
+    try:
+        parsed = Requirement(requirement)
+    except InvalidRequirement:
+        return False
+    return parsed.marker is None or parsed.marker.evaluate({"extra": ""})
+
+
+def installed_size(distribution):
+    """Bytes installed for a distribution, or None when it is not installed."""
+    try:
+        files = importlib.metadata.distribution(distribution).files or []
+    except importlib.metadata.PackageNotFoundError:
+        return None
+    size = 0
+    for file in files:
+        path = file.locate()
+        if os.path.isfile(path):
+            size += os.path.getsize(path)
+    return size
+
+
+def dependency_closure(distributions):
+    """The distributions plus every installed distribution they require, without extras."""
+    closure = set()
+    pending = [canonical_name(name) for name in distributions]
+    while pending:
+        name = pending.pop()
+        if name in closure:
+            continue
+        closure.add(name)
+        try:
+            requires = importlib.metadata.requires(name) or []
+        except importlib.metadata.PackageNotFoundError:
+            continue
+        for requirement in requires:
+            if not applies(requirement):
+                continue
+            match = REQUIREMENT_NAME.match(requirement)
+            if match:
+                pending.append(canonical_name(match.group(1)))
+    return closure
+
+
+def total_size(distributions):
+    """(bytes, names not installed) for the dependency closure of distributions."""
+    size = 0
+    missing = []
+    for name in sorted(dependency_closure(distributions)):
+        installed = installed_size(name)
+        if installed is None:
+            missing.append(name)
+        else:
+            size += installed
+    return size, missing
+
+
+def analyze_target(entry_points, search_paths, runtime_provided, declared, installed=None, extras=None):
+    """Returns the report of one target: its requirements and where they come from."""
+    extras = extras or {}
+    local_files, third_party = import_closure(entry_points, search_paths)
+    required, optional, provided = {}, {}, {}
+    for import_name, entry in sorted(third_party.items()):
+        distribution = canonical_name(distribution_for(import_name, installed))
+        if distribution in runtime_provided:
+            provided[distribution] = sorted(entry["importers"])
+        elif entry["optional"] or distribution in extras:
+            optional[distribution] = sorted(entry["importers"])
+        else:
+            required[distribution] = sorted(entry["importers"])
+    size, not_installed = total_size(required)
+    return {
+        "local_modules": len(local_files),
+        "requirements": {name: declared.get(name, name) for name in sorted(required)},
+        "importers": required,
+        "optional": optional,
+        "runtime_provided": provided,
+        "undeclared": sorted(name for name in required if name not in declared),
+        "installed_bytes": size,
+        "not_installed": not_installed,
+    }
+
+
+def mib(size):
+    return f"{size / (1024 * 1024):.1f} MiB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write minimal per-target requirements from static imports.")
+    parser.add_argument("--requirements", default=os.path.join(ROOT, "requirements.txt"))
+    parser.add_argument("--pyproject", default=os.path.join(ROOT, "pyproject.toml"))
+    parser.add_argument("--output-dir", default=os.path.join(ROOT, DEFAULT_OUTPUT_DIR))
+    parser.add_argument("--json", help="Also write the full report as JSON to this file")
+    args = parser.parse_args()
+
+    declared = read_requirements(args.requirements)
+    installed = importlib.metadata.packages_distributions()
+    extras = read_extras(args.pyproject)
+    full_size, full_missing = total_size(declared)
+    print(f"requirements.txt: {len(declared)} distributions, {mib(full_size)} installed"
+          f"{f' ({len(full_missing)} not installed here)' if full_missing else ''}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    report = {"requirements_txt": {"distributions": len(declared), "installed_bytes": full_size}, "targets": {}}
+    for target, (entry_points, search_paths, runtime_provided) in build_targets().items():
+        result = analyze_target(entry_points, search_paths, runtime_provided, declared, installed, extras)
+        report["targets"][target] = result
+
+        output_path = os.path.join(args.output_dir, f"{target}.requirements.txt")
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.writelines(f"{line}\n" for line in result["requirements"].values())
+
+        saving = 1 - result["installed_bytes"] / full_size if full_size else 0
+        print(f"\n{target}: {len(result['requirements'])} requirements from {result['local_modules']} modules, "
+              f"{mib(result['installed_bytes'])} installed ({saving:.0%} smaller), written to {output_path}")
+        for name, importers in result["importers"].items():
+            print(f"  {result['requirements'][name]:<24} imported by {', '.join(importers)}")
+        for label, key in (("optional", "optional"), ("provided by the Lambda runtime", "runtime_provided")):
+            if result[key]:
+                print(f"  {label}: {', '.join(result[key])}")
+        if result["undeclared"]:
+            print(f"  not in requirements.txt: {', '.join(result['undeclared'])}")
+        if result["not_installed"]:
+            print(f"  size unknown, not installed here: {', '.join(result['not_installed'])}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,88 @@
 import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
 import customtkinter as ctk
 from PIL import Image
-from scripts.weather_script import WeatherScript
+from scripts.city_index import shared_city_index
+from scripts.weather_script import WeatherScript, get_resource_path
+from scripts.weather_watchlist import WatchlistScheduler
 
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+WEATHER_ICON_SIZE = (100, 100)
+RESULT_POLL_MS = 50
+AUTOCOMPLETE_DEBOUNCE_MS = 150
+AUTOCOMPLETE_MIN_CHARS = 2
+AUTOCOMPLETE_LIMIT = 5
+WATCHLIST_TICK_MS = 1000
+
+
+class IconImageCache:
+    """Bounded LRU of decoded, pre-scaled weather icons ready to hand to a label."""
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, icon_path, size=WEATHER_ICON_SIZE):
+        """Returns a CTkImage for icon_path at size, decoding the file only on a miss."""
+        key = (icon_path, size)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry[0]
+
+        # The context manager closes the file handle as soon as the pixels are decoded
+        with Image.open(icon_path) as image:
+            image.load()
+            if image.size == size:
+                scaled = image.copy()
+            else:
+                scaled = image.resize(size, Image.LANCZOS)
+
+        ctk_image = ctk.CTkImage(scaled, size=size)
+        self._entries[key] = (ctk_image, scaled)
+        while len(self._entries) > self.max_entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            evicted.close()
+        return ctk_image
+
+    def clear(self):
+        """Releases every cached image."""
+        while self._entries:
+            _, (_, scaled) = self._entries.popitem()
+            scaled.close()
+
+    def __len__(self):
+        return len(self._entries)
+
+
 class WeatherUI:
     def __init__(self, parent):
         self.parent = parent
         self.weather_script = WeatherScript()
+        self.icon_cache = IconImageCache()
+        self.city_index = shared_city_index(get_resource_path(os.path.join("assets", "cities.tsv")))
+        self._autocomplete_job = None
+
+        # Fetches run on worker threads; results come back through this queue and are
+        # applied on the Tk thread. Only the newest request is ever displayed.
+        self._results = queue.Queue()
+        self._latest_request = 0
+        self._pending_requests = 0
+        self._fetch_thread = None
+        self._poll_job = None
+
+        # Watched cities are refreshed by the scheduler rather than by clicks
+        self.watchlist = WatchlistScheduler()
+        self.watch_rows = {}
+        self._watch_results = queue.Queue()
+        self._watch_thread = None
+        self._watch_job = None
 
         self.default_font = ctk.CTkFont(family="Helvetica", size=16)
         self.title_font = ctk.CTkFont(
@@ -33,6 +105,7 @@ class WeatherUI:
         self.dashboard_frame.grid_columnconfigure(1, weight=4)
         self.dashboard_frame.grid_rowconfigure(0, weight=1)
         self.dashboard_frame.grid_rowconfigure(1, weight=4)
+        self.dashboard_frame.grid_rowconfigure(2, weight=2)
 
         # Title label
         self.title_label = ctk.CTkLabel(
@@ -57,17 +130,29 @@ class WeatherUI:
             font=self.default_font,
         )
         self.location_entry.pack(padx=10, pady=5)
+        self.location_entry.bind("<KeyRelease>", self.on_location_key)
+
+        # Autocomplete suggestions, filled in as the user types
+        self.suggestions_frame = ctk.CTkFrame(self.location_frame, fg_color="transparent")
+        self.suggestions_frame.pack(padx=10, pady=0)
+        self.suggestion_buttons = []
 
         self.get_weather_button = ctk.CTkButton(
             self.location_frame,
             text="Get Weather",
             font=self.default_font,
-            command=lambda: self.display_weather(
-                self.weather_script.get_weather(self.location_entry.get())
-            ),
+            command=self.fetch_and_display_weather,
         )
         self.get_weather_button.pack(padx=10, pady=5)
 
+        self.watch_button = ctk.CTkButton(
+            self.location_frame,
+            text="Add to Watchlist",
+            font=self.default_font,
+            command=self.add_to_watchlist,
+        )
+        self.watch_button.pack(padx=10, pady=5)
+
         # Weather Display
         self.weather_frame = ctk.CTkFrame(self.dashboard_frame, corner_radius=10)
         self.weather_frame.grid(column=1, row=1, sticky="nsew", padx=10, pady=10)
@@ -92,17 +177,243 @@ class WeatherUI:
         )
         self.weather_info_label.grid(row=2, column=0, columnspan=2, padx=10, pady=10)
 
+        # Watchlist
+        self.watchlist_frame = ctk.CTkScrollableFrame(
+            self.dashboard_frame, label_text="Watchlist", label_font=self.default_font
+        )
+        self.watchlist_frame.grid(
+            column=0, row=2, columnspan=2, sticky="nsew", padx=10, pady=10
+        )
+
     def fetch_and_display_weather(self):
+        """Starts a weather fetch on a worker thread, superseding any fetch in flight."""
         location = self.location_entry_var.get()
         if not location or not location.strip():
             self.weather_info_label.configure(text="Please enter a valid location.")
             return
+        self.clear_suggestions()
+        location = self.resolve_location(location.strip())
+
+        self._latest_request += 1
+        self._pending_requests += 1
+        request_id = self._latest_request
+        self.set_loading(True, location)
+
+        self._fetch_thread = threading.Thread(
+            target=self._fetch_weather_worker, args=(request_id, location), daemon=True
+        )
+        self._fetch_thread.start()
+        self._schedule_poll()
+
+    def resolve_location(self, location):
+        """Maps the entered text to a known city. Anything else is sent as typed.
+
+        A likely typo is offered as a "Did you mean" suggestion rather than corrected, since
+        the text may name a place the city index does not know.
+        """
+        city = self.city_index.resolve(location)
+        if city is not None:
+            return f"{city.name},{city.country}"
+
+        correction = self.city_index.correction(location)
+        if correction is not None:
+            button = ctk.CTkButton(
+                self.suggestions_frame,
+                text=f"Did you mean {correction.name}, {correction.country}?",
+                font=self.default_font,
+                fg_color="transparent",
+                command=lambda: self.select_suggestion(correction),
+            )
+            button.pack(fill="x", pady=1)
+            self.suggestion_buttons.append(button)
+        return location
+
+    def on_location_key(self, event=None):
+        """Debounces autocomplete so suggestions are only computed once typing pauses."""
+        if self._autocomplete_job is not None:
+            self.parent.after_cancel(self._autocomplete_job)
+        self._autocomplete_job = self.parent.after(
+            AUTOCOMPLETE_DEBOUNCE_MS, self.update_suggestions
+        )
+
+    def update_suggestions(self):
+        """Shows city suggestions for the current entry text."""
+        self._autocomplete_job = None
+        self.clear_suggestions()
+
+        query = self.location_entry_var.get() or ""
+        if len(query.strip()) < AUTOCOMPLETE_MIN_CHARS:
+            return
+
+        for city in self.city_index.suggest(query, limit=AUTOCOMPLETE_LIMIT):
+            button = ctk.CTkButton(
+                self.suggestions_frame,
+                text=f"{city.name}, {city.country}",
+                font=self.default_font,
+                fg_color="transparent",
+                command=lambda selected=city: self.select_suggestion(selected),
+            )
+            button.pack(fill="x", pady=1)
+            self.suggestion_buttons.append(button)
+
+    def clear_suggestions(self):
+        for button in self.suggestion_buttons:
+            button.destroy()
+        self.suggestion_buttons = []
+
+    def select_suggestion(self, city):
+        """Fills the entry with the chosen city and fetches its weather."""
+        self.location_entry_var.set(f"{city.name}, {city.country}")
+        self.clear_suggestions()
+        self.fetch_and_display_weather()
+
+    def _fetch_weather_worker(self, request_id, location):
+        """Runs on a worker thread and must not touch any widgets."""
         try:
-            weather_data = self.weather_script.get_weather(location.strip())
+            weather_data = self.weather_script.get_weather(location)
         except Exception as e:
-            weather_data = "error"
+            weather_data = {"error": "Exception occurred while fetching data"}
             logging.error(f"Error fetching weather data: {e}")
-        self.display_weather(weather_data)
+        self._results.put((request_id, weather_data))
+
+    def _schedule_poll(self):
+        if self._poll_job is None:
+            self._poll_job = self.parent.after(RESULT_POLL_MS, self._poll_results)
+
+    def _poll_results(self):
+        """Applies finished fetches on the Tk thread, dropping superseded responses."""
+        self._poll_job = None
+        while True:
+            try:
+                request_id, weather_data = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending_requests -= 1
+            if request_id != self._latest_request:
+                logging.debug(f"Dropping superseded weather response for request {request_id}")
+                continue
+            self.set_loading(False)
+            self.display_weather(weather_data)
+
+        if self._pending_requests > 0:
+            self._schedule_poll()
+
+    def add_to_watchlist(self):
+        """Adds the entered location to the watchlist, where it is refreshed automatically."""
+        location = self.location_entry_var.get()
+        if not location or not location.strip():
+            self.weather_info_label.configure(text="Please enter a valid location.")
+            return
+        self.clear_suggestions()
+        location = self.resolve_location(location.strip())
+        if location in self.watch_rows:
+            return
+
+        row = ctk.CTkFrame(self.watchlist_frame)
+        row.pack(fill="x", padx=5, pady=2)
+        label = ctk.CTkLabel(
+            row, text=f"{location}: loading...", font=self.default_font, anchor="w"
+        )
+        label.pack(side="left", fill="x", expand=True, padx=5)
+        remove_button = ctk.CTkButton(
+            row,
+            text="Remove",
+            width=70,
+            font=self.default_font,
+            command=lambda: self.remove_from_watchlist(location),
+        )
+        remove_button.pack(side="right", padx=5)
+
+        self.watch_rows[location] = (row, label)
+        self.watchlist.add(location)
+        self._schedule_watch_tick()
+
+    def remove_from_watchlist(self, location):
+        row, _ = self.watch_rows.pop(location, (None, None))
+        if row is not None:
+            row.destroy()
+        self.watchlist.remove(location)
+
+    def _schedule_watch_tick(self):
+        if self._watch_job is None and self.watch_rows:
+            self._watch_job = self.parent.after(WATCHLIST_TICK_MS, self._watchlist_tick)
+
+    def _watchlist_tick(self):
+        """Applies finished refreshes, then starts the ones the scheduler says are due."""
+        self._watch_job = None
+        while True:
+            try:
+                location, weather_data = self._watch_results.get_nowait()
+            except queue.Empty:
+                break
+            self.watchlist.record(location, weather_data)
+            if location in self.watch_rows:
+                self.display_watched(location, weather_data)
+
+        for location, (row, _) in self.watch_rows.items():
+            self.watchlist.set_visible(location, self._row_visible(row))
+
+        # One refresh batch at a time; anything due meanwhile waits for the next tick
+        if self._watch_thread is None or not self._watch_thread.is_alive():
+            due = self.watchlist.due()
+            if due:
+                self._watch_thread = threading.Thread(
+                    target=self._refresh_watched_worker, args=(due,), daemon=True
+                )
+                self._watch_thread.start()
+
+        self._schedule_watch_tick()
+
+    def _refresh_watched_worker(self, locations):
+        """Runs on a worker thread and must not touch any widgets.
+
+        Refreshes revalidate with the upstream instead of serving stale cache entries, so the
+        scheduler sees each new observation as soon as it is published.
+        """
+        pending = set(locations)
+        try:
+            for location, weather_data in self.weather_script.get_weather_many(
+                locations, revalidate=True
+            ):
+                pending.discard(location)
+                self._watch_results.put((location, weather_data))
+        except Exception as e:
+            logging.error(f"Error refreshing watched weather: {e}")
+        for location in pending:
+            self._watch_results.put((location, {"error": "Exception occurred while fetching data"}))
+
+    def _row_visible(self, row):
+        """Whether a watchlist row is on screen: mapped and inside the scrolled viewport."""
+        try:
+            if not row.winfo_viewable():
+                return False
+            # The scrollable frame itself grows with its rows; the canvas it is drawn on is
+            # the viewport
+            viewport = self.watchlist_frame._parent_canvas
+            top = viewport.winfo_rooty()
+            bottom = top + viewport.winfo_height()
+            row_top = row.winfo_rooty()
+            return row_top < bottom and row_top + row.winfo_height() > top
+        except Exception:
+            # Widgets that are being torn down cannot be measured; keep refreshing them
+            return True
+
+    def display_watched(self, location, weather_data):
+        _, label = self.watch_rows[location]
+        if "error" in weather_data:
+            label.configure(text=f"{location}: unavailable")
+        else:
+            label.configure(
+                text=f"{location}: {weather_data['temperature']:.1f} °C, {weather_data['description']}"
+            )
+
+    def set_loading(self, loading, location=None):
+        """Shows or clears the loading state while a fetch is running."""
+        if loading:
+            self.weather_info_label.configure(text=f"Loading weather for {location}...")
+            self.get_weather_button.configure(text="Loading...")
+        else:
+            self.get_weather_button.configure(text="Get Weather")
 
     def display_weather(self, weather_data):
         if "error" in weather_data:
@@ -121,8 +432,7 @@ class WeatherUI:
         # Update weather icon
         try:
             if weather_data.get("icon_path"):
-                image = Image.open(weather_data["icon_path"])
-                weather_icon_image = ctk.CTkImage(image, size=(100, 100))
+                weather_icon_image = self.icon_cache.get(weather_data["icon_path"])
                 self.weather_icon.configure(image=weather_icon_image)
             else:
                 self.weather_icon.configure(image=None)
@@ -132,3 +442,18 @@ class WeatherUI:
         except Exception as e:
             logging.error(f"Error loading weather icon: {e}")
             self.weather_icon.configure(image=None)
+
+    def cleanup(self):
+        """Stops pending callbacks and releases cached icon images when the UI is torn down."""
+        if self._poll_job is not None:
+            self.parent.after_cancel(self._poll_job)
+            self._poll_job = None
+        if self._autocomplete_job is not None:
+            self.parent.after_cancel(self._autocomplete_job)
+            self._autocomplete_job = None
+        if self._watch_job is not None:
+            self.parent.after_cancel(self._watch_job)
+            self._watch_job = None
+        # Any fetch still in flight finishes on its own thread and is never displayed
+        self._latest_request += 1
+        self.icon_cache.clear()
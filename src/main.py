@@ -1,7 +1,10 @@
 import customtkinter as ctk
 from gui.main_window import MainWindow
+from scripts.weather_script import prefetch_icons
 
 def main():
+    # Fill in any weather icons missing from the bundle without delaying startup
+    prefetch_icons()
     root = ctk.CTk()
     app = MainWindow(root)
     root.mainloop()
@@ -0,0 +1,53 @@
+import json
+import logging
+from io import BytesIO
+
+from PIL import Image
+
+from scripts import http_transport
+from scripts.recipe_script import RecipeScript
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
+
+
+class AsyncRecipeScript:
+    """asyncio counterpart of RecipeScript built on httpx. Results match RecipeScript's."""
+
+    def __init__(self, client=None):
+        self.recipe_script = RecipeScript()
+        self.client = client if client is not None else http_transport.build_async_client()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def get_recipes(self, ingredients, number=1):
+        params = self.recipe_script._recipe_params(ingredients, number)
+        try:
+            response = await self.client.get(f"{self.recipe_script.base_url}/recipe", params=params)
+            return self.recipe_script._handle_recipes_response(response)
+        except Exception as e:
+            logging.error(f"Exception occurred while finding recipes: {e}")
+            return json.dumps({"error": "Error finding recipes."})
+
+    async def get_recipe_image(self, image_url):
+        if image_url:
+            try:
+                response = await self.client.get(image_url)
+                response.raise_for_status()
+                return Image.open(BytesIO(response.content))
+            except Exception as e:
+                logging.error(f"Error fetching recipe image: {e}")
+                return json.dumps({"error": "Error fetching recipe image."})
+        else:
+            logging.warning("No image URL provided for recipe.")
+            return json.dumps({"error": "No image URL provided for recipe."})
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+
+import httpx
+
+from scripts import http_transport
+from scripts.weather_script import (
+    DEFAULT_BATCH_WORKERS,
+    ICON_CODE_PATTERN,
+    ICON_URL_TEMPLATE,
+    MAX_ICON_BYTES,
+    WeatherScript,
+    store_icon,
+)
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
+
+
+class AsyncWeatherScript:
+    """asyncio counterpart of WeatherScript built on httpx. Results match WeatherScript's.
+
+    The cache policy, canonicalization and result building are those of a WeatherScript it
+    holds; only the requests, icon downloads included, go through the httpx client.
+    """
+
+    def __init__(self, cache=None, client=None, icon_index=None, canonicalizer=None):
+        self.weather_script = WeatherScript(
+            cache=cache, icon_index=icon_index, canonicalizer=canonicalizer
+        )
+        self.client = client if client is not None else http_transport.build_async_client()
+        self._refreshes = {}
+        self._icon_downloads = {}
+
+    @property
+    def cache(self):
+        return self.weather_script.cache
+
+    @property
+    def icon_index(self):
+        return self.weather_script.icon_index
+
+    @property
+    def canonicalizer(self):
+        return self.weather_script.canonicalizer
+
+    @property
+    def cache_stats(self):
+        return self.weather_script.cache_stats
+
+    def get_stats(self):
+        return self.weather_script.get_stats()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Waits for background refreshes and icon downloads and closes the HTTP client."""
+        tasks = list(self._refreshes.values()) + list(self._icon_downloads.values())
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await self.client.aclose()
+
+    async def get_weather(self, location):
+        """Returns weather for location, using the same cache policy as WeatherScript."""
+        canonical = self.canonicalizer.canonicalize(location)
+        key = canonical.key
+        entry = self.cache.get(key)
+
+        if entry is not None and self.cache.is_fresh(entry):
+            logging.debug(f"Weather cache hit for location: {key}")
+            self.cache_stats["fresh_hits"] += 1
+            return self.weather_script._with_icon(entry.value)
+
+        if entry is not None and self.cache.is_servable(entry):
+            logging.debug(f"Serving stale weather for location: {key}, refreshing in background")
+            self.cache_stats["stale_hits"] += 1
+            self._refresh_in_background(key, canonical, entry)
+            return self.weather_script._with_icon(entry.value)
+
+        self.cache_stats["misses"] += 1
+        result = await self._fetch_and_cache(key, canonical, entry)
+        if "error" in result and entry is not None:
+            logging.warning(f"Upstream failed for location: {key}, serving stale weather")
+            self.cache_stats["stale_on_error"] += 1
+            return self.weather_script._with_icon(entry.value)
+        return self.weather_script._with_icon(result)
+
+    async def get_weather_many(self, locations, max_concurrency=DEFAULT_BATCH_WORKERS):
+        """Fetches many locations concurrently, yielding (location, result) as they complete."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(location):
+            async with semaphore:
+                try:
+                    return location, await self.get_weather(location)
+                except Exception as e:
+                    logging.error(f"Exception during batch request for '{location}': {e}")
+                    return location, {"error": "Exception occurred while fetching data"}
+
+        tasks = [asyncio.create_task(fetch(location)) for location in locations]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_and_cache(self, key, canonical, entry=None):
+        cached = entry.value if entry is not None else None
+        result = await self._fetch_weather(canonical, cached)
+        if result is cached:
+            self.cache_stats["revalidated"] += 1
+        if "error" not in result:
+            self.cache.set(key, result)
+        return result
+
+    def _refresh_in_background(self, key, canonical, entry=None):
+        """Schedules a refresh task for key unless one is already in flight."""
+        if key in self._refreshes:
+            return
+        task = asyncio.create_task(self._fetch_and_cache(key, canonical, entry))
+        self._refreshes[key] = task
+        task.add_done_callback(lambda _: self._refreshes.pop(key, None))
+
+    async def _fetch_weather(self, canonical, cached=None):
+        params = self.weather_script._request_params(canonical)
+        location = canonical.query
+        logging.debug(f"Requesting weather data for location: {location}")
+
+        try:
+            response = await self.client.get(
+                self.weather_script.base_url,
+                params=params,
+                headers=self.weather_script._conditional_headers(cached),
+            )
+            if response.status_code == 304 and cached is not None:
+                logging.debug(f"Weather for location: {location} unchanged since {cached['observed_at']}")
+                return cached
+            if response.status_code == 200:
+                data = response.json()
+                logging.debug(f"Weather Data Received: {data}")
+                # As in WeatherScript, a missing icon downloads in the background
+                icon_path = await self.get_icon_path(data["weather"][0]["icon"], wait=False)
+                return self.weather_script._build_weather_result(data, icon_path)
+            return self.weather_script._weather_error(response.status_code, location)
+        except httpx.HTTPError as e:
+            logging.error(f"HTTPError during API request: {e}")
+            return {"error": "Request exception occurred while fetching data"}
+        except Exception as e:
+            logging.error(f"Exception during API request: {e}")
+            return {"error": "Exception occurred while fetching data"}
+
+    async def get_icon_path(self, icon_code, wait=True):
+        """Returns the local icon path, downloading the icon without blocking the event loop.
+
+        With wait=False a missing icon is downloaded in a background task and None is
+        returned straight away.
+        """
+        icon_path = self.icon_index.lookup(icon_code)
+        if icon_path:
+            return icon_path
+
+        if not ICON_CODE_PATTERN.match(icon_code):
+            logging.error(f"Invalid icon code format: {icon_code}")
+            return None
+
+        if not wait:
+            if icon_code not in self._icon_downloads:
+                task = asyncio.create_task(self._download_icon(icon_code))
+                self._icon_downloads[icon_code] = task
+                task.add_done_callback(lambda _: self._icon_downloads.pop(icon_code, None))
+            return None
+        return await self._download_icon(icon_code)
+
+    async def _download_icon(self, icon_code):
+        try:
+            response = await self.client.get(ICON_URL_TEMPLATE.format(icon_code=icon_code))
+            if response.status_code == 200 and len(response.content) < MAX_ICON_BYTES:
+                return store_icon(icon_code, response.content, self.icon_index)
+            logging.error(f"Error fetching icon: {response.status_code}")
+            return None
+        except Exception as e:
+            logging.error(f"Exception during icon download: {e}")
+            return None
@@ -0,0 +1,226 @@
+import bisect
+import heapq
+import logging
+import threading
+import unicodedata
+from collections import namedtuple
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DEFAULT_SUGGESTION_LIMIT = 8
+MAX_TYPO_DISTANCE = 1  # Edits tolerated by fuzzy lookups; the delete index grows quickly beyond 1
+
+City = namedtuple("City", ["key", "name", "country", "population", "city_id"])
+
+
+def normalize_city_name(name):
+    """Folds accents, case, punctuation and whitespace into a lookup key."""
+    decomposed = unicodedata.normalize("NFKD", str(name))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    cleaned = "".join(ch if ch.isalnum() else " " for ch in stripped.casefold())
+    return " ".join(cleaned.split())
+
+
+def split_country(query):
+    """Splits "Paris, FR" into ("Paris", "FR"). The country is None when absent."""
+    name, sep, country = str(query).rpartition(",")
+    country = country.strip()
+    if sep and len(country) == 2 and country.isalpha():
+        return name, country.upper()
+    return str(query), None
+
+
+def edit_distance(a, b, max_distance):
+    """Optimal string alignment distance, or max_distance + 1 once it is exceeded."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (
+                previous_previous is not None
+                and i > 1
+                and j > 1
+                and a[i - 1] == b[j - 2]
+                and a[i - 2] == b[j - 1]
+            ):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+
+def _deletes(key):
+    return {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+class CityIndex:
+    """Offline city lookup for autocomplete and typo-tolerant resolution.
+
+    Cities are held in a list sorted by normalized name so prefix queries are a bisect plus
+    a scan of the matching range. Typo tolerance uses a symmetric delete index that is built
+    on the first fuzzy lookup.
+    """
+
+    def __init__(self, cities=()):
+        self._cities = sorted(cities, key=lambda city: (city.key, -city.population))
+        self._keys = [city.key for city in self._cities]
+        self._delete_index = None
+        self._delete_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        """Loads an index file written by build_city_index_tool.py. Missing or bad files give an empty index."""
+        cities = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip() or line.startswith("#"):
+                        continue
+                    fields = line.rstrip("\n").split("\t")
+                    if len(fields) < 4:
+                        continue
+                    key, name, country, population = fields[:4]
+                    city_id = fields[4] if len(fields) > 4 and fields[4] else None
+                    try:
+                        cities.append(City(key, name, country, int(population), city_id))
+                    except ValueError:
+                        continue
+        except OSError as e:
+            logging.error(f"Could not load city index from {path}: {e}")
+        logging.debug(f"Loaded {len(cities)} cities from: {path}")
+        return cls(cities)
+
+    def save(self, path):
+        """Writes the index as tab-separated rows sorted by key, the format load() reads."""
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write("# key\tname\tcountry\tpopulation\tcity_id\n")
+            for city in self._cities:
+                f.write(
+                    f"{city.key}\t{city.name}\t{city.country}\t{city.population}\t{city.city_id or ''}\n"
+                )
+
+    @staticmethod
+    def make_city(name, country, population, city_id=None):
+        return City(normalize_city_name(name), name, country, int(population), city_id)
+
+    def prefix(self, query, limit=DEFAULT_SUGGESTION_LIMIT, country=None):
+        """Returns the most populous cities whose name starts with query."""
+        key = normalize_city_name(query)
+        if not key:
+            return []
+        start = bisect.bisect_left(self._keys, key)
+        end = bisect.bisect_left(self._keys, key + "\uffff", lo=start)
+        matches = self._cities[start:end]
+        if country:
+            matches = [city for city in matches if city.country == country]
+        return heapq.nlargest(limit, matches, key=lambda city: city.population)
+
+    def fuzzy(self, query, limit=DEFAULT_SUGGESTION_LIMIT, country=None):
+        """Returns cities within MAX_TYPO_DISTANCE edits of query, closest and largest first."""
+        scored = self._fuzzy_scored(normalize_city_name(query), country)
+        return [self._cities[position] for _, _, position in scored[:limit]]
+
+    def _fuzzy_scored(self, key, country):
+        if not key:
+            return []
+        delete_index = self._get_delete_index()
+
+        candidates = set(delete_index.get(key, ()))
+        for variant in _deletes(key):
+            candidates.update(delete_index.get(variant, ()))
+
+        scored = []
+        for position in candidates:
+            city = self._cities[position]
+            if country and city.country != country:
+                continue
+            distance = edit_distance(key, city.key, MAX_TYPO_DISTANCE)
+            if distance <= MAX_TYPO_DISTANCE:
+                scored.append((distance, -city.population, position))
+        scored.sort()
+        return scored
+
+    def suggest(self, query, limit=DEFAULT_SUGGESTION_LIMIT):
+        """Autocomplete suggestions: prefix matches first, then typo-tolerant matches."""
+        name, country = split_country(query)
+        suggestions = self.prefix(name, limit, country)
+        if len(suggestions) < limit:
+            for city in self.fuzzy(name, limit, country):
+                if city not in suggestions:
+                    suggestions.append(city)
+        return suggestions[:limit]
+
+    def resolve(self, query):
+        """Returns the largest city named exactly query, or None when no city has that name."""
+        name, country = split_country(query)
+        key = normalize_city_name(name)
+        if not key:
+            return None
+
+        start = bisect.bisect_left(self._keys, key)
+        end = bisect.bisect_right(self._keys, key, lo=start)
+        exact = [
+            city for city in self._cities[start:end] if not country or city.country == country
+        ]
+        if exact:
+            return max(exact, key=lambda city: city.population)
+        return None
+
+    def correction(self, query):
+        """Returns the city a misspelled query most likely means, or None when it is ambiguous.
+
+        Only a suggestion: a close name can just as well be a real place missing from the index.
+        """
+        name, country = split_country(query)
+        scored = self._fuzzy_scored(normalize_city_name(name), country)
+        if not scored:
+            return None
+        # Only correct a typo when every closest match spells the same name
+        best_distance = scored[0][0]
+        closest_keys = {
+            self._cities[position].key
+            for distance, _, position in scored
+            if distance == best_distance
+        }
+        if len(closest_keys) == 1:
+            return self._cities[scored[0][2]]
+        return None
+
+    def _get_delete_index(self):
+        with self._delete_lock:
+            if self._delete_index is None:
+                delete_index = {}
+                for position, key in enumerate(self._keys):
+                    delete_index.setdefault(key, []).append(position)
+                    for variant in _deletes(key):
+                        delete_index.setdefault(variant, []).append(position)
+                self._delete_index = delete_index
+            return self._delete_index
+
+    def __len__(self):
+        return len(self._cities)
+
+
+_shared_indexes = {}
+_shared_lock = threading.Lock()
+
+
+def shared_city_index(path):
+    """Returns the process-wide city index loaded from path."""
+    with _shared_lock:
+        index = _shared_indexes.get(path)
+        if index is None:
+            index = CityIndex.load(path)
+            _shared_indexes[path] = index
+        return index
@@ -0,0 +1,138 @@
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logging.getLogger("urllib3").setLevel(logging.WARNING)
+logging.getLogger("requests").setLevel(logging.WARNING)
+
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF_FACTOR = 0.3
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+
+class HttpTransport:
+    """Keeps one keep-alive connection pool per host and applies shared timeouts and retries."""
+
+    def __init__(
+        self,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+        read_timeout=DEFAULT_READ_TIMEOUT,
+        retries=DEFAULT_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+    ):
+        self.pool_maxsize = pool_maxsize
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _build_session(self):
+        """Creates a session whose adapter retries idempotent GETs on connection errors and 5xx."""
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=retry
+        )
+        session = requests.Session()
+        # Every encoding urllib3 can decode here (br only when brotli is installed), so the
+        # proxies' compressed responses are decoded transparently
+        session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def session_for(self, url):
+        """Returns the pooled session for the host of the given URL, creating it on first use."""
+        parts = urlsplit(url)
+        host_key = f"{parts.scheme}://{parts.netloc}".lower()
+
+        with self._lock:
+            session = self._sessions.get(host_key)
+            if session is None:
+                session = self._build_session()
+                self._sessions[host_key] = session
+                logging.debug(f"Created pooled HTTP session for host: {host_key}")
+            return session
+
+    def get(self, url, **kwargs):
+        """Sends a GET request over the pooled session for the URL's host."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session_for(url).get(url, **kwargs)
+
+    def close(self):
+        """Closes every pooled session and drops their connections."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+
+def get_transport():
+    """Returns the process-wide transport shared by every script."""
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HttpTransport()
+        return _default_transport
+
+
+def configure(**kwargs):
+    """Replaces the shared transport with one built from the given settings."""
+    global _default_transport
+    with _default_lock:
+        previous = _default_transport
+        _default_transport = HttpTransport(**kwargs)
+    if previous is not None:
+        previous.close()
+    return _default_transport
+
+
+def get(url, **kwargs):
+    """Sends a GET request through the shared transport."""
+    return get_transport().get(url, **kwargs)
+
+
+def build_async_client(
+    pool_maxsize=DEFAULT_POOL_MAXSIZE,
+    connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+    read_timeout=DEFAULT_READ_TIMEOUT,
+    retries=DEFAULT_RETRIES,
+):
+    """Creates an httpx.AsyncClient with the same pool, timeout and retry defaults."""
+    import httpx  # Optional dependency, only needed by the async script variants
+
+    # httpx ignores the client's limits when it is given a transport, so they go on the transport
+    transport = httpx.AsyncHTTPTransport(
+        retries=retries,
+        limits=httpx.Limits(
+            max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize
+        ),
+    )
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        transport=transport,
+    )
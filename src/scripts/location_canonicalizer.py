@@ -0,0 +1,123 @@
+import logging
+import threading
+from collections import Counter, namedtuple
+
+from scripts.city_index import normalize_city_name, split_country
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Keep these tables in sync with lambda/weather/locations.py so the client and the proxy
+# agree on canonical keys; tests/unit/lambdas/test_locations.py checks that they do.
+COUNTRY_ALIASES = {
+    "usa": "US",
+    "united states": "US",
+    "united states of america": "US",
+    "america": "US",
+    "uk": "GB",
+    "united kingdom": "GB",
+    "great britain": "GB",
+    "england": "GB",
+    "scotland": "GB",
+    "wales": "GB",
+    "canada": "CA",
+    "france": "FR",
+    "germany": "DE",
+    "deutschland": "DE",
+    "spain": "ES",
+    "italy": "IT",
+    "japan": "JP",
+    "china": "CN",
+    "india": "IN",
+    "brazil": "BR",
+    "mexico": "MX",
+    "australia": "AU",
+    "iceland": "IS",
+}
+
+CITY_ALIASES = {
+    "nyc": "new york",
+    "new york city": "new york",
+    "la": "los angeles",
+    "sf": "san francisco",
+    "washington dc": "washington",
+    "washington d c": "washington",
+    "st petersburg": "saint petersburg",
+    "bombay": "mumbai",
+    "calcutta": "kolkata",
+    "madras": "chennai",
+    "peking": "beijing",
+    "kiev": "kyiv",
+    "saigon": "ho chi minh city",
+    "rangoon": "yangon",
+}
+
+CanonicalLocation = namedtuple("CanonicalLocation", ["key", "query", "city_id"])
+
+
+def parse_location(location):
+    """Folds a free-form location into (name, country) with aliases applied.
+
+    The country is an ISO 3166 alpha-2 code, or None when none was given.
+    """
+    name, country = split_country(location)
+    if country is None and "," in name:
+        # Spelled-out countries such as "New York, USA" or "London, United Kingdom"
+        head, _, tail = name.rpartition(",")
+        alias = COUNTRY_ALIASES.get(normalize_city_name(tail))
+        if alias:
+            name, country = head, alias
+
+    name = normalize_city_name(name)
+    return CITY_ALIASES.get(name, name), country
+
+
+def location_key(name, country=None, city_id=None):
+    """Builds the cache and deduplication key for a canonical location."""
+    if city_id:
+        return f"id:{city_id}"
+    return f"{name},{country.lower()}" if country else name
+
+
+class LocationCanonicalizer:
+    """Turns user-entered locations into stable keys for caching and request deduplication.
+
+    Case, whitespace, accents, city aliases and country suffixes are folded. With a city
+    index, exact city names are also mapped to the most populous match and its city ID.
+    """
+
+    def __init__(self, city_index=None):
+        self.city_index = city_index
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def canonicalize(self, location):
+        name, country = parse_location(location)
+
+        city = None
+        if self.city_index is not None and name:
+            city = self.city_index.resolve(f"{name},{country}" if country else name)
+
+        if city is not None:
+            canonical = CanonicalLocation(
+                location_key(city.key, city.country, city.city_id),
+                f"{city.name},{city.country}",
+                city.city_id,
+            )
+        else:
+            canonical = CanonicalLocation(
+                location_key(name, country),
+                f"{name},{country}" if country else name,
+                None,
+            )
+
+        with self._lock:
+            self.stats["lookups"] += 1
+            if canonical.key != " ".join(str(location).split()):
+                self.stats["rewritten"] += 1
+            if city is not None:
+                self.stats["resolved"] += 1
+            if canonical.city_id:
+                self.stats["resolved_ids"] += 1
+        return canonical
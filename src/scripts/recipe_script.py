@@ -1,7 +1,7 @@
 import json
 import os
-import requests
 import logging
+from scripts import http_transport
 from PIL import Image
 from io import BytesIO
 
@@ -42,33 +42,39 @@ class RecipeScript:
             raise Exception(f"An error occurred while loading configuration: {e}")
 
     def get_recipes(self, ingredients, number=1):
-        params = {
+        params = self._recipe_params(ingredients, number)
+        try:
+            response = http_transport.get(f"{self.base_url}/recipe", params=params)
+            return self._handle_recipes_response(response)
+        except Exception as e:
+            logging.error(f"Exception occurred while finding recipes: {e}")
+            return json.dumps({"error": "Error finding recipes."})
+
+    def _recipe_params(self, ingredients, number):
+        return {
             "ingredients": ingredients,
             "number": number,
             "ignorePantry": str(self.ignore_pantry).lower(),
             "ranking": self.MAXIMIZE_USED_INGREDIENTS,
         }
-        try:
-            response = requests.get(f"{self.base_url}/recipe", params=params)
-            if response.status_code == 200:
-                data = response.json()
-                logging.debug(f"Recipes found: {data}")
-                if data:
-                    return data
-                else:
-                    return json.dumps({"error": "No recipes found."})
+
+    def _handle_recipes_response(self, response):
+        if response.status_code == 200:
+            data = response.json()
+            logging.debug(f"Recipes found: {data}")
+            if data:
+                return data
             else:
-                response.raise_for_status()
-                logging.error(f"Error finding recipes: {response.status_code}")
-        except Exception as e:
-            logging.error(f"Exception occurred while finding recipes: {e}")
-            return json.dumps({"error": "Error finding recipes."})
+                return json.dumps({"error": "No recipes found."})
+        else:
+            response.raise_for_status()
+            logging.error(f"Error finding recipes: {response.status_code}")
 
     def get_recipe_image(self, image_url):
         if image_url:
 
             try:
-                response = requests.get(image_url)
+                response = http_transport.get(image_url)
                 response.raise_for_status()
                 image_data = BytesIO(response.content)
                 pil_image = Image.open(image_data)
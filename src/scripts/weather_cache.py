@@ -0,0 +1,127 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DEFAULT_TTL = 600  # Seconds a cached observation is served without revalidation
+DEFAULT_STALE_TTL = 3600  # Extra seconds a stale observation is served while it is refreshed
+DEFAULT_MAX_ENTRIES = 128
+
+
+class CacheEntry:
+    def __init__(self, value, stored_at):
+        self.value = value
+        self.stored_at = stored_at
+
+    def age(self, now):
+        return now - self.stored_at
+
+
+class WeatherCache:
+    """LRU cache of weather results with TTL, stale-while-revalidate and optional SQLite backing."""
+
+    def __init__(
+        self,
+        ttl=DEFAULT_TTL,
+        stale_ttl=DEFAULT_STALE_TTL,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        db_path=None,
+        clock=time.time,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS weather_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            logging.debug(f"Weather cache backed by SQLite at: {db_path}")
+
+    def get(self, key):
+        """Returns the cached entry for key, or None. Stale entries are returned too."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+            entry = self._load(key)
+            if entry is not None:
+                self._remember(key, entry)
+            return entry
+
+    def set(self, key, value):
+        """Stores value under key, evicting the least recently used entry when full."""
+        entry = CacheEntry(value, self.clock())
+        with self._lock:
+            self._remember(key, entry)
+            self._store(key, entry)
+
+    def is_fresh(self, entry):
+        return entry.age(self.clock()) <= self.ttl
+
+    def is_servable(self, entry):
+        """Whether a stale entry is still young enough to serve while it is revalidated."""
+        return entry.age(self.clock()) <= self.ttl + self.stale_ttl
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM weather_cache")
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            logging.debug(f"Evicted weather cache entry: {evicted_key}")
+
+    def _load(self, key):
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT value, stored_at FROM weather_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1])
+
+    def _store(self, key, entry):
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO weather_cache (key, value, stored_at) VALUES (?, ?, ?)",
+            (key, json.dumps(entry.value), entry.stored_at),
+        )
+        # Keep the on-disk table bounded the same way as the in-memory LRU
+        self._db.execute(
+            "DELETE FROM weather_cache WHERE key NOT IN "
+            "(SELECT key FROM weather_cache ORDER BY stored_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        self._db.commit()
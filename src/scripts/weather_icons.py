@@ -0,0 +1,114 @@
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+ICON_FILE_PATTERN = re.compile(r'^weather_icon_([0-9]{2}[dn])\.png$')
+ALL_ICON_CODES = tuple(
+    f"{number}{period}"
+    for number in ("01", "02", "03", "04", "09", "10", "11", "13", "50")
+    for period in ("d", "n")
+)
+PREFETCH_WORKERS = 6
+
+
+class IconIndex:
+    """In-memory map of OpenWeather icon code to local icon file path.
+
+    The icon directory is scanned once when the index is created. Lookups never touch the
+    filesystem, and new icons are published by swapping in a new mapping so readers on
+    other threads always see a complete, consistent index.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._paths = {}
+        self._write_lock = threading.Lock()
+        self._downloads = {}
+        self._executor = None
+        self.scan()
+
+    def scan(self):
+        """Rebuilds the index from the icons currently on disk."""
+        paths = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    match = ICON_FILE_PATTERN.match(entry.name)
+                    if match and entry.is_file():
+                        paths[match.group(1)] = entry.path
+        except OSError as e:
+            logging.debug(f"Could not scan weather icon directory {self.directory}: {e}")
+
+        with self._write_lock:
+            self._paths = paths
+        logging.debug(f"Indexed {len(paths)} weather icons in: {self.directory}")
+
+    def lookup(self, icon_code):
+        """Returns the indexed path for icon_code, or None when it is not available locally."""
+        return self._paths.get(icon_code)
+
+    def add(self, icon_code, icon_path):
+        """Publishes a newly stored icon."""
+        with self._write_lock:
+            paths = dict(self._paths)
+            paths[icon_code] = icon_path
+            self._paths = paths
+
+    def path_for(self, icon_code):
+        """Returns where the icon for icon_code is stored, whether or not it exists yet."""
+        return os.path.join(self.directory, f"weather_icon_{icon_code}.png")
+
+    def fetch_in_background(self, icon_code, fetch):
+        """Runs fetch(icon_code) on the index's download pool unless it is already pending."""
+        with self._write_lock:
+            future = self._downloads.get(icon_code)
+            if future is not None and not future.done():
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=PREFETCH_WORKERS, thread_name_prefix="weather-icon"
+                )
+            future = self._executor.submit(fetch, icon_code)
+            self._downloads[icon_code] = future
+            return future
+
+    def prefetch(self, fetch, codes=ALL_ICON_CODES):
+        """Starts fetching every code missing from the index in parallel.
+
+        Returns a dict of icon code to future for the downloads that were started.
+        """
+        missing = [icon_code for icon_code in codes if icon_code not in self]
+        if missing:
+            logging.debug(f"Prefetching {len(missing)} missing weather icons: {missing}")
+        return {
+            icon_code: self.fetch_in_background(icon_code, fetch) for icon_code in missing
+        }
+
+    def codes(self):
+        return set(self._paths)
+
+    def __contains__(self, icon_code):
+        return icon_code in self._paths
+
+    def __len__(self):
+        return len(self._paths)
+
+
+_shared_indexes = {}
+_shared_lock = threading.Lock()
+
+
+def shared_index(directory):
+    """Returns the process-wide index for directory, scanning it on first use."""
+    with _shared_lock:
+        index = _shared_indexes.get(directory)
+        if index is None:
+            index = IconIndex(directory)
+            _shared_indexes[directory] = index
+        return index
@@ -4,6 +4,14 @@ import requests
 import logging
 import os
 import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from scripts import http_transport
+from scripts.city_index import shared_city_index
+from scripts.location_canonicalizer import LocationCanonicalizer
+from scripts.weather_cache import WeatherCache
+from scripts.weather_icons import ALL_ICON_CODES, shared_index
 
 logging.basicConfig(
     level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -11,6 +19,14 @@ logging.basicConfig(
 logging.getLogger("urllib3").setLevel(logging.WARNING)
 logging.getLogger("requests").setLevel(logging.WARNING)
 
+DEFAULT_BATCH_WORKERS = 8
+ICON_CODE_PATTERN = re.compile(r'^[0-9]{2}[dn]$')
+ICON_URL_TEMPLATE = "https://openweathermap.org/img/wn/{icon_code}@2x.png"
+MAX_ICON_BYTES = 100000
+# Only what _build_weather_result reads; the proxy drops everything else from the response
+WEATHER_FIELDS = "dt,weather.main,weather.description,weather.icon,main.temp,main.humidity"
+
+
 def get_resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
     if getattr(sys, 'frozen', False):
@@ -23,8 +39,75 @@ def get_resource_path(relative_path):
         return os.path.join(base_path, "src", relative_path)
 
 
+def default_icon_index():
+    """Returns the shared icon index for the bundled weather icon directory."""
+    return shared_index(get_resource_path(os.path.join("assets", "weather")))
+
+
+def default_city_index():
+    """Returns the shared offline city index bundled with the app."""
+    return shared_city_index(get_resource_path(os.path.join("assets", "cities.tsv")))
+
+
+def download_icon(icon_code, icon_index):
+    """Downloads an icon into icon_index's directory. Returns the stored path or None."""
+    try:
+        response = http_transport.get(ICON_URL_TEMPLATE.format(icon_code=icon_code))
+        if response.status_code == 200 and len(response.content) < MAX_ICON_BYTES:
+            return store_icon(icon_code, response.content, icon_index)
+        else:
+            logging.error(f"Error fetching icon: {response.status_code}")
+            return None
+    except Exception as e:
+        logging.error(f"Exception during icon download: {e}")
+        return None
+
+
+def store_icon(icon_code, content, icon_index):
+    """Writes a downloaded icon and publishes it to the index.
+
+    The file is written under a temporary name and renamed into place so other readers
+    never see a partially written icon.
+    """
+    weather_dir = icon_index.directory
+    if not os.path.exists(weather_dir):
+        os.makedirs(weather_dir, exist_ok=True)
+        logging.debug(f"Weather directory created at path: {weather_dir}")
+
+    icon_path = icon_index.path_for(icon_code)
+    partial_path = f"{icon_path}.{threading.get_ident()}.part"
+    with open(partial_path, "wb") as icon_file:
+        icon_file.write(content)
+    os.replace(partial_path, icon_path)
+
+    icon_index.add(icon_code, icon_path)
+    logging.debug(f"Icon downloaded and saved at path: {icon_path}")
+    return icon_path
+
+
+def prefetch_icons(icon_index=None, codes=ALL_ICON_CODES):
+    """Starts downloading every icon missing from the bundle on a background pool.
+
+    Returns a dict of icon code to future for the downloads that were started.
+    """
+    if icon_index is None:
+        icon_index = default_icon_index()
+    return icon_index.prefetch(lambda icon_code: download_icon(icon_code, icon_index), codes)
+
+
 class WeatherScript:
-    def __init__(self):
+    def __init__(self, cache=None, icon_index=None, canonicalizer=None):
+        self.cache = cache if cache is not None else WeatherCache()
+        self.icon_index = icon_index if icon_index is not None else default_icon_index()
+        self.canonicalizer = (
+            canonicalizer
+            if canonicalizer is not None
+            else LocationCanonicalizer(default_city_index())
+        )
+        self.cache_stats = Counter()
+        self._refreshes = {}
+        self._refresh_lock = threading.Lock()
+
         config_path = get_resource_path("config/api_config.json")
         logging.debug(f"Loading configuration from: {config_path}")
 
@@ -45,30 +128,135 @@ class WeatherScript:
         except Exception as e:
             raise Exception(f"An error occurred while loading configuration: {e}")
 
-    def get_weather(self, location):
-        params = {"location": location}
+    def get_weather(self, location, revalidate=False):
+        """Returns weather for location, served from cache when possible.
+
+        Fresh entries are returned directly. Stale entries are returned immediately while a
+        background refresh runs. When the upstream fails, any cached entry is served instead
+        of the error.
+
+        With revalidate=True the cached entry is only used for a conditional request, so the
+        result is what the upstream has now.
+        """
+        canonical = self.canonicalizer.canonicalize(location)
+        key = canonical.key
+        entry = self.cache.get(key)
+
+        if revalidate:
+            logging.debug(f"Revalidating weather for location: {key}")
+            self.cache_stats["revalidations"] += 1
+        elif entry is not None and self.cache.is_fresh(entry):
+            logging.debug(f"Weather cache hit for location: {key}")
+            self.cache_stats["fresh_hits"] += 1
+            return self._with_icon(entry.value)
+        elif entry is not None and self.cache.is_servable(entry):
+            logging.debug(f"Serving stale weather for location: {key}, refreshing in background")
+            self.cache_stats["stale_hits"] += 1
+            self._refresh_in_background(key, canonical, entry)
+            return self._with_icon(entry.value)
+        else:
+            self.cache_stats["misses"] += 1
+
+        result = self._fetch_and_cache(key, canonical, entry)
+        if "error" in result and entry is not None:
+            logging.warning(f"Upstream failed for location: {key}, serving stale weather")
+            self.cache_stats["stale_on_error"] += 1
+            return self._with_icon(entry.value)
+        return self._with_icon(result)
+
+    def get_stats(self):
+        """Returns cache and canonicalization counters, including the overall cache hit rate."""
+        stats = dict(self.cache_stats)
+        stats.update({f"canonical_{name}": count for name, count in self.canonicalizer.stats.items()})
+        hits = self.cache_stats["fresh_hits"] + self.cache_stats["stale_hits"]
+        total = hits + self.cache_stats["misses"]
+        stats["hit_rate"] = hits / total if total else 0.0
+        return stats
+
+    def get_weather_many(self, locations, max_workers=DEFAULT_BATCH_WORKERS, revalidate=False):
+        """Fetches weather for many locations concurrently on a bounded worker pool.
+
+        Yields (location, result) tuples in completion order. Each result has the same shape
+        get_weather returns, including {"error": ...} for locations that failed.
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {
+                executor.submit(self.get_weather, location, revalidate=revalidate): location
+                for location in locations
+            }
+            for future in as_completed(futures):
+                location = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.error(f"Exception during batch request for '{location}': {e}")
+                    result = {"error": "Exception occurred while fetching data"}
+                yield location, result
+        finally:
+            # Drop queued work if the caller stops iterating early
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_and_cache(self, key, canonical, entry=None):
+        cached = entry.value if entry is not None else None
+        result = self._fetch_weather(canonical, cached)
+        if result is cached:
+            self.cache_stats["revalidated"] += 1
+        if "error" not in result:
+            self.cache.set(key, result)
+        return result
+
+    def _refresh_in_background(self, key, canonical, entry=None):
+        """Starts a refresh for key unless one is already in flight."""
+        with self._refresh_lock:
+            if key in self._refreshes:
+                return
+            thread = threading.Thread(
+                target=self._run_refresh, args=(key, canonical, entry), daemon=True
+            )
+            self._refreshes[key] = thread
+        thread.start()
+
+    def _run_refresh(self, key, canonical, entry):
+        try:
+            self._fetch_and_cache(key, canonical, entry)
+        finally:
+            with self._refresh_lock:
+                self._refreshes.pop(key, None)
+
+    def _request_params(self, canonical):
+        params = {"location": canonical.query, "fields": WEATHER_FIELDS}
+        if canonical.city_id:
+            params["id"] = canonical.city_id
+        return params
+
+    def _conditional_headers(self, cached):
+        """Validator for a cached observation, so the proxy can answer 304 when dt has not advanced."""
+        if cached and cached.get("observed_at") is not None:
+            return {"If-None-Match": f'"{cached["observed_at"]}"'}
+        return {}
+
+    def _fetch_weather(self, canonical, cached=None):
+        """Fetches weather for canonical. Returns cached itself when the proxy answers 304."""
+        params = self._request_params(canonical)
+        location = canonical.query
         logging.debug(f"Requesting weather data for location: {location}")
 
         try:
-            response = requests.get(self.base_url, params=params)
+            response = http_transport.get(
+                self.base_url, params=params, headers=self._conditional_headers(cached)
+            )
+            if response.status_code == 304 and cached is not None:
+                logging.debug(f"Weather for location: {location} unchanged since {cached['observed_at']}")
+                return cached
             if response.status_code == 200:
                 data = response.json()
                 logging.debug(f"Weather Data Received: {data}")
-                data_icon_code = data["weather"][0]["icon"]
-                icon_path = self.get_icon_path(data_icon_code)
-                return {
-                    "icon_path": icon_path,
-                    "weather": data["weather"][0]["main"],
-                    "temperature": data["main"]["temp"],
-                    "humidity": data["main"]["humidity"],
-                    "description": data["weather"][0]["description"],
-                }
-            elif response.status_code == 404:
-                logging.error(f"Location '{location}' not found.")
-                return {"error": "Location not found"}
-            else:
-                logging.error(f"Error fetching weather data: {response.status_code}")
-                return {"error": response.status_code}
+                # Never block the response on an icon download; a missing icon is fetched
+                # in the background and filled in by _with_icon once it is stored
+                icon_path = self.get_icon_path(data["weather"][0]["icon"], wait=False)
+                return self._build_weather_result(data, icon_path)
+            return self._weather_error(response.status_code, location)
         except requests.exceptions.RequestException as e:
             logging.error(f"RequestException during API request: {e}")
             return {"error": "Request exception occurred while fetching data"}
@@ -76,36 +264,59 @@ class WeatherScript:
             logging.error(f"Exception during API request: {e}")
             return {"error": "Exception occurred while fetching data"}
 
-    def get_icon_path(self, icon_code):
-        if not re.match(r'^[0-9]{2}[dn]$', icon_code):
+    def _build_weather_result(self, data, icon_path):
+        """Reduces an OpenWeather document to the fields the UI displays."""
+        return {
+            "icon_path": icon_path,
+            "icon_code": data["weather"][0]["icon"],
+            "weather": data["weather"][0]["main"],
+            "temperature": data["main"]["temp"],
+            "humidity": data["main"]["humidity"],
+            "description": data["weather"][0]["description"],
+            "observed_at": data.get("dt"),
+        }
+
+    def _with_icon(self, result):
+        """Fills in an icon that was still downloading when result was fetched.
+
+        Results are cached with icon_path None while the icon downloads, so the path is
+        looked up again whenever a result without one is served.
+        """
+        icon_code = result.get("icon_code")
+        if icon_code and result.get("icon_path") is None:
+            icon_path = self.icon_index.lookup(icon_code)
+            if icon_path:
+                return {**result, "icon_path": icon_path}
+        return result
+
+    def _weather_error(self, status_code, location):
+        if status_code == 404:
+            logging.error(f"Location '{location}' not found.")
+            return {"error": "Location not found"}
+        logging.error(f"Error fetching weather data: {status_code}")
+        return {"error": status_code}
+
+    def get_icon_path(self, icon_code, wait=True):
+        """Returns the local path of an icon, downloading it on first use.
+
+        With wait=False a missing icon is queued for a background download and None is
+        returned straight away.
+        """
+        icon_path = self.icon_index.lookup(icon_code)
+        if icon_path:
+            return icon_path
+
+        if not ICON_CODE_PATTERN.match(icon_code):
             logging.error(f"Invalid icon code format: {icon_code}")
             return None
 
-        weather_dir = get_resource_path(os.path.join("assets", "weather"))
-        if not os.path.exists(weather_dir):
-            os.makedirs(weather_dir)
-            logging.debug(f"Weather directory created at path: {weather_dir}")
+        if not wait:
+            self.icon_index.fetch_in_background(
+                icon_code, lambda code: download_icon(code, self.icon_index)
+            )
+            return None
+        return download_icon(icon_code, self.icon_index)
 
-        icon_path = os.path.join(weather_dir, f"weather_icon_{icon_code}.png")
-        logging.debug(f"Icon path: {icon_path}")
-        if os.path.exists(icon_path):
-            logging.debug(f"Icon already exists at path: {icon_path}")
-            return icon_path
-        else:
-            try:
-                response = requests.get(
-                    f"https://openweathermap.org/img/wn/{icon_code}@2x.png"
-                )
-                if response.status_code == 200 and len(response.content) < 100000:
-                    sanitized_code = re.sub(r'[^\w-]', '', icon_code)
-                    safe_icon_path = os.path.join(weather_dir, f"weather_icon_{sanitized_code}.png")
-                    with open(safe_icon_path, "wb") as icon_file:
-                        icon_file.write(response.content)
-                    logging.debug(f"Icon downloaded and saved at path: {safe_icon_path}")
-                    return safe_icon_path
-                else:
-                    logging.error(f"Error fetching icon: {response.status_code}")
-                    return None
-            except Exception as e:
-                logging.error(f"Exception during icon download: {e}")
-                return None
+    def prefetch_icons(self, codes=ALL_ICON_CODES):
+        """Starts downloading every icon missing from this script's index."""
+        return prefetch_icons(self.icon_index, codes)
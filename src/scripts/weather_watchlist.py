@@ -0,0 +1,161 @@
+import logging
+import random
+import time
+
+from scripts.weather_cache import DEFAULT_TTL
+
+logging.basicConfig(
+    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DEFAULT_INTERVAL = 600  # Seconds between refreshes for a city we know nothing about yet
+MIN_INTERVAL = DEFAULT_TTL  # Results younger than the weather cache TTL count as current
+MAX_INTERVAL = 3600
+INITIAL_SPREAD = 10  # Seconds over which newly added cities are first fetched
+JITTER = 0.15  # Fraction of the interval each refresh is randomly moved by
+MAX_DUE_PER_TICK = 4  # Refreshes started per scheduler tick, so bursts are spread out
+UPSTREAM_LAG = 60  # Seconds after the expected next observation before asking for it
+TEMPERATURE_CHANGE = 0.5  # Degrees Celsius that count as the weather having changed
+
+SPEED_UP = 0.7
+SLOW_DOWN = 1.25
+BACK_OFF = 1.5
+
+
+class WatchedCity:
+    def __init__(self, location, next_due):
+        self.location = location
+        self.next_due = next_due
+        self.interval = DEFAULT_INTERVAL
+        self.visible = True
+        self.in_flight = False
+        self.observed_at = None
+        self.update_period = None
+        self.last_result = None
+
+
+class WatchlistScheduler:
+    """Decides when each city on a weather watchlist is refreshed next.
+
+    Cities whose weather keeps changing are refreshed more often, cities that hold steady
+    or whose upstream observation time (dt) has not advanced are backed off, and no city
+    is asked for again before its next observation is expected. Every due time is jittered
+    and only a few refreshes start per tick, so a large watchlist never refreshes in
+    lockstep. Hidden cities are never due.
+    """
+
+    def __init__(
+        self,
+        min_interval=MIN_INTERVAL,
+        max_interval=MAX_INTERVAL,
+        max_due_per_tick=MAX_DUE_PER_TICK,
+        clock=time.time,
+        rng=None,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_due_per_tick = max_due_per_tick
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self._cities = {}
+
+    def add(self, location):
+        """Starts watching location. Its first refresh is spread over INITIAL_SPREAD seconds."""
+        if location in self._cities:
+            return self._cities[location]
+        city = WatchedCity(location, self.clock() + self.rng.uniform(0, INITIAL_SPREAD))
+        self._cities[location] = city
+        logging.debug(f"Watching weather for: {location}")
+        return city
+
+    def remove(self, location):
+        self._cities.pop(location, None)
+
+    def set_visible(self, location, visible):
+        """Pauses or resumes refreshes. A city that became due while hidden refreshes on resume."""
+        city = self._cities.get(location)
+        if city is not None:
+            city.visible = visible
+
+    def due(self):
+        """Returns the locations to refresh now, most overdue first, and marks them in flight."""
+        now = self.clock()
+        ready = sorted(
+            (
+                city for city in self._cities.values()
+                if city.visible and not city.in_flight and city.next_due <= now
+            ),
+            key=lambda city: city.next_due,
+        )[:self.max_due_per_tick]
+        for city in ready:
+            city.in_flight = True
+        return [city.location for city in ready]
+
+    def record(self, location, result):
+        """Adapts the city's interval to result and schedules its next refresh."""
+        city = self._cities.get(location)
+        if city is None:
+            return
+        city.in_flight = False
+        now = self.clock()
+
+        if "error" in result:
+            city.interval = self._clamp(city.interval * BACK_OFF)
+            city.next_due = now + self._jittered(city.interval)
+            return
+
+        observed_at = result.get("observed_at")
+        if city.observed_at is not None and observed_at is not None and observed_at <= city.observed_at:
+            # Upstream has not published a new observation yet
+            city.interval = self._clamp(city.interval * BACK_OFF)
+        else:
+            if city.observed_at is not None and observed_at is not None:
+                gap = observed_at - city.observed_at
+                city.update_period = (
+                    gap if city.update_period is None else 0.5 * city.update_period + 0.5 * gap
+                )
+            factor = SPEED_UP if self._changed(city.last_result, result) else SLOW_DOWN
+            city.interval = self._clamp(city.interval * factor)
+            city.observed_at = observed_at
+            city.last_result = result
+
+        next_due = now + self._jittered(city.interval)
+        if city.observed_at is not None and city.update_period:
+            expected = city.observed_at + city.update_period + UPSTREAM_LAG
+            next_due = min(max(next_due, expected), now + self.max_interval)
+        city.next_due = next_due
+
+    def next_due_in(self):
+        """Seconds until the next visible city is due, or None when nothing is waiting."""
+        waiting = [
+            city.next_due for city in self._cities.values()
+            if city.visible and not city.in_flight
+        ]
+        if not waiting:
+            return None
+        return max(0.0, min(waiting) - self.clock())
+
+    def get(self, location):
+        return self._cities.get(location)
+
+    def __contains__(self, location):
+        return location in self._cities
+
+    def __len__(self):
+        return len(self._cities)
+
+    def _changed(self, previous, result):
+        if previous is None:
+            return False
+        if previous.get("weather") != result.get("weather"):
+            return True
+        try:
+            return abs(previous["temperature"] - result["temperature"]) >= TEMPERATURE_CHANGE
+        except (KeyError, TypeError):
+            return False
+
+    def _clamp(self, interval):
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _jittered(self, interval):
+        return interval * self.rng.uniform(1 - JITTER, 1 + JITTER)
@@ -75,6 +75,24 @@ resource "aws_lambda_function" "recipe" {
   }
 }
 
+# Lambda Function - Consolidated proxy serving every route, built from lambda/proxy
+resource "aws_lambda_function" "proxy" {
+  count         = var.consolidated_proxy ? 1 : 0
+  filename      = "${path.module}/../lambda/proxy/deployment_package.zip"
+  function_name = "api-proxy"
+  role          = aws_iam_role.lambda_role.arn
+  handler       = "handler.lambda_handler"
+  runtime       = "python3.10"
+  source_code_hash = filebase64sha256("${path.module}/../lambda/proxy/deployment_package.zip")
+
+  environment {
+    variables = {
+      WEATHER_API_KEY     = var.weather_api_key
+      SPOONACULAR_API_KEY = var.spoonacular_api_key
+    }
+  }
+}
+
 # -----------------------------------------------------------------------------------------------------------
 
 # API Gateway
@@ -96,6 +114,14 @@ resource "aws_apigatewayv2_integration" "recipe_integration" {
   integration_uri    = aws_lambda_function.recipe.invoke_arn
 }
 
+resource "aws_apigatewayv2_integration" "proxy_integration" {
+  count              = var.consolidated_proxy ? 1 : 0
+  api_id             = aws_apigatewayv2_api.proxy_api.id
+  integration_type   = "AWS_PROXY"
+  integration_uri    = aws_lambda_function.proxy[0].invoke_arn
+  payload_format_version = "2.0"
+}
+
 # -----------------------------------------------------------------------------------------------------------
 # Routes
 # -----------------------------------------------------------------------------------------------------------
@@ -104,14 +130,14 @@ resource "aws_apigatewayv2_integration" "recipe_integration" {
 resource "aws_apigatewayv2_route" "weather_route" {
   api_id    = aws_apigatewayv2_api.proxy_api.id
   route_key = "GET /weather"
-  target    = "integrations/${aws_apigatewayv2_integration.weather_integration.id}"
+  target    = "integrations/${var.consolidated_proxy ? aws_apigatewayv2_integration.proxy_integration[0].id : aws_apigatewayv2_integration.weather_integration.id}"
 }
 
 ## Recipe
 resource "aws_apigatewayv2_route" "recipe_route" {
   api_id    = aws_apigatewayv2_api.proxy_api.id
   route_key = "GET /recipe"
-  target    = "integrations/${aws_apigatewayv2_integration.recipe_integration.id}"
+  target    = "integrations/${var.consolidated_proxy ? aws_apigatewayv2_integration.proxy_integration[0].id : aws_apigatewayv2_integration.recipe_integration.id}"
 }
 
 # -----------------------------------------------------------------------------------------------------------
@@ -138,4 +164,13 @@ resource "aws_lambda_permission" "recipe_apigw_lambda" {
   function_name = aws_lambda_function.recipe.function_name
   principal     = "apigateway.amazonaws.com"
   source_arn    = "${aws_apigatewayv2_api.proxy_api.execution_arn}/*/*"
+}
+
+resource "aws_lambda_permission" "proxy_apigw_lambda" {
+  count         = var.consolidated_proxy ? 1 : 0
+  statement_id  = "AllowAPIGatewayInvokeProxy"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.proxy[0].function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.proxy_api.execution_arn}/*/*"
 }
\ No newline at end of file
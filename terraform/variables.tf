@@ -10,4 +10,10 @@ variable "weather_api_key" {
 variable "spoonacular_api_key" {
   type = string
   sensitive = true
+}
+
+variable "consolidated_proxy" {
+  description = "Serve every route from the single proxy function instead of one function per route"
+  type    = bool
+  default = false
 }
\ No newline at end of file
@@ -19,6 +19,7 @@ def disable_network_calls(monkeypatch):
     def stunted_get():
         raise RuntimeError("Network calls are disabled during tests.")
     monkeypatch.setattr(requests, "get", lambda *args, **kwargs: stunted_get())
+    monkeypatch.setattr("scripts.http_transport.get", lambda *args, **kwargs: stunted_get())
 
 @pytest.fixture()
 def app_window(mocker):
@@ -109,7 +110,7 @@ def app_window(mocker):
 
 @pytest.fixture()
 def mock_requests(mocker):
-    mock_get = mocker.patch('requests.get')
+    mock_get = mocker.patch('scripts.http_transport.get')
     mock_response = mocker.MagicMock()
     mock_response.status_code = 200
     mock_get.return_value = mock_response
@@ -43,6 +43,14 @@ def mock_weather_response():
         "main": {"temp": 25.5, "humidity": 60}
     }
 
+def wait_for_fetch(weather_ui, timeout=5):
+    """Waits for the background fetch and lets Tk run the after() callback that displays it."""
+    weather_ui._fetch_thread.join(timeout=timeout)
+    deadline = time.time() + timeout
+    while weather_ui._pending_requests and time.time() < deadline:
+        weather_ui.parent.update()
+        time.sleep(0.01)
+
 class TestWeatherIntegration:
     """Integration tests for the Weather Workflow."""
 
@@ -82,6 +90,7 @@ class TestWeatherIntegration:
             
             # Fetch weather
             weather_ui.fetch_and_display_weather()
+            wait_for_fetch(weather_ui)
             
             # Verify display updated
             weather_info_text = weather_ui.weather_info_label.cget("text")
@@ -101,6 +110,7 @@ class TestWeatherIntegration:
             
             # Fetch weather
             weather_ui.fetch_and_display_weather()
+            wait_for_fetch(weather_ui)
             
             # Verify display updated
             weather_info_text = weather_ui.weather_info_label.cget("text")
@@ -2,9 +2,13 @@
 Tests for weather_ui.py.
 """
 
+import threading
 import pytest
 from scripts.weather_script import WeatherScript
-from src.gui.weather_ui import WeatherUI
+from src.gui.weather_ui import (
+    WeatherUI, IconImageCache, RESULT_POLL_MS, AUTOCOMPLETE_DEBOUNCE_MS, WATCHLIST_TICK_MS
+)
+from src.scripts.city_index import CityIndex
 
 
 @pytest.fixture()
@@ -15,6 +19,12 @@ def weather_ui(mocker):
     yield weather_ui
 
 
+def wait_for_fetch(weather_ui):
+    """Waits for the worker thread and applies its result as the Tk after() callback would."""
+    weather_ui._fetch_thread.join(timeout=5)
+    weather_ui._poll_results()
+
+
 class TestWeatherUI:
     """Tests for WeatherUI methods."""
 
@@ -43,6 +53,7 @@ class TestWeatherUI:
             assert hasattr(weather_ui, "location_label")
             assert hasattr(weather_ui, "location_entry")
             assert hasattr(weather_ui, "get_weather_button")
+            assert hasattr(weather_ui, "suggestions_frame")
 
             # Weather Display Components
             assert hasattr(weather_ui, "weather_frame")
@@ -70,6 +81,7 @@ class TestWeatherUI:
 
             # Call method
             weather_ui.fetch_and_display_weather()
+            wait_for_fetch(weather_ui)
 
             # Asserts
             mock_get_weather.assert_called_once_with("New York")
@@ -111,10 +123,169 @@ class TestWeatherUI:
 
             # Call method
             weather_ui.fetch_and_display_weather()
+            wait_for_fetch(weather_ui)
 
             # Asserts
             mock_get_weather.assert_called_once_with("InvalidLocation")
-            mock_display_weather.assert_called_once()
+            mock_display_weather.assert_called_once_with(
+                {"error": "Exception occurred while fetching data"}
+            )
+
+        def test_fetch_runs_off_the_ui_thread(self, mocker, weather_ui):
+            """Test that get_weather runs on a worker thread and the result is applied via after()."""
+            mocker.patch.object(
+                weather_ui.location_entry_var, "get", return_value="Oslo"
+            )
+            threads = []
+            mocker.patch.object(
+                weather_ui.weather_script,
+                "get_weather",
+                side_effect=lambda location: threads.append(threading.current_thread()) or {},
+            )
+            mocker.patch.object(weather_ui, "display_weather")
+
+            weather_ui.fetch_and_display_weather()
+            weather_ui._fetch_thread.join(timeout=5)
+
+            assert threads and threads[0] is not threading.main_thread()
+            weather_ui.parent.after.assert_called_with(RESULT_POLL_MS, weather_ui._poll_results)
+
+        def test_fetch_shows_loading_state(self, mocker, weather_ui):
+            """Test that a loading message is shown while the fetch runs."""
+            mocker.patch.object(
+                weather_ui.location_entry_var, "get", return_value=" Oslo "
+            )
+            mocker.patch.object(weather_ui.weather_script, "get_weather", return_value={})
+            mocker.patch.object(weather_ui, "display_weather")
+            weather_ui.weather_info_label = mocker.MagicMock()
+            weather_ui.get_weather_button = mocker.MagicMock()
+
+            weather_ui.fetch_and_display_weather()
+
+            weather_ui.weather_info_label.configure.assert_called_with(text="Loading weather for Oslo...")
+            weather_ui.get_weather_button.configure.assert_called_with(text="Loading...")
+            wait_for_fetch(weather_ui)
+            weather_ui.get_weather_button.configure.assert_called_with(text="Get Weather")
+
+        def test_newer_request_supersedes_older(self, mocker, weather_ui):
+            """Test that a stale response arriving late never overwrites the newest one."""
+            mock_display_weather = mocker.patch.object(weather_ui, "display_weather")
+            weather_ui._latest_request = 2
+            weather_ui._pending_requests = 2
+            weather_ui._results.put((2, {"weather": "New"}))
+            weather_ui._results.put((1, {"weather": "Old"}))
+
+            weather_ui._poll_results()
+
+            mock_display_weather.assert_called_once_with({"weather": "New"})
+            assert weather_ui._pending_requests == 0
+
+        def test_poll_reschedules_while_requests_pending(self, mocker, weather_ui):
+            """Test that polling continues until every in-flight request has reported."""
+            weather_ui._pending_requests = 1
+
+            weather_ui._poll_results()
+
+            weather_ui.parent.after.assert_called_with(RESULT_POLL_MS, weather_ui._poll_results)
+
+    class TestAutocomplete:
+        """Tests for location autocomplete and resolution."""
+
+        @pytest.fixture()
+        def ui_with_cities(self, weather_ui):
+            weather_ui.city_index = CityIndex([
+                CityIndex.make_city("London", "GB", 8961989),
+                CityIndex.make_city("London", "CA", 346765),
+                CityIndex.make_city("Lyon", "FR", 472317),
+            ])
+            return weather_ui
+
+        def test_key_release_is_debounced(self, ui_with_cities):
+            """Test that each key press replaces the pending autocomplete job."""
+            ui = ui_with_cities
+            ui.parent.after.return_value = "after#1"
+
+            ui.on_location_key()
+            ui.on_location_key()
+
+            ui.parent.after_cancel.assert_called_once_with("after#1")
+            ui.parent.after.assert_called_with(AUTOCOMPLETE_DEBOUNCE_MS, ui.update_suggestions)
+
+        def test_update_suggestions_creates_buttons(self, mocker, ui_with_cities):
+            """Test that one button is shown per suggested city."""
+            ui = ui_with_cities
+            mocker.patch.object(ui.location_entry_var, "get", return_value="lon")
+            mock_button = mocker.patch("src.gui.weather_ui.ctk.CTkButton")
+
+            ui.update_suggestions()
+
+            texts = [call.kwargs["text"] for call in mock_button.call_args_list]
+            assert texts[:2] == ["London, GB", "London, CA"]
+            assert len(ui.suggestion_buttons) == len(texts)
+
+        def test_update_suggestions_short_query(self, mocker, ui_with_cities):
+            """Test that no suggestions are shown for a one-character query."""
+            ui = ui_with_cities
+            mocker.patch.object(ui.location_entry_var, "get", return_value="l")
+            mock_button = mocker.patch("src.gui.weather_ui.ctk.CTkButton")
+
+            ui.update_suggestions()
+
+            mock_button.assert_not_called()
+
+        def test_select_suggestion_fetches(self, mocker, ui_with_cities):
+            """Test that picking a suggestion fills the entry and fetches its weather."""
+            ui = ui_with_cities
+            mock_set = mocker.patch.object(ui.location_entry_var, "set")
+            mock_fetch = mocker.patch.object(ui, "fetch_and_display_weather")
+
+            ui.select_suggestion(ui.city_index.resolve("London, CA"))
+
+            mock_set.assert_called_once_with("London, CA")
+            mock_fetch.assert_called_once()
+
+        def test_fetch_resolves_exact_city(self, mocker, ui_with_cities):
+            """Test that a known city name is sent as its city and country."""
+            ui = ui_with_cities
+            mocker.patch.object(ui.location_entry_var, "get", return_value="london")
+            mock_get_weather = mocker.patch.object(ui.weather_script, "get_weather", return_value={})
+            mocker.patch.object(ui, "display_weather")
+
+            ui.fetch_and_display_weather()
+            wait_for_fetch(ui)
+
+            mock_get_weather.assert_called_once_with("London,GB")
+
+        @pytest.mark.parametrize("location, suggestion", [("Lodnon", "London, GB"), ("Leon", "Lyon, FR")])
+        def test_fetch_sends_misspelled_city_as_typed(self, mocker, ui_with_cities, location, suggestion):
+            """Test that a close match is only offered, never silently swapped in."""
+            ui = ui_with_cities
+            mocker.patch.object(ui.location_entry_var, "get", return_value=location)
+            mock_get_weather = mocker.patch.object(ui.weather_script, "get_weather", return_value={})
+            mocker.patch.object(ui, "display_weather")
+            mock_button = mocker.patch("src.gui.weather_ui.ctk.CTkButton")
+
+            ui.fetch_and_display_weather()
+            wait_for_fetch(ui)
+
+            mock_get_weather.assert_called_once_with(location)
+            assert mock_button.call_args.kwargs["text"] == f"Did you mean {suggestion}?"
+            assert ui.suggestion_buttons == [mock_button.return_value]
+
+        def test_picking_correction_fetches_it(self, mocker, ui_with_cities):
+            """Test that the "Did you mean" button applies the correction."""
+            ui = ui_with_cities
+            mock_button = mocker.patch("src.gui.weather_ui.ctk.CTkButton")
+            mock_select = mocker.patch.object(ui, "select_suggestion")
+
+            ui.resolve_location("Lodnon")
+            mock_button.call_args.kwargs["command"]()
+
+            assert mock_select.call_args.args[0].name == "London"
+
+        def test_unknown_city_sent_unchanged(self, ui_with_cities):
+            """Test that cities missing from the index are passed through."""
+            assert ui_with_cities.resolve_location("Timbuktu") == "Timbuktu"
 
     class TestDisplayWeather:
         """Tests for the display_weather method."""
@@ -203,4 +374,242 @@ class TestWeatherUI:
 
             # Asserts
             weather_ui.weather_icon.configure.assert_called_with(image=None)
-            mock_image_open.assert_called_once_with("invalid_path")
\ No newline at end of file
+            mock_image_open.assert_called_once_with("invalid_path")
+
+        def test_display_weather_reuses_cached_icon(self, mocker, weather_ui):
+            """Test that rendering the same icon twice decodes it only once."""
+            fake_weather_data = {
+                "weather": "Sunny",
+                "temperature": 25,
+                "humidity": 50,
+                "description": "Clear sky",
+                "icon_path": "path/to/icon.png",
+            }
+            weather_ui.weather_info_label = mocker.MagicMock()
+            weather_ui.weather_icon = mocker.MagicMock()
+            mock_image_open = mocker.patch("src.gui.weather_ui.Image.open")
+            mock_ctk_image = mocker.patch("src.gui.weather_ui.ctk.CTkImage")
+
+            weather_ui.display_weather(fake_weather_data)
+            weather_ui.display_weather(fake_weather_data)
+
+            mock_image_open.assert_called_once_with("path/to/icon.png")
+            mock_ctk_image.assert_called_once()
+
+    class TestCleanup:
+        """Tests for the cleanup method."""
+
+        def test_cleanup_cancels_polling_and_drops_in_flight(self, mocker, weather_ui):
+            """Test that cleanup cancels the poll job and in-flight results are never shown."""
+            mock_display_weather = mocker.patch.object(weather_ui, "display_weather")
+            weather_ui._latest_request = 1
+            weather_ui._pending_requests = 1
+            weather_ui._poll_job = "after#1"
+
+            weather_ui.cleanup()
+            weather_ui._results.put((1, {"weather": "Late"}))
+            weather_ui._poll_results()
+
+            weather_ui.parent.after_cancel.assert_called_once_with("after#1")
+            mock_display_weather.assert_not_called()
+
+        def test_cleanup_releases_icon_cache(self, mocker, weather_ui):
+            """Test that cleanup empties the icon cache."""
+            mock_clear = mocker.patch.object(weather_ui.icon_cache, "clear")
+
+            weather_ui.cleanup()
+
+            mock_clear.assert_called_once()
+
+    class TestWatchlist:
+        """Tests for the auto-refreshing watchlist."""
+
+        @pytest.fixture()
+        def watching_ui(self, mocker, weather_ui):
+            mocker.patch.object(weather_ui, "resolve_location", side_effect=lambda location: location)
+            mocker.patch.object(weather_ui, "_row_visible", return_value=True)
+            return weather_ui
+
+        def add(self, mocker, weather_ui, location):
+            mocker.patch.object(weather_ui.location_entry_var, "get", return_value=location)
+            weather_ui.add_to_watchlist()
+
+        def test_add_schedules_tick(self, mocker, watching_ui):
+            self.add(mocker, watching_ui, "Paris,FR")
+            self.add(mocker, watching_ui, "Paris,FR")
+
+            assert list(watching_ui.watch_rows) == ["Paris,FR"]
+            assert "Paris,FR" in watching_ui.watchlist
+            watching_ui.parent.after.assert_called_once_with(
+                WATCHLIST_TICK_MS, watching_ui._watchlist_tick
+            )
+
+        def test_tick_refreshes_due_cities_and_displays(self, mocker, watching_ui):
+            self.add(mocker, watching_ui, "Paris,FR")
+            mocker.patch.object(watching_ui.watchlist, "due", side_effect=[["Paris,FR"], []])
+            mock_record = mocker.patch.object(watching_ui.watchlist, "record")
+            mock_display = mocker.patch.object(watching_ui, "display_watched")
+            fake_weather_data = {"temperature": 12.0, "description": "rain"}
+            mock_many = mocker.patch.object(
+                watching_ui.weather_script,
+                "get_weather_many",
+                return_value=iter([("Paris,FR", fake_weather_data)]),
+            )
+
+            watching_ui._watchlist_tick()
+            watching_ui._watch_thread.join(timeout=5)
+            watching_ui._watchlist_tick()
+
+            mock_many.assert_called_once_with(["Paris,FR"], revalidate=True)
+            mock_record.assert_called_once_with("Paris,FR", fake_weather_data)
+            mock_display.assert_called_once_with("Paris,FR", fake_weather_data)
+
+        def test_refresh_records_new_observation_over_stale_cache(self, mocker, watching_ui):
+            """Test that a scheduled refresh reaches the upstream even when a stale entry is cached."""
+            self.add(mocker, watching_ui, "Paris,FR")
+            script = watching_ui.weather_script
+            old = {"weather": "Clouds", "temperature": 11.0, "description": "cloudy", "observed_at": 1000}
+            watching_ui.watchlist.record("Paris,FR", old)
+            key = script.canonicalizer.canonicalize("Paris,FR").key
+            script.cache.set(key, old)
+            stored_at = script.cache.get(key).stored_at
+            mocker.patch.object(script.cache, "clock", return_value=stored_at + script.cache.ttl + 60)
+            new = {**old, "temperature": 12.0, "observed_at": 1600}
+            mock_fetch = mocker.patch.object(script, "_fetch_weather", return_value=new)
+            mocker.patch.object(watching_ui, "display_watched")
+
+            watching_ui._refresh_watched_worker(["Paris,FR"])
+            watching_ui._watchlist_tick()
+
+            mock_fetch.assert_called_once()
+            assert watching_ui.watchlist.get("Paris,FR").observed_at == 1600
+
+        def test_tick_pauses_hidden_rows(self, mocker, watching_ui):
+            self.add(mocker, watching_ui, "Paris,FR")
+            watching_ui._row_visible.return_value = False
+
+            watching_ui._watchlist_tick()
+
+            assert watching_ui.watchlist.get("Paris,FR").visible is False
+
+        @pytest.mark.parametrize(
+            "row_top, expected",
+            [(120, True), (90, True), (290, True), (300, False), (60, False), (650, False)],
+        )
+        def test_row_visible_measures_against_canvas(self, mocker, weather_ui, row_top, expected):
+            """Test that rows are measured against the scrolled canvas, not the frame inside it."""
+            viewport = mocker.Mock()
+            viewport.winfo_rooty.return_value = 100
+            viewport.winfo_height.return_value = 200
+            weather_ui.watchlist_frame = mocker.Mock(_parent_canvas=viewport)
+            # The inner frame spans every row, including those scrolled out of view
+            weather_ui.watchlist_frame.winfo_rooty.return_value = -500
+            weather_ui.watchlist_frame.winfo_height.return_value = 2000
+            row = mocker.Mock()
+            row.winfo_viewable.return_value = True
+            row.winfo_rooty.return_value = row_top
+            row.winfo_height.return_value = 40
+
+            assert weather_ui._row_visible(row) is expected
+
+        def test_row_visible_unmapped_row(self, mocker, weather_ui):
+            """Test that an unmapped row is never visible."""
+            row = mocker.Mock()
+            row.winfo_viewable.return_value = False
+
+            assert weather_ui._row_visible(row) is False
+
+        def test_worker_reports_failures(self, mocker, watching_ui):
+            mocker.patch.object(
+                watching_ui.weather_script, "get_weather_many", side_effect=Exception("boom")
+            )
+
+            watching_ui._refresh_watched_worker(["Paris,FR"])
+
+            location, weather_data = watching_ui._watch_results.get_nowait()
+            assert location == "Paris,FR"
+            assert "error" in weather_data
+
+        def test_remove_stops_watching(self, mocker, watching_ui):
+            self.add(mocker, watching_ui, "Paris,FR")
+            row, _ = watching_ui.watch_rows["Paris,FR"]
+
+            watching_ui.remove_from_watchlist("Paris,FR")
+
+            row.destroy.assert_called_once()
+            assert "Paris,FR" not in watching_ui.watchlist
+
+        def test_cleanup_cancels_watch_tick(self, mocker, watching_ui):
+            self.add(mocker, watching_ui, "Paris,FR")
+            watching_ui._watch_job = "after#2"
+
+            watching_ui.cleanup()
+
+            watching_ui.parent.after_cancel.assert_any_call("after#2")
+
+
+class TestIconImageCache:
+    """Tests for the IconImageCache class."""
+
+    @pytest.fixture()
+    def mock_image_open(self, mocker):
+        mock_open = mocker.patch("src.gui.weather_ui.Image.open")
+        mock_open.return_value.__enter__.return_value.size = (200, 200)
+        mocker.patch("src.gui.weather_ui.ctk.CTkImage", side_effect=lambda *args, **kwargs: mocker.MagicMock())
+        return mock_open
+
+    def test_miss_decodes_and_scales(self, mock_image_open):
+        """Test that a miss decodes the file, downscales it and closes the file handle."""
+        cache = IconImageCache()
+
+        cache.get("icon.png", size=(100, 100))
+
+        image = mock_image_open.return_value.__enter__.return_value
+        image.load.assert_called_once()
+        image.resize.assert_called_once()
+        assert image.resize.call_args.args[0] == (100, 100)
+        mock_image_open.return_value.__exit__.assert_called_once()
+
+    def test_hit_returns_same_image(self, mock_image_open):
+        """Test that a hit returns the cached CTkImage without touching the file."""
+        cache = IconImageCache()
+
+        first = cache.get("icon.png")
+        second = cache.get("icon.png")
+
+        assert first is second
+        mock_image_open.assert_called_once()
+
+    def test_size_is_part_of_key(self, mock_image_open):
+        """Test that the same icon at another size is cached separately."""
+        cache = IconImageCache()
+
+        cache.get("icon.png", size=(100, 100))
+        cache.get("icon.png", size=(50, 50))
+
+        assert len(cache) == 2
+
+    def test_eviction_closes_image(self, mocker, mock_image_open):
+        """Test that the least recently used image is evicted and closed."""
+        first_scaled, second_scaled = mocker.MagicMock(), mocker.MagicMock()
+        mock_image_open.return_value.__enter__.return_value.resize.side_effect = [first_scaled, second_scaled]
+        cache = IconImageCache(max_entries=1)
+
+        cache.get("first.png")
+        cache.get("second.png")
+
+        first_scaled.close.assert_called_once()
+        second_scaled.close.assert_not_called()
+        assert len(cache) == 1
+
+    def test_clear_closes_all_images(self, mocker, mock_image_open):
+        """Test that clear releases every cached image."""
+        scaled = mocker.MagicMock()
+        mock_image_open.return_value.__enter__.return_value.resize.return_value = scaled
+        cache = IconImageCache()
+        cache.get("icon.png")
+
+        cache.clear()
+
+        scaled.close.assert_called_once()
+        assert len(cache) == 0
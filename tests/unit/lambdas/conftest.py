@@ -0,0 +1,42 @@
+"""
+Fixtures for the Lambda handler tests.
+"""
+import sys
+import pytest
+from tests.unit.lambdas.loader import load_lambda
+
+
+@pytest.fixture()
+def upstream_response(mocker):
+    """Factory for urllib3-style upstream responses."""
+    def make(status, data=b""):
+        response = mocker.Mock()
+        response.status = status
+        response.data = data
+        return response
+    return make
+
+
+@pytest.fixture()
+def weather_handler(monkeypatch):
+    monkeypatch.setenv("WEATHER_API_KEY", "test-key")
+    return load_lambda("weather")
+
+
+@pytest.fixture()
+def recipe_handler(monkeypatch):
+    monkeypatch.setenv("SPOONACULAR_API_KEY", "test-key")
+    return load_lambda("recipe")
+
+
+@pytest.fixture()
+def proxy_handler(monkeypatch):
+    """The consolidated proxy. Route modules it loads are removed again afterwards."""
+    monkeypatch.setenv("WEATHER_API_KEY", "test-key")
+    monkeypatch.setenv("SPOONACULAR_API_KEY", "test-key")
+    path = list(sys.path)
+    modules = set(sys.modules)
+    yield load_lambda("proxy")
+    sys.path[:] = path
+    for name in set(sys.modules) - modules:
+        del sys.modules[name]
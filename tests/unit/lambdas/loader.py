@@ -0,0 +1,46 @@
+"""
+Loads Lambda handlers the way the Lambda runtime does, for tests.
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+LAMBDA_ROOT = Path(__file__).parent.parent.parent.parent / "lambda"
+COMMON_DIR = LAMBDA_ROOT / "common"
+
+
+def load_lambda(name, module="handler"):
+    """Imports lambda/<name>/<module>.py as a fresh module, so every test gets a cold container.
+
+    Each function imports its sibling modules and those in lambda/common by bare name, as
+    it does when deployed.
+    """
+    directory = LAMBDA_ROOT / name
+    siblings = [path.stem for path in [*directory.glob("*.py"), *COMMON_DIR.glob("*.py")]]
+    sys.path[:0] = [str(directory), str(COMMON_DIR)]
+    try:
+        for sibling in siblings:
+            sys.modules.pop(sibling, None)
+        spec = importlib.util.spec_from_file_location(f"{name}_{module}", directory / f"{module}.py")
+        loaded = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(loaded)
+        return loaded
+    finally:
+        sys.path.remove(str(directory))
+        sys.path.remove(str(COMMON_DIR))
+        for sibling in siblings:
+            sys.modules.pop(sibling, None)
+
+
+def load_tool(name):
+    """Imports lambda/<name>.py, a local tool rather than a function, with lambda/ on sys.path."""
+    sys.path.insert(0, str(LAMBDA_ROOT))
+    try:
+        spec = importlib.util.spec_from_file_location(name, LAMBDA_ROOT / f"{name}.py")
+        loaded = importlib.util.module_from_spec(spec)
+        # Registered so functions it runs in worker processes can be pickled by name
+        sys.modules[name] = loaded
+        spec.loader.exec_module(loaded)
+        return loaded
+    finally:
+        sys.path.remove(str(LAMBDA_ROOT))
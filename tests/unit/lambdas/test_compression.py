@@ -0,0 +1,88 @@
+"""
+Tests for the Lambda compression.py
+"""
+import base64
+import gzip
+import json
+import pytest
+from tests.unit.lambdas.loader import load_lambda
+
+LARGE_BODY = json.dumps([{"id": n, "title": "Chicken and tomato stew"} for n in range(100)])
+
+
+@pytest.fixture()
+def compression():
+    """Fixture for the compression module without brotli, as in the Lambda runtime."""
+    module = load_lambda("common", "compression")
+    module.brotli = None
+    return module
+
+
+def response(body):
+    return {"statusCode": 200, "headers": {"Content-Type": "application/json"}, "body": body}
+
+
+class TestNegotiate:
+    """Tests for Accept-Encoding negotiation."""
+
+    @pytest.mark.parametrize("accept_encoding,expected", [
+        ("gzip, deflate", "gzip"),
+        ("GZIP", "gzip"),
+        ("deflate", None),
+        ("", None),
+        ("gzip;q=0", None),
+        ("*", "gzip"),
+        ("br;q=1.0, gzip;q=0.5", "gzip"),
+    ])
+    def test_without_brotli(self, compression, accept_encoding, expected):
+        assert compression.negotiate(accept_encoding) == expected
+
+    @pytest.mark.parametrize("accept_encoding,expected", [
+        ("gzip, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+    ])
+    def test_with_brotli(self, compression, mocker, accept_encoding, expected):
+        compression.brotli = mocker.Mock()
+
+        assert compression.negotiate(accept_encoding) == expected
+
+
+class TestCompressResponse:
+    """Tests for compress_response."""
+
+    def test_large_body_is_gzipped(self, compression):
+        event = {"headers": {"accept-encoding": "gzip, deflate"}}
+
+        result = compression.compress_response(response(LARGE_BODY), event)
+
+        assert result["isBase64Encoded"] is True
+        assert result["headers"]["Content-Encoding"] == "gzip"
+        assert result["headers"]["Vary"] == "Accept-Encoding"
+        assert gzip.decompress(base64.b64decode(result["body"])).decode("utf-8") == LARGE_BODY
+
+    def test_small_body_is_not_compressed(self, compression):
+        event = {"headers": {"Accept-Encoding": "gzip"}}
+
+        result = compression.compress_response(response('{"ok": true}'), event)
+
+        assert result["body"] == '{"ok": true}'
+        assert "isBase64Encoded" not in result
+
+    def test_threshold_from_environment(self, compression, monkeypatch):
+        monkeypatch.setenv("COMPRESSION_MIN_BYTES", "100000")
+        event = {"headers": {"Accept-Encoding": "gzip"}}
+
+        result = compression.compress_response(response(LARGE_BODY), event)
+
+        assert result["body"] == LARGE_BODY
+
+    def test_no_accept_encoding(self, compression):
+        result = compression.compress_response(response(LARGE_BODY), {})
+
+        assert result["body"] == LARGE_BODY
+        assert result["headers"]["Vary"] == "Accept-Encoding"
+
+    def test_bodyless_responses_untouched(self, compression):
+        not_modified = {"statusCode": 304, "headers": {"ETag": '"1"'}}
+
+        assert compression.compress_response(not_modified, {"headers": {"Accept-Encoding": "gzip"}}) == not_modified
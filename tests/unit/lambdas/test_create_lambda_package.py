@@ -0,0 +1,211 @@
+"""
+Tests for lambda/create_lambda_package.py
+"""
+import io
+import marshal
+import os
+import sys
+import zipfile
+import pytest
+from tests.unit.lambdas.loader import load_tool
+
+
+@pytest.fixture(scope="module")
+def packager():
+    return load_tool("create_lambda_package")
+
+
+@pytest.fixture(autouse=True)
+def real_files(mocker):
+    """Packaging reads and writes real files, so undo the unit-wide open() mock."""
+    mocker.patch("builtins.open", io.open)
+
+
+@pytest.fixture()
+def lambda_tree(tmp_path):
+    """A small lambda/ directory with two functions, the consolidated proxy and shared modules."""
+    for name in ["proxy", "recipe", "weather"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "handler.py").write_text(f"# {name}\n")
+        (tmp_path / name / "__pycache__").mkdir()
+        (tmp_path / name / "__pycache__" / "handler.cpython-310.pyc").write_bytes(b"")
+    (tmp_path / "weather" / "locations.py").write_text("# locations\n")
+    (tmp_path / "common").mkdir()
+    (tmp_path / "common" / "upstream.py").write_text("# upstream\n")
+    return tmp_path
+
+
+class TestCreateLambdaPackage:
+    """Tests for the packaging functions."""
+
+    def test_function_package(self, packager, lambda_tree):
+        packager.create_lambda_package(str(lambda_tree / "weather"), "deployment_package.zip")
+
+        with zipfile.ZipFile(lambda_tree / "weather" / "deployment_package.zip") as zipf:
+            assert sorted(zipf.namelist()) == ["handler.py", "locations.py", "upstream.py"]
+
+    def test_shared_modules_in_every_package(self, packager, lambda_tree):
+        packager.create_lambda_package(str(lambda_tree / "recipe"), "deployment_package.zip")
+
+        with zipfile.ZipFile(lambda_tree / "recipe" / "deployment_package.zip") as zipf:
+            assert sorted(zipf.namelist()) == ["handler.py", "upstream.py"]
+
+    def test_shared_module_clash(self, packager, lambda_tree):
+        (lambda_tree / "weather" / "upstream.py").write_text("# own upstream\n")
+
+        with pytest.raises(ValueError, match="upstream.py"):
+            packager.create_lambda_package(str(lambda_tree / "weather"), "deployment_package.zip")
+
+    def test_proxy_package_bundles_routes(self, packager, lambda_tree):
+        routes = [str(lambda_tree / "recipe"), str(lambda_tree / "weather")]
+
+        packager.create_proxy_package(str(lambda_tree / "proxy"), routes, "deployment_package.zip")
+
+        with zipfile.ZipFile(lambda_tree / "proxy" / "deployment_package.zip") as zipf:
+            assert sorted(zipf.namelist()) == [
+                "handler.py", "recipe/handler.py", "upstream.py", "weather/handler.py", "weather/locations.py",
+            ]
+
+    def test_function_dirs(self, packager, lambda_tree):
+        # common has no handler.py, so it is not a function of its own
+        assert packager.function_dirs(str(lambda_tree)) == ["proxy", "recipe", "weather"]
+
+
+class TestColdStart:
+    """Tests for the cold-start packaging mode."""
+
+    @pytest.fixture()
+    def vendored_tree(self, lambda_tree):
+        weather = lambda_tree / "weather"
+        for path in ["pkg/__init__.py", "pkg/tests/test_pkg.py", "pkg/README.md", "pkg/core.pyi",
+                     "pkg-1.0.dist-info/METADATA", "pkg-1.0.dist-info/RECORD", "pkg-1.0.dist-info/LICENSE"]:
+            (weather / path).parent.mkdir(parents=True, exist_ok=True)
+            (weather / path).write_text("")
+        (weather / "handler.py").write_text('"""Docstring."""\nimport upstream\nimport pkg\n')
+        return lambda_tree
+
+    @pytest.mark.parametrize("arcname, own_dirs, stripped", [
+        ("handler.py", (), False),
+        ("README.md", (), False),
+        ("weather/README.md", ("weather",), False),
+        ("pkg/README.md", (), True),
+        ("pkg/tests/test_core.py", (), True),
+        ("pkg/sub/docs/index.html", (), True),
+        ("pkg/core.py", (), False),
+        ("pkg-1.0.dist-info/RECORD", (), True),
+        ("pkg-1.0.dist-info/METADATA", (), False),
+    ])
+    def test_is_stripped(self, packager, arcname, own_dirs, stripped):
+        assert packager.is_stripped(arcname, own_dirs) is stripped
+
+    def test_package_is_stripped_and_precompiled(self, packager, vendored_tree):
+        weather = vendored_tree / "weather"
+
+        packager.create_lambda_package(str(weather), "deployment_package.zip", cold_start=True)
+
+        tag = sys.implementation.cache_tag
+        with zipfile.ZipFile(weather / "deployment_package.zip") as zipf:
+            names = zipf.namelist()
+        # Modules come in the order their imports finish, dependencies before the handler
+        assert names == [
+            "upstream.py", f"__pycache__/upstream.{tag}.pyc",
+            "pkg/__init__.py", f"pkg/__pycache__/__init__.{tag}.pyc",
+            "handler.py", f"__pycache__/handler.{tag}.pyc",
+            "locations.py", f"__pycache__/locations.{tag}.pyc",
+            "pkg-1.0.dist-info/METADATA",
+        ]
+
+    @pytest.mark.parametrize("arcname, optimize, expected", [
+        ("handler.py", 0, "__pycache__/handler.{tag}.pyc"),
+        ("weather/handler.py", 0, "weather/__pycache__/handler.{tag}.pyc"),
+        ("handler.py", 2, "__pycache__/handler.{tag}.opt-2.pyc"),
+    ])
+    def test_bytecode_arcname(self, packager, arcname, optimize, expected):
+        tag = sys.implementation.cache_tag
+
+        assert packager.bytecode_arcname(arcname, optimize).replace(os.sep, "/") == expected.format(tag=tag)
+
+    @pytest.mark.parametrize("optimize, suffix, keeps_docstring", [(0, "", True), (2, ".opt-2", False)])
+    def test_bytecode_optimization(self, packager, vendored_tree, optimize, suffix, keeps_docstring):
+        """Test that optimized bytecode is only written where an optimizing interpreter looks."""
+        weather = vendored_tree / "weather"
+
+        packager.create_lambda_package(str(weather), "deployment_package.zip", cold_start=True, optimize=optimize)
+
+        with zipfile.ZipFile(weather / "deployment_package.zip") as zipf:
+            data = zipf.read(f"__pycache__/handler.{sys.implementation.cache_tag}{suffix}.pyc")
+        # The bytecode follows a 16-byte header
+        assert ("Docstring." in marshal.loads(data[16:]).co_consts) is keeps_docstring
+
+    def test_import_report(self, packager, vendored_tree, mocker):
+        weather = vendored_tree / "weather"
+        spy = mocker.spy(packager, "write_import_report")
+
+        packager.create_lambda_package(str(weather), "deployment_package.zip", cold_start=True)
+
+        report = (weather / "deployment_package.importtime.txt").read_text()
+        assert report.startswith("Total import time:")
+        # The report keeps only the slowest imports, which the tiny handler need not be among
+        assert "handler" in [module for module, _, _, _ in spy.call_args.args[1]]
+        # The report is never packaged itself
+        packager.create_lambda_package(str(weather), "deployment_package.zip")
+        with zipfile.ZipFile(weather / "deployment_package.zip") as zipf:
+            assert "deployment_package.importtime.txt" not in zipf.namelist()
+
+    def test_import_order(self, packager):
+        entries = [("x", "b.py"), ("x", "handler.py"), ("x", "weather/locations.py"), ("x", "a.py")]
+        imports = [("locations", 1, 1, 1), ("handler", 1, 2, 0)]
+
+        ordered = [arcname for _, arcname in packager.import_order(entries, imports)]
+
+        assert ordered == ["weather/locations.py", "handler.py", "a.py", "b.py"]
+
+
+class TestIncrementalPackaging:
+    """Tests for deterministic, content-addressed and parallel packaging."""
+
+    def build(self, packager, lambda_tree, **kwargs):
+        return packager.create_lambda_package(str(lambda_tree / "weather"), "deployment_package.zip", **kwargs)
+
+    def test_same_inputs_give_same_bytes(self, packager, lambda_tree):
+        zip_path = lambda_tree / "weather" / "deployment_package.zip"
+        self.build(packager, lambda_tree)
+        first = zip_path.read_bytes()
+        os.utime(lambda_tree / "weather" / "handler.py", (1, 1))
+
+        assert self.build(packager, lambda_tree, force=True)
+        assert zip_path.read_bytes() == first
+
+    def test_unchanged_inputs_are_skipped(self, packager, lambda_tree):
+        assert self.build(packager, lambda_tree) is True
+        assert self.build(packager, lambda_tree) is False
+
+    def test_changed_inputs_are_rebuilt(self, packager, lambda_tree):
+        self.build(packager, lambda_tree)
+        (lambda_tree / "common" / "upstream.py").write_text("# changed\n")
+
+        assert self.build(packager, lambda_tree) is True
+
+    def test_mode_change_is_rebuilt(self, packager, lambda_tree):
+        self.build(packager, lambda_tree)
+
+        assert self.build(packager, lambda_tree, cold_start=True) is True
+
+    def test_optimization_change_is_rebuilt(self, packager, lambda_tree):
+        self.build(packager, lambda_tree, cold_start=True)
+
+        assert self.build(packager, lambda_tree, cold_start=True, optimize=2) is True
+
+    def test_missing_package_is_rebuilt(self, packager, lambda_tree):
+        self.build(packager, lambda_tree)
+        (lambda_tree / "weather" / "deployment_package.zip").unlink()
+
+        assert self.build(packager, lambda_tree) is True
+
+    def test_package_all_builds_in_parallel_once(self, packager, lambda_tree):
+        assert packager.package_all(str(lambda_tree), jobs=2) == {"proxy": True, "recipe": True, "weather": True}
+
+        (lambda_tree / "recipe" / "handler.py").write_text("# changed\n")
+
+        # The proxy bundles the recipe route, so it is rebuilt too
+        assert packager.package_all(str(lambda_tree), jobs=2) == {"proxy": True, "recipe": True, "weather": False}
@@ -0,0 +1,64 @@
+"""
+Tests for lambda/fake_upstreams.py
+"""
+import json
+import random
+import pytest
+import urllib3
+from tests.unit.lambdas.loader import load_tool
+
+WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather?q=paris%2Cfr&appid=k&units=metric"
+RECIPE_URL = "https://api.spoonacular.com/recipes/findByIngredients?ingredients=leek%2Cpotato&number=3"
+
+
+@pytest.fixture(scope="module")
+def fakes():
+    return load_tool("fake_upstreams")
+
+
+class TestFakePool:
+    """Tests for FakePool and the default responders."""
+
+    def test_openweather_is_stable_per_location(self, fakes):
+        pool = fakes.FakePool()
+
+        first = json.loads(pool.request("GET", WEATHER_URL).data)
+        second = json.loads(pool.request("GET", WEATHER_URL).data)
+
+        assert first == second
+        assert first["name"] == "Paris"
+        assert first["dt"] % fakes.OBSERVATION_PERIOD == 0
+
+    def test_openweather_unknown_location(self, fakes):
+        response = fakes.FakePool().request("GET", WEATHER_URL.replace("paris", "nowhere"))
+
+        assert response.status == 404
+
+    def test_spoonacular_returns_number_recipes(self, fakes):
+        recipes = json.loads(fakes.FakePool().request("GET", RECIPE_URL).data)
+
+        assert len(recipes) == 3
+        assert [item["name"] for item in recipes[0]["usedIngredients"]] == ["leek", "potato"]
+
+    def test_injected_errors(self, fakes):
+        pool = fakes.FakePool(error_rate=0.5, rng=random.Random(3))
+
+        statuses = [pool.request("GET", RECIPE_URL).status for _ in range(200)]
+
+        assert 60 < statuses.count(500) < 140
+        assert pool.stats["injected_errors"] == statuses.count(500)
+        assert pool.stats["api.spoonacular.com"] == 200
+
+    def test_latency_past_read_timeout_raises(self, fakes, mocker):
+        mock_sleep = mocker.patch.object(fakes.time, "sleep")
+        pool = fakes.FakePool(latency=lambda: 2.0)
+
+        with pytest.raises(urllib3.exceptions.ReadTimeoutError):
+            pool.request("GET", WEATHER_URL, timeout=urllib3.Timeout(connect=0.1, read=0.5))
+
+        mock_sleep.assert_called_once_with(0.5)
+
+    def test_unknown_host(self, fakes):
+        response = fakes.FakePool().request("GET", "https://example.com/")
+
+        assert response.status == 502
@@ -0,0 +1,48 @@
+"""
+Tests for lambda/recipe/json_slice.py
+"""
+import json
+import pytest
+from tests.unit.lambdas.loader import load_lambda
+
+
+@pytest.fixture()
+def json_slice():
+    """Fixture for the json_slice module as the recipe function imports it."""
+    return load_lambda("recipe", "json_slice")
+
+
+class TestJsonSlice:
+    """Tests for slicing JSON arrays as text."""
+
+    @pytest.mark.parametrize("number", [0, 1, 3, 10])
+    def test_first_items(self, json_slice, number):
+        items = [{"id": n, "title": "Rice, [fried]", "tags": ["a", "b"]} for n in range(5)]
+        text = json.dumps(items, indent=2)
+
+        sliced, count = json_slice.first_items(text, number)
+
+        assert json.loads(sliced) == items[:number]
+        assert count == min(number, 5)
+        assert text.startswith(sliced[:-1])
+
+    @pytest.mark.parametrize("text,expected", [
+        ("[]", ("[]", 0)),
+        (" [ ] ", (" []", 0)),
+        ("[1 , 2 ,3]", ("[1 , 2]", 2)),
+    ])
+    def test_first_items_whitespace(self, json_slice, text, expected):
+        assert json_slice.first_items(text, 2) == expected
+
+    def test_malformed_array(self, json_slice):
+        with pytest.raises(ValueError):
+            json_slice.first_items("[1 2]", 2)
+
+    @pytest.mark.parametrize("text,expected", [
+        ("[1]", True),
+        ("\n [ ]\n", True),
+        ("{}", False),
+        ("", False),
+    ])
+    def test_looks_like_json_array(self, json_slice, text, expected):
+        assert json_slice.looks_like_json_array(text) is expected
@@ -0,0 +1,124 @@
+"""
+Tests for lambda/local_gateway.py
+"""
+import base64
+import gzip
+import io
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from tests.unit.lambdas.loader import load_tool
+
+
+@pytest.fixture(scope="module")
+def gateway():
+    return load_tool("local_gateway")
+
+
+@pytest.fixture(autouse=True)
+def real_files(mocker):
+    """The gateway reads terraform/main.tf, so undo the unit-wide open() mock."""
+    mocker.patch("builtins.open", io.open)
+
+
+@pytest.fixture(params=[False, True], ids=["functions", "consolidated"])
+def server(request, gateway, monkeypatch):
+    """A gateway on a free port serving the real handlers against fake upstreams."""
+    monkeypatch.setenv("WEATHER_API_KEY", "test-key")
+    monkeypatch.setenv("SPOONACULAR_API_KEY", "test-key")
+    path = list(sys.path)
+    modules = set(sys.modules)
+    routes = gateway.terraform_routes()
+    functions = gateway.Functions(routes, gateway.FakePool(), consolidated=request.param)
+    server = gateway.create_server(functions, routes, port=0)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+    sys.path[:] = path
+    for name in set(sys.modules) - modules:
+        del sys.modules[name]
+
+
+def fetch(url, headers=None):
+    """Returns (status, headers, body) without raising for error statuses."""
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {})) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+class TestTerraformRoutes:
+    """Tests for reading the routes from terraform/main.tf."""
+
+    def test_routes(self, gateway):
+        assert gateway.terraform_routes() == {"GET /weather": "weather", "GET /recipe": "recipe"}
+
+
+class TestEvents:
+    """Tests for the request and response translation."""
+
+    def test_build_event(self, gateway):
+        event = gateway.build_event(
+            "GET", "/weather?location=Paris&fields=dt&fields=name", {"Accept-Encoding": "gzip"}, "GET /weather"
+        )
+
+        assert event["version"] == "2.0"
+        assert event["routeKey"] == "GET /weather"
+        assert event["rawPath"] == "/weather"
+        assert event["queryStringParameters"] == {"location": "Paris", "fields": "dt,name"}
+        assert event["headers"] == {"accept-encoding": "gzip"}
+        assert event["requestContext"]["http"]["method"] == "GET"
+
+    def test_no_query_parameters(self, gateway):
+        assert "queryStringParameters" not in gateway.build_event("GET", "/weather", {}, "GET /weather")
+
+    def test_decode_base64_response(self, gateway):
+        result = {"statusCode": 200, "body": base64.b64encode(b"\x1f\x8b").decode(), "isBase64Encoded": True}
+
+        assert gateway.decode_response(result) == (200, {}, b"\x1f\x8b")
+
+    def test_decode_bare_result(self, gateway):
+        status, headers, body = gateway.decode_response({"ok": True})
+
+        assert (status, json.loads(body)) == (200, {"ok": True})
+
+
+class TestServer:
+    """End-to-end tests through HTTP, the real handlers and the fake upstreams."""
+
+    def test_weather(self, server):
+        status, headers, body = fetch(f"{server}/weather?location=Paris,FR&fields=compact")
+
+        assert status == 200
+        assert json.loads(body)["main"].keys() == {"temp", "humidity"}
+        assert headers["ETag"]
+
+    def test_not_modified(self, server):
+        etag = fetch(f"{server}/weather?location=Paris,FR")[1]["ETag"]
+
+        status, _, body = fetch(f"{server}/weather?location=Paris,FR", {"If-None-Match": etag})
+
+        assert (status, body) == (304, b"")
+
+    def test_recipe_compressed(self, server):
+        status, headers, body = fetch(
+            f"{server}/recipe?ingredients=leek,potato&number=20", {"Accept-Encoding": "gzip"}
+        )
+
+        assert status == 200
+        assert headers["Content-Encoding"] == "gzip"
+        assert len(json.loads(gzip.decompress(body))) == 20
+
+    def test_unknown_location(self, server):
+        assert fetch(f"{server}/weather?location=Nowhere")[0] == 404
+
+    def test_unknown_route(self, server):
+        status, _, body = fetch(f"{server}/forecast")
+
+        assert (status, json.loads(body)) == (404, {"message": "Not Found"})
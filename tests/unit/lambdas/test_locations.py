@@ -0,0 +1,53 @@
+"""
+Tests for lambda/weather/locations.py
+"""
+import pytest
+from src.scripts import city_index, location_canonicalizer
+from tests.unit.lambdas.loader import load_lambda
+
+LOCATIONS = [
+    "London",
+    "London,GB",
+    "london, gb",
+    "New York, USA",
+    "NYC",
+    "new york city,us",
+    "LA",
+    "SF, United States",
+    "São Paulo,br",
+    "  Zürich ,  ch ",
+    "St. Petersburg",
+    "Washington D.C., United States of America",
+    "Paris, Texas, US",
+    "Kiev, Ukraine",
+    "Springfield,",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def locations():
+    return load_lambda("weather", "locations")
+
+
+class TestClientParity:
+    """Tests that the proxy folds locations exactly as the desktop client does."""
+
+    def test_alias_tables_match(self, locations):
+        assert locations.COUNTRY_ALIASES == location_canonicalizer.COUNTRY_ALIASES
+        assert locations.CITY_ALIASES == location_canonicalizer.CITY_ALIASES
+
+    @pytest.mark.parametrize("location", LOCATIONS)
+    def test_parse_location_matches(self, locations, location):
+        assert locations.parse_location(location) == location_canonicalizer.parse_location(location)
+
+    @pytest.mark.parametrize("location", LOCATIONS)
+    def test_helpers_match(self, locations, location):
+        assert locations.normalize_city_name(location) == city_index.normalize_city_name(location)
+        assert locations.split_country(location) == city_index.split_country(location)
+
+    @pytest.mark.parametrize("location", LOCATIONS)
+    def test_keys_match(self, locations, location):
+        key, _ = locations.canonicalize(location)
+
+        assert key == location_canonicalizer.location_key(*location_canonicalizer.parse_location(location))
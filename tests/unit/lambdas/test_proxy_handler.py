@@ -0,0 +1,74 @@
+"""
+Tests for lambda/proxy/handler.py
+"""
+import json
+import sys
+import pytest
+
+OBSERVATION = {"weather": [{"main": "Clouds"}], "main": {"temp": 4.2}, "dt": 1763577120}
+RECIPES = [{"id": 1, "title": "Soup"}]
+
+
+def event(route_key=None, raw_path=None, stage="$default", **params):
+    """Builds a synthetic API Gateway HTTP API event."""
+    return {
+        "routeKey": route_key,
+        "rawPath": raw_path,
+        "requestContext": {"http": {"method": "GET"}, "stage": stage},
+        "queryStringParameters": params or None,
+        "headers": {},
+    }
+
+
+@pytest.fixture()
+def mock_request(mocker, upstream_response):
+    """Patches urllib3 so each upstream answers with its own document."""
+    def request(method, url, **kwargs):
+        if "openweathermap" in url:
+            return upstream_response(200, json.dumps(OBSERVATION).encode("utf-8"))
+        return upstream_response(200, json.dumps(RECIPES).encode("utf-8"))
+    return mocker.patch("urllib3.PoolManager.request", autospec=True, side_effect=lambda self, *a, **k: request(*a, **k))
+
+
+class TestProxyHandler:
+    """Tests for the consolidated proxy lambda_handler."""
+
+    def test_dispatches_on_route_key(self, proxy_handler, mock_request):
+        weather = proxy_handler.lambda_handler(event("GET /weather", location="Oslo"), None)
+        recipes = proxy_handler.lambda_handler(event("GET /recipe", ingredients="leek"), None)
+
+        assert json.loads(weather["body"]) == OBSERVATION
+        assert json.loads(recipes["body"]) == RECIPES
+
+    @pytest.mark.parametrize("raw_path, stage", [
+        ("/weather", "$default"),
+        ("/prod/weather", "prod"),
+        ("/weather/", "$default"),
+    ])
+    def test_dispatches_on_raw_path(self, proxy_handler, mock_request, raw_path, stage):
+        response = proxy_handler.lambda_handler(event("$default", raw_path, stage, location="Oslo"), None)
+
+        assert response["statusCode"] == 200
+        assert json.loads(response["body"]) == OBSERVATION
+
+    def test_unknown_route(self, proxy_handler, mock_request):
+        response = proxy_handler.lambda_handler(event("POST /weather"), None)
+
+        assert response["statusCode"] == 404
+        mock_request.assert_not_called()
+
+    def test_routes_share_warm_state(self, proxy_handler, mock_request):
+        proxy_handler.lambda_handler(event("GET /weather", location="Oslo"), None)
+        proxy_handler.lambda_handler(event("GET /recipe", ingredients="leek"), None)
+
+        weather = sys.modules["weather_route"]
+        recipe = sys.modules["recipe_route"]
+        assert weather.http is recipe.http
+        assert weather.upstream is recipe.upstream
+
+    def test_routes_load_once(self, proxy_handler, mock_request):
+        for _ in range(3):
+            proxy_handler.lambda_handler(event("GET /weather", location="Oslo"), None)
+
+        assert mock_request.call_count == 1  # Later calls hit the same module's cache
+        assert list(proxy_handler._route_handlers) == ["weather"]
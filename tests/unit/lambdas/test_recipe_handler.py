@@ -0,0 +1,187 @@
+"""
+Tests for lambda/recipe/handler.py
+"""
+import base64
+import gzip
+import json
+import pytest
+import urllib3
+from tests.unit.lambdas.loader import load_lambda
+
+RECIPES = [
+    {"id": 1, "title": "Chicken Soup", "usedIngredientCount": 2, "missedIngredientCount": 1},
+    {"id": 2, "title": "Tomato Chicken", "usedIngredientCount": 2, "missedIngredientCount": 0},
+]
+
+
+def event(**params):
+    """Builds a synthetic API Gateway HTTP API event."""
+    return {"queryStringParameters": params or None}
+
+
+@pytest.fixture()
+def mock_request(mocker, recipe_handler, upstream_response):
+    return mocker.patch.object(
+        recipe_handler.http,
+        "request",
+        return_value=upstream_response(200, json.dumps(RECIPES).encode("utf-8")),
+    )
+
+
+class TestRecipeHandler:
+    """Tests for the recipe lambda_handler."""
+
+    def test_returns_recipes(self, recipe_handler, mock_request):
+        response = recipe_handler.lambda_handler(event(ingredients="chicken,tomato"), None)
+
+        assert response["statusCode"] == 200
+        assert json.loads(response["body"]) == RECIPES
+
+    def test_full_result_passed_through_unchanged(self, recipe_handler, mocker, upstream_response):
+        body = json.dumps(RECIPES * 5, indent=2)
+        mocker.patch.object(
+            recipe_handler.http, "request", return_value=upstream_response(200, body.encode("utf-8"))
+        )
+
+        response = recipe_handler.lambda_handler(event(ingredients="chicken", number="10"), None)
+
+        assert response["body"] == body
+
+    def test_compressed_when_accepted(self, recipe_handler, mocker, upstream_response):
+        body = json.dumps(RECIPES * 10)
+        mocker.patch.object(
+            recipe_handler.http, "request", return_value=upstream_response(200, body.encode("utf-8"))
+        )
+        request = event(ingredients="chicken", number="20")
+        request["headers"] = {"accept-encoding": "gzip, deflate"}
+
+        response = recipe_handler.lambda_handler(request, None)
+
+        assert response["isBase64Encoded"] is True
+        assert response["headers"]["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(base64.b64decode(response["body"]))) == RECIPES * 10
+
+    def test_rate_limited(self, recipe_handler, mocker, upstream_response):
+        mock_request = mocker.patch.object(
+            recipe_handler.http, "request", return_value=upstream_response(429)
+        )
+
+        recipe_handler.lambda_handler(event(ingredients="chicken"), None)
+        response = recipe_handler.lambda_handler(event(ingredients="chicken"), None)
+
+        assert response["statusCode"] == 429
+        assert mock_request.call_count == 2
+
+    def test_no_ingredients(self, recipe_handler, mock_request):
+        response = recipe_handler.lambda_handler(event(ingredients=" , "), None)
+
+        assert response["statusCode"] == 400
+        mock_request.assert_not_called()
+
+    def test_invalid_json(self, recipe_handler, mocker, upstream_response):
+        mocker.patch.object(recipe_handler.http, "request", return_value=upstream_response(200, b"{"))
+
+        response = recipe_handler.lambda_handler(event(ingredients="chicken"), None)
+
+        assert response["statusCode"] == 500
+        assert json.loads(response["body"]) == {"error": "Error parsing recipe data"}
+
+    def test_upstream_timeout_returns_504(self, recipe_handler, mocker):
+        mocker.patch.object(
+            recipe_handler.http,
+            "request",
+            side_effect=urllib3.exceptions.ReadTimeoutError(None, "url", "Read timed out."),
+        )
+        context = mocker.Mock()
+        context.get_remaining_time_in_millis.return_value = 3000
+
+        response = recipe_handler.lambda_handler(event(ingredients="chicken"), context)
+
+        assert response["statusCode"] == 504
+        assert "timed out" in json.loads(response["body"])["error"]
+        timeout = recipe_handler.http.request.call_args.kwargs["timeout"]
+        assert timeout.read_timeout < 3
+
+    class TestResponseCache:
+        """Tests for the warm-container response cache."""
+
+        def test_repeated_query_served_from_cache(self, recipe_handler, mock_request):
+            first = recipe_handler.lambda_handler(event(ingredients="chicken,tomato"), None)
+            second = recipe_handler.lambda_handler(event(ingredients="chicken,tomato"), None)
+
+            mock_request.assert_called_once()
+            assert first == second
+
+        def test_empty_results_are_negatively_cached(self, recipe_handler, mocker, upstream_response):
+            mock_request = mocker.patch.object(
+                recipe_handler.http, "request", return_value=upstream_response(200, b"[]")
+            )
+
+            recipe_handler.lambda_handler(event(ingredients="unobtainium"), None)
+            response = recipe_handler.lambda_handler(event(ingredients="unobtainium"), None)
+
+            assert json.loads(response["body"]) == []
+            mock_request.assert_called_once()
+
+        @pytest.mark.parametrize("ingredients", [
+            "tomato,chicken", "chicken, tomato", "Chicken,Tomato", " chicken ,tomato,,TOMATO",
+        ])
+        def test_equivalent_ingredient_lists_share_key(self, recipe_handler, mock_request, ingredients):
+            recipe_handler.lambda_handler(event(ingredients="chicken,tomato"), None)
+            recipe_handler.lambda_handler(event(ingredients=ingredients), None)
+
+            mock_request.assert_called_once()
+            assert "ingredients=chicken%2Ctomato" in mock_request.call_args.args[1]
+
+        def test_flags_are_part_of_key(self, recipe_handler, mock_request):
+            recipe_handler.lambda_handler(event(ingredients="chicken", ranking="1"), None)
+            recipe_handler.lambda_handler(event(ingredients="chicken", ranking="2"), None)
+            recipe_handler.lambda_handler(event(ingredients="chicken", ignorePantry="False"), None)
+
+            assert mock_request.call_count == 3
+
+        def test_smaller_number_sliced_from_cached_result(self, recipe_handler, mock_request):
+            recipe_handler.lambda_handler(event(ingredients="chicken", number="2"), None)
+            response = recipe_handler.lambda_handler(event(ingredients="chicken", number="1"), None)
+
+            mock_request.assert_called_once()
+            assert json.loads(response["body"]) == RECIPES[:1]
+
+        def test_upstream_asked_for_minimum_batch(self, recipe_handler, mock_request):
+            response = recipe_handler.lambda_handler(event(ingredients="chicken", number="1"), None)
+
+            assert "number=10" in mock_request.call_args.args[1]
+            assert json.loads(response["body"]) == RECIPES[:1]
+
+        def test_larger_number_served_from_complete_result(self, recipe_handler, mock_request):
+            """Test that a result shorter than what was fetched serves any larger number."""
+            recipe_handler.lambda_handler(event(ingredients="chicken", number="5"), None)
+            response = recipe_handler.lambda_handler(event(ingredients="chicken", number="50"), None)
+
+            mock_request.assert_called_once()
+            assert json.loads(response["body"]) == RECIPES
+
+        def test_larger_number_refetched_when_cache_is_short(self, recipe_handler, mocker, upstream_response):
+            many = [{"id": n} for n in range(10)]
+            mock_request = mocker.patch.object(
+                recipe_handler.http,
+                "request",
+                return_value=upstream_response(200, json.dumps(many).encode("utf-8")),
+            )
+
+            recipe_handler.lambda_handler(event(ingredients="chicken", number="3"), None)
+            recipe_handler.lambda_handler(event(ingredients="chicken", number="20"), None)
+            recipe_handler.lambda_handler(event(ingredients="chicken", number="3"), None)
+
+            assert mock_request.call_count == 2
+            assert "number=20" in mock_request.call_args.args[1]
+
+        def test_size_configurable_from_environment(self, monkeypatch):
+            monkeypatch.setenv("RESPONSE_CACHE_SIZE", "2")
+            monkeypatch.setenv("RESPONSE_CACHE_TTL", "10")
+            monkeypatch.setenv("RESPONSE_CACHE_NEGATIVE_TTL", "not-a-number")
+            handler = load_lambda("recipe")
+
+            assert handler.response_cache.max_entries == 2
+            assert handler.response_cache.ttl == 10
+            assert handler.response_cache.negative_ttl == 300
@@ -0,0 +1,62 @@
+"""
+Tests for the Lambda response_cache.py
+"""
+import pytest
+from tests.unit.lambdas.loader import load_lambda
+
+
+@pytest.fixture()
+def clock(mocker):
+    """Fixture for a controllable monotonic clock."""
+    return mocker.Mock(return_value=100.0)
+
+
+@pytest.fixture()
+def cache(clock):
+    """Fixture for a small ResponseCache."""
+    ResponseCache = load_lambda("common", "response_cache").ResponseCache
+    return ResponseCache(max_entries=2, ttl=60, negative_ttl=10, clock=clock)
+
+
+class TestResponseCache:
+    """Tests for ResponseCache."""
+
+    def test_hit_and_miss_counts(self, cache):
+        assert cache.get("a") is None
+        cache.set("a", "value")
+
+        assert cache.get("a") == "value"
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 1
+        assert "hit_rate=0.50" in cache.summary()
+
+    def test_entries_expire(self, cache, clock):
+        cache.set("a", "value")
+        clock.return_value += 61
+
+        assert cache.get("a") is None
+        assert cache.stats["expired"] == 1
+        assert len(cache) == 0
+
+    def test_negative_entries_expire_sooner(self, cache, clock):
+        cache.set("missing", "not found", negative=True)
+        clock.return_value += 11
+
+        assert cache.get("missing") is None
+
+    def test_least_recently_used_is_evicted(self, cache):
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats["evictions"] == 1
+
+    def test_zero_size_disables_caching(self, clock):
+        ResponseCache = load_lambda("common", "response_cache").ResponseCache
+        cache = ResponseCache(max_entries=0, clock=clock)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
@@ -0,0 +1,78 @@
+"""
+Tests for the Lambda upstream.py
+"""
+import pytest
+import urllib3
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, ReadTimeoutError
+from tests.unit.lambdas.loader import load_lambda
+
+
+@pytest.fixture()
+def upstream():
+    """Fixture for the shared upstream module."""
+    return load_lambda("common", "upstream")
+
+
+@pytest.fixture()
+def context(mocker):
+    """Fixture for a Lambda context with time remaining."""
+    context = mocker.Mock()
+    context.get_remaining_time_in_millis.return_value = 3000
+    return context
+
+
+class TestUpstream:
+    """Tests for deadline-bounded upstream requests."""
+
+    def test_budget_capped_by_deadline(self, upstream, context):
+        assert upstream.budget_ms(context) == 3000 - upstream.RESPONSE_RESERVE_MS
+
+    def test_budget_from_environment(self, upstream, context, monkeypatch):
+        monkeypatch.setenv("UPSTREAM_BUDGET_MS", "1000")
+
+        assert upstream.budget_ms(context) == 1000
+        assert upstream.budget_ms(None) == 1000
+
+    def test_timeouts_fit_inside_budget(self, upstream):
+        timeout = upstream.timeout_for(2750)
+
+        attempts = upstream.CONNECT_RETRIES + 1
+        assert timeout.connect_timeout * attempts + timeout.read_timeout == pytest.approx(2.75)
+        assert timeout.connect_timeout <= upstream.MAX_CONNECT_TIMEOUT
+
+    def test_request_gets_timeout(self, upstream, context, mocker):
+        http = mocker.Mock()
+
+        upstream.get(http, "https://example.com", context)
+
+        timeout = http.request.call_args.kwargs["timeout"]
+        assert isinstance(timeout, urllib3.Timeout)
+
+    def test_no_time_left(self, upstream, context, mocker):
+        context.get_remaining_time_in_millis.return_value = 100
+        http = mocker.Mock()
+
+        with pytest.raises(upstream.UpstreamTimeout):
+            upstream.get(http, "https://example.com", context)
+        http.request.assert_not_called()
+
+    @pytest.mark.parametrize("error", [
+        ReadTimeoutError(None, "https://example.com", "Read timed out."),
+        MaxRetryError(None, "https://example.com", ConnectTimeoutError("Connect timed out.")),
+    ])
+    def test_timeouts_raise_upstream_timeout(self, upstream, context, mocker, error):
+        http = mocker.Mock()
+        http.request.side_effect = error
+
+        with pytest.raises(upstream.UpstreamTimeout):
+            upstream.get(http, "https://example.com", context)
+
+    def test_pool_retries_only_connections(self, upstream, monkeypatch):
+        monkeypatch.setenv("UPSTREAM_POOL_SIZE", "4")
+
+        pool = upstream.build_pool()
+
+        retries = pool.connection_pool_kw["retries"]
+        assert retries.connect == upstream.CONNECT_RETRIES
+        assert retries.read == 0
+        assert pool.connection_pool_kw["maxsize"] == 4
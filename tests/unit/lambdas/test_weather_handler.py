@@ -0,0 +1,358 @@
+"""
+Tests for lambda/weather/handler.py
+"""
+import json
+import threading
+import pytest
+import urllib3
+
+OBSERVATION = {
+    "weather": [{"id": 804, "main": "Clouds", "description": "overcast clouds", "icon": "04n"}],
+    "main": {"temp": -7.78, "feels_like": -13.13, "humidity": 96, "pressure": 1030},
+    "wind": {"speed": 3.26},
+    "dt": 1763577120,
+    "id": 2629691,
+    "name": "Iceland",
+}
+
+
+def event(headers=None, **params):
+    """Builds a synthetic API Gateway HTTP API event."""
+    return {"queryStringParameters": params or None, "headers": headers or {}}
+
+
+@pytest.fixture()
+def mock_request(mocker, weather_handler, upstream_response):
+    return mocker.patch.object(
+        weather_handler.http,
+        "request",
+        return_value=upstream_response(200, json.dumps(OBSERVATION).encode("utf-8")),
+    )
+
+
+class TestWeatherHandler:
+    """Tests for the weather lambda_handler."""
+
+    def test_returns_full_document(self, weather_handler, mock_request):
+        response = weather_handler.lambda_handler(event(location="Iceland"), None)
+
+        assert response["statusCode"] == 200
+        assert json.loads(response["body"]) == OBSERVATION
+        assert response["headers"]["ETag"] == '"1763577120"'
+
+    def test_body_passed_through_unchanged(self, weather_handler, mocker, upstream_response):
+        body = json.dumps(OBSERVATION, indent=2)
+        mocker.patch.object(
+            weather_handler.http, "request", return_value=upstream_response(200, body.encode("utf-8"))
+        )
+        mock_loads = mocker.patch.object(weather_handler.json, "loads")
+
+        response = weather_handler.lambda_handler(event(location="Iceland"), None)
+
+        assert response["body"] == body
+        assert response["headers"]["ETag"] == '"1763577120"'
+        mock_loads.assert_not_called()
+
+    def test_non_json_body_is_an_error(self, weather_handler, mocker, upstream_response):
+        mocker.patch.object(
+            weather_handler.http, "request", return_value=upstream_response(200, b"<html></html>")
+        )
+
+        response = weather_handler.lambda_handler(event(location="Iceland"), None)
+
+        assert response["statusCode"] == 500
+
+    def test_missing_api_key(self, weather_handler, monkeypatch):
+        monkeypatch.delenv("WEATHER_API_KEY")
+
+        response = weather_handler.lambda_handler(event(location="Iceland"), None)
+
+        assert response["statusCode"] == 500
+
+    def test_upstream_error(self, weather_handler, mocker):
+        mocker.patch.object(weather_handler.http, "request", side_effect=Exception("boom"))
+
+        response = weather_handler.lambda_handler(event(location="Iceland"), None)
+
+        assert response["statusCode"] == 500
+
+    class TestCanonicalization:
+        """Tests for location canonicalization in the proxy."""
+
+        def test_query_is_canonical_and_encoded(self, weather_handler, mock_request):
+            weather_handler.lambda_handler(event(location="New York, USA"), None)
+
+            url = mock_request.call_args.args[1]
+            assert "q=new+york%2CUS" in url
+
+        def test_city_id_preferred(self, weather_handler, mock_request):
+            weather_handler.lambda_handler(event(location="London,GB", id="2643743"), None)
+
+            url = mock_request.call_args.args[1]
+            assert "id=2643743" in url
+            assert "q=" not in url
+
+        def test_missing_parameters_use_default(self, weather_handler, mock_request):
+            response = weather_handler.lambda_handler({}, None)
+
+            assert response["statusCode"] == 200
+            assert "q=new+york" in mock_request.call_args.args[1]
+
+    class TestConditionalRequests:
+        """Tests for 304 responses when the observation has not advanced."""
+
+        @pytest.mark.parametrize("headers,params", [
+            ({"If-None-Match": '"1763577120"'}, {}),
+            ({"if-none-match": 'W/"1763577000", "1763577120"'}, {}),
+            ({"If-Modified-Since": "Wed, 19 Nov 2025 18:32:00 GMT"}, {}),
+            ({}, {"since": "1763577120"}),
+        ])
+        def test_not_modified(self, weather_handler, mock_request, headers, params):
+            response = weather_handler.lambda_handler(event(headers, location="Iceland", **params), None)
+
+            assert response["statusCode"] == 304
+            assert "body" not in response
+            assert response["headers"]["ETag"] == '"1763577120"'
+
+        def test_newer_observation_is_sent(self, weather_handler, mock_request):
+            headers = {"If-None-Match": '"1763576000"'}
+
+            response = weather_handler.lambda_handler(event(headers, location="Iceland"), None)
+
+            assert response["statusCode"] == 200
+
+        @pytest.mark.parametrize("headers,params,expected", [
+            ({}, {}, None),
+            ({"if-none-match": '"1763577120"'}, {}, 1763577120),
+            ({"if-none-match": 'W/"1763577000", "1763577120", *'}, {}, 1763577120),
+            ({"if-none-match": '"abc"'}, {}, None),
+            ({"if-modified-since": "Wed, 19 Nov 2025 18:32:00 GMT"}, {}, 1763577120),
+            ({"if-modified-since": "not a date"}, {}, None),
+            ({}, {"since": "1763577120"}, 1763577120),
+            ({}, {"since": "-5"}, None),
+            ({"if-none-match": '"1763577000"'}, {"since": "1763577120"}, 1763577120),
+        ])
+        def test_client_observed_at(self, weather_handler, headers, params, expected):
+            assert weather_handler.client_observed_at(headers, params) == expected
+
+        def test_not_modified_is_not_compressed(self, weather_handler, mock_request):
+            headers = {"If-None-Match": '"1763577120"', "Accept-Encoding": "gzip, br"}
+
+            response = weather_handler.lambda_handler(event(headers, location="Iceland"), None)
+
+            assert response["statusCode"] == 304
+            assert "body" not in response
+            assert "Content-Encoding" not in response["headers"]
+
+        def test_revalidation_served_from_cache(self, weather_handler, mock_request):
+            headers = {"If-None-Match": '"1763577120"'}
+
+            first = weather_handler.lambda_handler(event(location="Iceland"), None)
+            second = weather_handler.lambda_handler(event(headers, location="Iceland"), None)
+
+            assert first["statusCode"] == 200
+            assert second["statusCode"] == 304
+            mock_request.assert_called_once()
+
+        def test_observation_without_dt_is_always_sent(self, weather_handler, mocker, upstream_response):
+            observation = {name: value for name, value in OBSERVATION.items() if name != "dt"}
+            mocker.patch.object(
+                weather_handler.http,
+                "request",
+                return_value=upstream_response(200, json.dumps(observation).encode("utf-8")),
+            )
+
+            response = weather_handler.lambda_handler(
+                event({"If-None-Match": '"1763577120"'}, location="Iceland"), None
+            )
+
+            assert response["statusCode"] == 200
+            assert "ETag" not in response["headers"]
+
+    class TestProjection:
+        """Tests for the fields= parameter."""
+
+        def test_compact_view(self, weather_handler, mock_request):
+            response = weather_handler.lambda_handler(event(location="Iceland", fields="compact"), None)
+
+            assert json.loads(response["body"]) == {
+                "dt": 1763577120,
+                "weather": [{"main": "Clouds", "description": "overcast clouds", "icon": "04n"}],
+                "main": {"temp": -7.78, "humidity": 96},
+            }
+
+        def test_explicit_fields_skip_unknown(self, weather_handler, mock_request):
+            response = weather_handler.lambda_handler(
+                event(location="Iceland", fields="name, wind.speed,sys.sunrise"), None
+            )
+
+            assert json.loads(response["body"]) == {"name": "Iceland", "wind": {"speed": 3.26}}
+
+        @pytest.mark.parametrize("paths,expected", [
+            (("weather.main",), {"weather": [{"main": "Clouds"}, {"main": "Mist"}]}),
+            (
+                ("weather.main", "weather.icon"),
+                {"weather": [{"main": "Clouds", "icon": "04n"}, {"main": "Mist"}]},
+            ),
+            (("weather",), {"weather": [{"main": "Clouds", "icon": "04n"}, {"main": "Mist", "id": 701}]}),
+            (("weather.rain",), {"weather": [{}, {}]}),
+            (("alerts.areas.name",), {"alerts": [{"areas": [{"name": "North"}, {"name": "East"}]}]}),
+            (("name.first",), {}),
+        ])
+        def test_project_through_lists(self, weather_handler, paths, expected):
+            document = {
+                "weather": [{"main": "Clouds", "icon": "04n"}, {"main": "Mist", "id": 701}],
+                "alerts": [{"areas": [{"name": "North", "code": 1}, {"name": "East"}]}],
+                "name": "Iceland",
+            }
+
+            assert weather_handler.projection.project(document, paths) == expected
+
+        @pytest.mark.parametrize("value,expected", [
+            (None, None),
+            ("", None),
+            (" , ", None),
+            ("compact", ("dt", "weather.main", "weather.description", "weather.icon", "main.temp", "main.humidity")),
+            ("name, main.temp,", ("name", "main.temp")),
+        ])
+        def test_parse_fields(self, weather_handler, value, expected):
+            assert weather_handler.projection.parse_fields(value) == expected
+
+    def test_upstream_timeout_returns_504(self, weather_handler, mocker):
+        mocker.patch.object(
+            weather_handler.http,
+            "request",
+            side_effect=urllib3.exceptions.ReadTimeoutError(None, "url", "Read timed out."),
+        )
+        context = mocker.Mock()
+        context.get_remaining_time_in_millis.return_value = 3000
+
+        response = weather_handler.lambda_handler(event(location="Iceland"), context)
+
+        assert response["statusCode"] == 504
+        assert "timed out" in json.loads(response["body"])["error"]
+        timeout = weather_handler.http.request.call_args.kwargs["timeout"]
+        assert timeout.read_timeout < 3
+
+    class TestResponseCache:
+        """Tests for the warm-container response cache."""
+
+        def test_equivalent_locations_share_one_upstream_call(self, weather_handler, mock_request):
+            first = weather_handler.lambda_handler(event(location="NYC"), None)
+            second = weather_handler.lambda_handler(event(location=" new york "), None)
+
+            mock_request.assert_called_once()
+            assert first["body"] == second["body"]
+            assert weather_handler.response_cache.stats["hits"] == 1
+
+        def test_not_found_is_negatively_cached(self, weather_handler, mocker, upstream_response):
+            mock_request = mocker.patch.object(
+                weather_handler.http, "request", return_value=upstream_response(404)
+            )
+
+            for _ in range(3):
+                response = weather_handler.lambda_handler(event(location="Nowhere"), None)
+
+            assert response["statusCode"] == 404
+            mock_request.assert_called_once()
+
+        def test_server_errors_are_not_cached(self, weather_handler, mocker, upstream_response):
+            mock_request = mocker.patch.object(
+                weather_handler.http, "request", return_value=upstream_response(502)
+            )
+
+            weather_handler.lambda_handler(event(location="Iceland"), None)
+            weather_handler.lambda_handler(event(location="Iceland"), None)
+
+            assert mock_request.call_count == 2
+
+    class TestBatch:
+        """Tests for locations=a,b,c batches."""
+
+        def test_mixed_results(self, weather_handler, mocker, upstream_response):
+            def request(method, url, **kwargs):
+                if "nowhere" in url:
+                    return upstream_response(404, b'{"cod":"404"}')
+                return upstream_response(200, json.dumps(OBSERVATION).encode("utf-8"))
+            mocker.patch.object(weather_handler.http, "request", side_effect=request)
+
+            response = weather_handler.lambda_handler(
+                event(locations="Iceland;Nowhere", fields="compact"), None
+            )
+
+            assert response["statusCode"] == 200
+            results = json.loads(response["body"])["results"]
+            assert [(r["location"], r["status"]) for r in results] == [("Iceland", 200), ("Nowhere", 404)]
+            assert results[0]["weather"]["main"] == {"temp": -7.78, "humidity": 96}
+            assert results[1]["error"] == "Location not found"
+
+        def test_equivalent_locations_share_one_upstream_call(self, weather_handler, mock_request):
+            response = weather_handler.lambda_handler(event(locations="Paris,FR,paris, fr,Oslo"), None)
+
+            results = json.loads(response["body"])["results"]
+            assert [r["location"] for r in results] == ["Paris,FR", "paris,fr", "Oslo"]
+            assert mock_request.call_count == 2
+
+        def test_failures_are_per_location(self, weather_handler, mocker, upstream_response):
+            def request(method, url, **kwargs):
+                if "oslo" in url:
+                    raise Exception("boom")
+                return upstream_response(200, json.dumps(OBSERVATION).encode("utf-8"))
+            mocker.patch.object(weather_handler.http, "request", side_effect=request)
+
+            response = weather_handler.lambda_handler(event(locations="Iceland|Oslo"), None)
+
+            statuses = [r["status"] for r in json.loads(response["body"])["results"]]
+            assert statuses == [200, 500]
+
+        @pytest.mark.parametrize("fields", [None, "compact"])
+        @pytest.mark.parametrize("bad_body", [b'{"a":}', b'{"dt":1}{"dt":2}', b'{"weather": [}'])
+        def test_malformed_body_fails_only_its_location(
+            self, weather_handler, mocker, upstream_response, bad_body, fields
+        ):
+            def request(method, url, **kwargs):
+                if "oslo" in url:
+                    return upstream_response(200, bad_body)
+                return upstream_response(200, json.dumps(OBSERVATION).encode("utf-8"))
+            mocker.patch.object(weather_handler.http, "request", side_effect=request)
+            params = {"locations": "Iceland|Oslo", **({"fields": fields} if fields else {})}
+
+            response = weather_handler.lambda_handler(event(**params), None)
+
+            results = json.loads(response["body"])["results"]
+            assert [r["status"] for r in results] == [200, 500]
+            assert results[0]["weather"]["dt"] == OBSERVATION["dt"]
+
+        def test_fetches_concurrently(self, weather_handler, mocker, upstream_response):
+            barrier = threading.Barrier(3, timeout=5)
+
+            def request(method, url, **kwargs):
+                barrier.wait()  # Only returns once all three are in flight together
+                return upstream_response(200, json.dumps(OBSERVATION).encode("utf-8"))
+            mocker.patch.object(weather_handler.http, "request", side_effect=request)
+
+            response = weather_handler.lambda_handler(event(locations="Oslo;Paris;Rome"), None)
+
+            assert [r["status"] for r in json.loads(response["body"])["results"]] == [200, 200, 200]
+
+        def test_too_many_locations(self, weather_handler, mock_request):
+            locations = ";".join(f"city {n}" for n in range(weather_handler.MAX_BATCH_LOCATIONS + 1))
+
+            response = weather_handler.lambda_handler(event(locations=locations), None)
+
+            assert response["statusCode"] == 400
+            mock_request.assert_not_called()
+
+        @pytest.mark.parametrize("value, expected", [
+            ("London,GB,Paris", ["London,GB", "Paris"]),
+            ("london,gb,paris,fr", ["london,gb", "paris,fr"]),
+            ("NYC,LA,SF", ["NYC", "LA", "SF"]),
+            ("London,SF,Paris", ["London", "SF", "Paris"]),
+            ("Paris,XX,Oslo", ["Paris", "XX", "Oslo"]),
+            ("GB,London", ["GB", "London"]),
+            ("New York, US;Paris, FR", ["New York, US", "Paris, FR"]),
+            ("Oslo|Rome|", ["Oslo", "Rome"]),
+            (" , ", []),
+        ])
+        def test_parse_locations(self, weather_handler, value, expected):
+            assert weather_handler.parse_locations(value) == expected
@@ -0,0 +1,65 @@
+"""
+Tests for async_recipe_script.py
+"""
+import asyncio
+import httpx
+from src.scripts.async_recipe_script import AsyncRecipeScript
+
+
+def make_script(handler):
+    """Creates an AsyncRecipeScript whose client is served by handler."""
+    return AsyncRecipeScript(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+class TestAsyncRecipeScript:
+    """Tests for the AsyncRecipeScript class."""
+
+    def test_get_recipes_success(self):
+        """Test that recipes are returned as parsed JSON."""
+        seen = []
+
+        def handler(request):
+            seen.append(dict(request.url.params))
+            return httpx.Response(200, json=[{"id": 1, "title": "Test Recipe"}])
+
+        script = make_script(handler)
+
+        result = asyncio.run(script.get_recipes("tomato,cheese", number=2))
+
+        assert result == [{"id": 1, "title": "Test Recipe"}]
+        assert seen == [{"ingredients": "tomato,cheese", "number": "2", "ignorePantry": "true", "ranking": "1"}]
+
+    def test_get_recipes_no_recipes_found(self):
+        """Test scenario where no recipes are found."""
+        script = make_script(lambda request: httpx.Response(200, json=[]))
+
+        assert asyncio.run(script.get_recipes("unknown")) == '{"error": "No recipes found."}'
+
+    def test_get_recipes_http_error(self):
+        """Test HTTP error during recipe retrieval."""
+        script = make_script(lambda request: httpx.Response(500))
+
+        assert asyncio.run(script.get_recipes("tomato")) == '{"error": "Error finding recipes."}'
+
+    def test_get_recipe_image_success(self, mocker):
+        """Test successful image retrieval."""
+        mock_image_open = mocker.patch("src.scripts.async_recipe_script.Image.open")
+        script = make_script(lambda request: httpx.Response(200, content=b"fake_image_data"))
+
+        result = asyncio.run(script.get_recipe_image("http://example.com/image.jpg"))
+
+        assert result == mock_image_open.return_value
+
+    def test_get_recipe_image_http_error(self):
+        """Test HTTP error during image retrieval."""
+        script = make_script(lambda request: httpx.Response(404))
+
+        result = asyncio.run(script.get_recipe_image("http://example.com/image.jpg"))
+
+        assert result == '{"error": "Error fetching recipe image."}'
+
+    def test_get_recipe_image_empty_url(self):
+        """Test scenario where image URL is empty."""
+        script = make_script(lambda request: httpx.Response(200))
+
+        assert asyncio.run(script.get_recipe_image("")) == '{"error": "No image URL provided for recipe."}'
@@ -0,0 +1,171 @@
+"""
+Tests for async_weather_script.py
+"""
+import asyncio
+import httpx
+import pytest
+from src.scripts.async_weather_script import AsyncWeatherScript
+
+WEATHER_DOCUMENT = {
+    "weather": [{"main": "Clouds", "description": "overcast clouds", "icon": "04n"}],
+    "main": {"temp": -7.78, "humidity": 96},
+}
+
+
+def make_script(mocker, handler):
+    """Creates an AsyncWeatherScript whose client is served by handler."""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    script = AsyncWeatherScript(client=client)
+    mocker.patch.object(script, "get_icon_path", mocker.AsyncMock(return_value="icon.png"))
+    return script
+
+
+class TestAsyncWeatherScript:
+    """Tests for the AsyncWeatherScript class."""
+
+    def test_get_weather_success(self, mocker):
+        """Test that results match the synchronous WeatherScript shape."""
+        script = make_script(mocker, lambda request: httpx.Response(200, json=WEATHER_DOCUMENT))
+
+        result = asyncio.run(script.get_weather("Iceland"))
+
+        assert result == {
+            "icon_path": "icon.png",
+            "icon_code": "04n",
+            "weather": "Clouds",
+            "temperature": -7.78,
+            "humidity": 96,
+            "description": "overcast clouds",
+            "observed_at": None,
+        }
+
+    def test_get_weather_sends_location(self, mocker):
+        """Test that the location is sent as a query parameter."""
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.params["location"])
+            return httpx.Response(200, json=WEATHER_DOCUMENT)
+
+        script = make_script(mocker, handler)
+        asyncio.run(script.get_weather("Reykjavik"))
+
+        assert seen == ["reykjavik"]  # Sent in canonical form
+
+    def test_get_weather_not_found(self, mocker):
+        """Test 404 handling."""
+        script = make_script(mocker, lambda request: httpx.Response(404, json={}))
+
+        result = asyncio.run(script.get_weather("Nowhere"))
+
+        assert result == {"error": "Location not found"}
+
+    def test_get_weather_transport_error(self, mocker):
+        """Test that client errors become the request exception error shape."""
+        def handler(request):
+            raise httpx.ConnectError("boom")
+
+        script = make_script(mocker, handler)
+
+        result = asyncio.run(script.get_weather("Iceland"))
+
+        assert result == {"error": "Request exception occurred while fetching data"}
+
+    def test_get_weather_uses_cache(self, mocker):
+        """Test that a repeated lookup is served from cache."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json=WEATHER_DOCUMENT)
+
+        script = make_script(mocker, handler)
+
+        async def run():
+            await script.get_weather("Iceland")
+            await script.get_weather("ICELAND")
+
+        asyncio.run(run())
+
+        assert len(calls) == 1
+
+    def test_get_weather_revalidates_with_304(self, mocker):
+        """Test that an expired entry is revalidated and kept when the proxy answers 304."""
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("If-None-Match"))
+            return httpx.Response(304)
+
+        script = make_script(mocker, handler)
+        cached = {"weather": "Clouds", "observed_at": 1763577120}
+        script.cache.set("iceland", cached)
+        script.cache.clock = lambda: cached_at + 10000
+        cached_at = script.cache.get("iceland").stored_at
+
+        result = asyncio.run(script.get_weather("Iceland"))
+
+        assert result == cached
+        assert seen == ['"1763577120"']
+        assert script.get_stats()["revalidated"] == 1
+
+    def test_get_weather_many(self, mocker):
+        """Test that the async batch yields one result per location."""
+        def handler(request):
+            if request.url.params["location"] == "nowhere":
+                return httpx.Response(404, json={})
+            return httpx.Response(200, json=WEATHER_DOCUMENT)
+
+        script = make_script(mocker, handler)
+
+        async def run():
+            return {location: result async for location, result in script.get_weather_many(["Oslo", "Nowhere"])}
+
+        results = asyncio.run(run())
+
+        assert results["Nowhere"] == {"error": "Location not found"}
+        assert results["Oslo"]["weather"] == "Clouds"
+
+    @pytest.mark.parametrize("icon_code", ["10x", "500d", ""])
+    def test_get_icon_path_invalid_code(self, icon_code):
+        """Test that invalid icon codes are rejected without a request."""
+        script = AsyncWeatherScript(client=httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(500))))
+
+        assert asyncio.run(script.get_icon_path(icon_code)) is None
+
+    def test_get_weather_fetches_icon_in_background(self, mocker):
+        """Test that a missing icon is downloaded through the client after the result returns."""
+        requested = []
+
+        def handler(request):
+            requested.append(request.url.path)
+            if request.url.path.endswith(".png"):
+                return httpx.Response(200, content=b"png")
+            return httpx.Response(200, json=WEATHER_DOCUMENT)
+
+        script = AsyncWeatherScript(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        mocker.patch.object(script.icon_index, "lookup", return_value=None)
+        mock_store = mocker.patch("src.scripts.async_weather_script.store_icon", return_value="icon.png")
+
+        async def run():
+            result = await script.get_weather("Iceland")
+            assert not mock_store.called  # Not downloaded inline
+            await script.aclose()
+            return result
+
+        result = asyncio.run(run())
+
+        assert result["icon_path"] is None
+        assert requested[1] == "/img/wn/04n@2x.png"
+        assert mock_store.call_args.args == ("04n", b"png", script.icon_index)
+
+    def test_get_icon_path_downloads_with_client(self, mocker):
+        """Test that waiting for an icon downloads it through the client and stores it."""
+        script = AsyncWeatherScript(
+            client=httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(200, content=b"png")))
+        )
+        mocker.patch.object(script.icon_index, "lookup", return_value=None)
+        mock_store = mocker.patch("src.scripts.async_weather_script.store_icon", return_value="icon.png")
+
+        assert asyncio.run(script.get_icon_path("04n")) == "icon.png"
+        mock_store.assert_called_once_with("04n", b"png", script.icon_index)
@@ -0,0 +1,121 @@
+"""
+Tests for city_index.py
+"""
+import pytest
+from src.scripts.city_index import CityIndex, edit_distance, normalize_city_name, split_country
+
+
+@pytest.fixture()
+def city_index():
+    """Fixture for a small CityIndex."""
+    cities = [
+        CityIndex.make_city("London", "GB", 8961989, "2643743"),
+        CityIndex.make_city("London", "CA", 346765),
+        CityIndex.make_city("Londrina", "BR", 575377),
+        CityIndex.make_city("Paris", "FR", 2138551),
+        CityIndex.make_city("Paris", "US", 24171),
+        CityIndex.make_city("São Paulo", "BR", 10021295),
+        CityIndex.make_city("Berlin", "DE", 3426354),
+        CityIndex.make_city("Bern", "CH", 133883),
+        CityIndex.make_city("Bonn", "DE", 327258),
+        CityIndex.make_city("New York", "US", 8804190),
+    ]
+    return CityIndex(cities)
+
+
+class TestHelpers:
+    """Tests for module-level helpers."""
+
+    @pytest.mark.parametrize("name,expected", [
+        ("São Paulo", "sao paulo"),
+        ("  NEW   york ", "new york"),
+        ("St. Louis", "st louis"),
+        ("Winston-Salem", "winston salem"),
+    ])
+    def test_normalize_city_name(self, name, expected):
+        assert normalize_city_name(name) == expected
+
+    @pytest.mark.parametrize("query,expected", [
+        ("Paris, fr", ("Paris", "FR")),
+        ("Paris,US", ("Paris", "US")),
+        ("Paris", ("Paris", None)),
+        ("Washington, District of Columbia", ("Washington, District of Columbia", None)),
+    ])
+    def test_split_country(self, query, expected):
+        assert split_country(query) == expected
+
+    @pytest.mark.parametrize("a,b,expected", [
+        ("london", "london", 0),
+        ("london", "londn", 1),
+        ("london", "lodnon", 1),  # Transposition counts as one edit
+        ("london", "paris", 2),
+    ])
+    def test_edit_distance(self, a, b, expected):
+        assert edit_distance(a, b, max_distance=1) == expected
+
+
+class TestCityIndex:
+    """Tests for the CityIndex class."""
+
+    def test_prefix_ranks_by_population(self, city_index):
+        results = city_index.prefix("lond")
+
+        assert [(city.name, city.country) for city in results] == [
+            ("London", "GB"),
+            ("Londrina", "BR"),
+            ("London", "CA"),
+        ]
+
+    def test_prefix_respects_limit_and_country(self, city_index):
+        assert city_index.prefix("lond", limit=1) == [city_index.resolve("London")]
+        assert [city.country for city in city_index.prefix("lond", country="CA")] == ["CA"]
+
+    def test_prefix_folds_accents(self, city_index):
+        assert city_index.prefix("sao")[0].name == "São Paulo"
+
+    def test_fuzzy_tolerates_one_typo(self, city_index):
+        assert city_index.fuzzy("Berln")[0].name == "Berlin"
+
+    def test_suggest_falls_back_to_fuzzy(self, city_index):
+        names = [city.name for city in city_index.suggest("Lodnon")]
+
+        assert names[:2] == ["London", "London"]
+
+    def test_resolve_exact_prefers_largest(self, city_index):
+        city = city_index.resolve("paris")
+
+        assert (city.name, city.country) == ("Paris", "FR")
+
+    def test_resolve_with_country(self, city_index):
+        city = city_index.resolve("Paris, US")
+
+        assert (city.name, city.country) == ("Paris", "US")
+
+    def test_resolve_does_not_correct_typos(self, city_index):
+        assert city_index.resolve("new yrok") is None
+
+    def test_correction_unambiguous_typo(self, city_index):
+        assert city_index.correction("new yrok").name == "New York"
+
+    def test_correction_ambiguous_typo(self, city_index):
+        """Test that "Benn" gets no correction when "Bern" and "Bonn" are equally close."""
+        assert city_index.correction("Benn") is None
+        assert city_index.correction("Atlantis") is None
+
+    def test_resolve_unknown(self, city_index):
+        assert city_index.resolve("Atlantis") is None
+        assert city_index.resolve("   ") is None
+
+    def test_save_and_load_round_trip(self, city_index, tmp_path, mocker):
+        mocker.stopall()  # Use the real filesystem rather than the mocked config file
+        path = str(tmp_path / "cities.tsv")
+
+        city_index.save(path)
+        loaded = CityIndex.load(path)
+
+        assert len(loaded) == len(city_index)
+        assert loaded.resolve("London").city_id == "2643743"
+        assert loaded.resolve("London, CA").city_id is None
+
+    def test_load_missing_file(self, tmp_path):
+        assert len(CityIndex.load(str(tmp_path / "missing.tsv"))) == 0
@@ -0,0 +1,103 @@
+"""
+Tests for http_transport.py
+"""
+import pytest
+from src.scripts.http_transport import HttpTransport, RETRY_STATUS_CODES, build_async_client
+
+
+@pytest.fixture()
+def transport():
+    """Fixture to create an HttpTransport instance."""
+    transport = HttpTransport(
+        pool_maxsize=4, connect_timeout=1, read_timeout=2, retries=3
+    )
+    yield transport
+    transport.close()
+
+
+class TestHttpTransport:
+    """Tests for the HttpTransport class."""
+
+    class TestSessionFor:
+        """Tests for session_for method."""
+
+        def test_same_host_reuses_session(self, transport):
+            """Test that requests to the same host share one pooled session."""
+            first = transport.session_for("https://api.example.com/weather?q=a")
+            second = transport.session_for("https://API.example.com/recipe")
+
+            assert first is second
+
+        def test_different_hosts_get_separate_sessions(self, transport):
+            """Test that each host gets its own pooled session."""
+            api = transport.session_for("https://api.example.com/weather")
+            cdn = transport.session_for("https://img.example.com/icon.png")
+
+            assert api is not cdn
+
+        def test_adapter_configuration(self, transport):
+            """Test that the mounted adapter uses the configured pool size and retry policy."""
+            session = transport.session_for("https://api.example.com/weather")
+            adapter = session.get_adapter("https://api.example.com/weather")
+
+            assert adapter._pool_maxsize == 4
+            assert adapter.max_retries.total == 3
+            assert adapter.max_retries.status_forcelist == RETRY_STATUS_CODES
+            assert adapter.max_retries.raise_on_status is False
+
+        def test_session_accepts_compressed_responses(self, transport):
+            """Test that sessions advertise every encoding they can decode."""
+            session = transport.session_for("https://api.example.com/weather")
+
+            assert "gzip" in session.headers["Accept-Encoding"]
+
+    class TestGet:
+        """Tests for get method."""
+
+        def test_get_applies_default_timeout(self, transport, mocker):
+            """Test that get uses the configured connect/read timeout."""
+            session = transport.session_for("https://api.example.com/weather")
+            mock_get = mocker.patch.object(session, "get")
+
+            transport.get("https://api.example.com/weather", params={"location": "Oslo"})
+
+            mock_get.assert_called_once_with(
+                "https://api.example.com/weather",
+                params={"location": "Oslo"},
+                timeout=(1, 2),
+            )
+
+        def test_get_respects_explicit_timeout(self, transport, mocker):
+            """Test that an explicit timeout overrides the default."""
+            session = transport.session_for("https://api.example.com/weather")
+            mock_get = mocker.patch.object(session, "get")
+
+            transport.get("https://api.example.com/weather", timeout=5)
+
+            mock_get.assert_called_once_with("https://api.example.com/weather", timeout=5)
+
+    class TestClose:
+        """Tests for close method."""
+
+        def test_close_drops_sessions(self, transport):
+            """Test that close releases sessions so new ones are created afterwards."""
+            before = transport.session_for("https://api.example.com/weather")
+            transport.close()
+            after = transport.session_for("https://api.example.com/weather")
+
+            assert before is not after
+
+
+class TestBuildAsyncClient:
+    """Tests for the httpx client used by the async script variants."""
+
+    def test_pool_limits_reach_the_transport(self):
+        """Test that the connection pool is bounded like the sync sessions, not httpx's defaults."""
+        client = build_async_client(pool_maxsize=3, connect_timeout=1, read_timeout=2, retries=4)
+
+        pool = client._transport._pool
+        assert pool._max_connections == 3
+        assert pool._max_keepalive_connections == 3
+        assert pool._retries == 4
+        assert client.timeout.connect == 1
+        assert client.timeout.read == 2
@@ -0,0 +1,81 @@
+"""
+Tests for location_canonicalizer.py
+"""
+import pytest
+from src.scripts.city_index import CityIndex
+from src.scripts.location_canonicalizer import LocationCanonicalizer, location_key, parse_location
+
+
+@pytest.fixture()
+def canonicalizer():
+    """Fixture for a LocationCanonicalizer backed by a small CityIndex."""
+    cities = [
+        CityIndex.make_city("New York", "US", 8804190, "5128581"),
+        CityIndex.make_city("London", "GB", 8961989, "2643743"),
+        CityIndex.make_city("London", "CA", 346765),
+        CityIndex.make_city("Mumbai", "IN", 12691836),
+    ]
+    return LocationCanonicalizer(CityIndex(cities))
+
+
+class TestParseLocation:
+    """Tests for parse_location and location_key."""
+
+    @pytest.mark.parametrize("location,expected", [
+        ("new york", ("new york", None)),
+        ("  New   York ", ("new york", None)),
+        ("New York, us", ("new york", "US")),
+        ("New York, USA", ("new york", "US")),
+        ("NYC", ("new york", None)),
+        ("London, United Kingdom", ("london", "GB")),
+        ("Bombay", ("mumbai", None)),
+        ("Reykjavík", ("reykjavik", None)),
+        ("Portland, Oregon", ("portland oregon", None)),
+    ])
+    def test_parse_location(self, location, expected):
+        assert parse_location(location) == expected
+
+    def test_location_key(self):
+        assert location_key("london", "GB") == "london,gb"
+        assert location_key("london") == "london"
+        assert location_key("london", "GB", "2643743") == "id:2643743"
+
+
+class TestLocationCanonicalizer:
+    """Tests for LocationCanonicalizer."""
+
+    @pytest.mark.parametrize("location", [
+        "new york", " New York", "New York, US", "New York, USA", "NYC",
+    ])
+    def test_equivalent_spellings_share_key(self, canonicalizer, location):
+        canonical = canonicalizer.canonicalize(location)
+        assert canonical.key == "id:5128581"
+        assert canonical.query == "New York,US"
+        assert canonical.city_id == "5128581"
+
+    def test_country_narrows_resolution(self, canonicalizer):
+        canonical = canonicalizer.canonicalize("london, ca")
+        assert canonical.key == "london,ca"
+        assert canonical.query == "London,CA"
+        assert canonical.city_id is None
+
+    def test_typos_are_not_corrected(self, canonicalizer):
+        """Test that only exact names resolve; fuzzy matches are left to the UI."""
+        canonical = canonicalizer.canonicalize("Londn")
+        assert canonical.key == "londn"
+        assert canonical.query == "londn"
+
+    def test_without_index(self):
+        canonical = LocationCanonicalizer().canonicalize("New York, USA")
+        assert canonical == ("new york,us", "new york,US", None)
+
+    def test_stats(self, canonicalizer):
+        canonicalizer.canonicalize("new york")
+        canonicalizer.canonicalize("NYC")
+        canonicalizer.canonicalize("londn")
+        canonicalizer.canonicalize("Bombay")
+
+        assert canonicalizer.stats["lookups"] == 4
+        assert canonicalizer.stats["rewritten"] == 3
+        assert canonicalizer.stats["resolved"] == 3
+        assert canonicalizer.stats["resolved_ids"] == 2
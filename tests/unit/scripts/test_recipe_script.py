@@ -47,7 +47,7 @@ class TestRecipeScript:
             mock_response = mocker.Mock()
             mock_response.status_code = 200
             mock_response.json.return_value = [{"id": 1, "title": "Test Recipe"}]
-            mock_get = mocker.patch("requests.get", return_value=mock_response)
+            mock_get = mocker.patch("scripts.http_transport.get", return_value=mock_response)
 
             ingredients = "tomato,cheese"
             number = 2
@@ -69,7 +69,7 @@ class TestRecipeScript:
                 {"id": 1, "title": "Test Recipe"}
             ]
 
-            mocker.patch("requests.get", return_value=mock_response)
+            mocker.patch("scripts.http_transport.get", return_value=mock_response)
 
             result = script.get_recipes("tomato,cheese", number=2)
             assert result == [{"id": 1, "title": "Test Recipe"}]
@@ -80,7 +80,7 @@ class TestRecipeScript:
             mock_response.status_code = 200
             mock_response.json.return_value = []
 
-            mocker.patch("requests.get", return_value=mock_response)
+            mocker.patch("scripts.http_transport.get", return_value=mock_response)
 
             result = script.get_recipes("unknown_ingredient", number=1)
             assert result == '{"error": "No recipes found."}'
@@ -91,14 +91,14 @@ class TestRecipeScript:
             mock_response.status_code = 404
             mock_response.raise_for_status.side_effect = Exception("404 Not Found")
 
-            mocker.patch("requests.get", return_value=mock_response)
+            mocker.patch("scripts.http_transport.get", return_value=mock_response)
 
             result = script.get_recipes("tomato", number=1)
             assert result == '{"error": "Error finding recipes."}'
 
         def test_get_recipes_exception(self, script, mocker):
             """Test generic exception during recipe retrieval."""
-            mocker.patch("requests.get", side_effect=Exception("Network error"))
+            mocker.patch("scripts.http_transport.get", side_effect=Exception("Network error"))
 
             result = script.get_recipes("tomato", number=1)
             assert result == '{"error": "Error finding recipes."}'
@@ -112,7 +112,7 @@ class TestRecipeScript:
             mock_response.status_code = 200
             mock_response.content = image_content
 
-            mocker.patch("requests.get", return_value=mock_response)
+            mocker.patch("scripts.http_transport.get", return_value=mock_response)
             mock_image_open = mocker.patch("PIL.Image.open")
             mock_pil_image = mocker.Mock()
             mock_image_open.return_value = mock_pil_image
@@ -135,14 +135,14 @@ class TestRecipeScript:
             mock_response = mocker.Mock()
             mock_response.raise_for_status.side_effect = Exception("404 Not Found")
             
-            mocker.patch("requests.get", return_value=mock_response)
+            mocker.patch("scripts.http_transport.get", return_value=mock_response)
 
             result = script.get_recipe_image("http://example.com/image.jpg")
             assert result == '{"error": "Error fetching recipe image."}'
         
         def test_get_recipe_image_network_error(self, script, mocker):
             """Test network error during image retrieval."""
-            mocker.patch("requests.get", side_effect=Exception("Network error"))
+            mocker.patch("scripts.http_transport.get", side_effect=Exception("Network error"))
 
             result = script.get_recipe_image("http://example.com/image.jpg")
             assert result == '{"error": "Error fetching recipe image."}'
@@ -153,7 +153,7 @@ class TestRecipeScript:
             mock_response.status_code = 200
             mock_response.content = b"not_an_image"
 
-            mocker.patch("requests.get", return_value=mock_response)
+            mocker.patch("scripts.http_transport.get", return_value=mock_response)
             mocker.patch("PIL.Image.open", side_effect=Exception("Invalid image data"))
 
             result = script.get_recipe_image("http://example.com/image.jpg")
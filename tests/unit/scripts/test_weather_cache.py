@@ -0,0 +1,93 @@
+"""
+Tests for weather_cache.py
+"""
+import pytest
+from src.scripts.weather_cache import WeatherCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture()
+def cache(clock):
+    """Fixture to create an in-memory WeatherCache instance."""
+    cache = WeatherCache(ttl=60, stale_ttl=300, max_entries=2, clock=clock)
+    yield cache
+    cache.close()
+
+
+class TestWeatherCache:
+    """Tests for the WeatherCache class."""
+
+    def test_get_missing_key(self, cache):
+        assert cache.get("oslo") is None
+
+    def test_set_and_get(self, cache):
+        cache.set("oslo", {"weather": "Clear"})
+
+        entry = cache.get("oslo")
+
+        assert entry.value == {"weather": "Clear"}
+        assert cache.is_fresh(entry)
+
+    def test_entry_goes_stale_after_ttl(self, cache, clock):
+        cache.set("oslo", {"weather": "Clear"})
+        clock.now += 61
+
+        entry = cache.get("oslo")
+
+        assert not cache.is_fresh(entry)
+        assert cache.is_servable(entry)
+
+    def test_entry_not_servable_after_stale_ttl(self, cache, clock):
+        cache.set("oslo", {"weather": "Clear"})
+        clock.now += 361
+
+        assert not cache.is_servable(cache.get("oslo"))
+
+    def test_lru_eviction(self, cache):
+        cache.set("oslo", {"weather": "Clear"})
+        cache.set("paris", {"weather": "Rain"})
+        cache.get("oslo")  # Touch so paris becomes least recently used
+        cache.set("rome", {"weather": "Clouds"})
+
+        assert cache.get("paris") is None
+        assert cache.get("oslo") is not None
+        assert cache.get("rome") is not None
+        assert len(cache) == 2
+
+    def test_sqlite_backing_survives_restart(self, tmp_path, clock):
+        db_path = str(tmp_path / "weather_cache.db")
+        first = WeatherCache(ttl=60, db_path=db_path, clock=clock)
+        first.set("oslo", {"weather": "Clear", "temperature": 3.5})
+        first.close()
+
+        second = WeatherCache(ttl=60, db_path=db_path, clock=clock)
+        entry = second.get("oslo")
+        second.close()
+
+        assert entry.value == {"weather": "Clear", "temperature": 3.5}
+        assert entry.stored_at == clock.now
+
+    def test_sqlite_backing_is_bounded(self, tmp_path, clock):
+        db_path = str(tmp_path / "weather_cache.db")
+        cache = WeatherCache(max_entries=1, db_path=db_path, clock=clock)
+        cache.set("oslo", {"weather": "Clear"})
+        clock.now += 1
+        cache.set("paris", {"weather": "Rain"})
+        cache.close()
+
+        reopened = WeatherCache(max_entries=1, db_path=db_path, clock=clock)
+        assert reopened.get("oslo") is None
+        assert reopened.get("paris").value == {"weather": "Rain"}
+        reopened.close()
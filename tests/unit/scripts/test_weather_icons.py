@@ -0,0 +1,78 @@
+"""
+Tests for weather_icons.py
+"""
+import threading
+import pytest
+from src.scripts.weather_icons import ALL_ICON_CODES, IconIndex
+
+
+@pytest.fixture()
+def icon_dir(tmp_path):
+    """Fixture for a directory holding a few icons and some unrelated files."""
+    for name in ["weather_icon_01d.png", "weather_icon_10n.png", "weather_icon_xx.png", "notes.txt"]:
+        tmp_path.joinpath(name).write_bytes(b"png")
+    tmp_path.joinpath("weather_icon_02d.png").mkdir()
+    return tmp_path
+
+
+class TestIconIndex:
+    """Tests for the IconIndex class."""
+
+    def test_scan_indexes_valid_icons_only(self, icon_dir):
+        index = IconIndex(str(icon_dir))
+
+        assert index.codes() == {"01d", "10n"}
+        assert index.lookup("01d") == str(icon_dir / "weather_icon_01d.png")
+
+    def test_lookup_missing_code(self, icon_dir):
+        index = IconIndex(str(icon_dir))
+
+        assert index.lookup("09d") is None
+        assert "09d" not in index
+
+    def test_missing_directory_gives_empty_index(self, tmp_path):
+        index = IconIndex(str(tmp_path / "does_not_exist"))
+
+        assert len(index) == 0
+
+    def test_add_publishes_new_mapping(self, icon_dir):
+        index = IconIndex(str(icon_dir))
+        before = index._paths
+
+        index.add("13n", index.path_for("13n"))
+
+        assert index.lookup("13n") == str(icon_dir / "weather_icon_13n.png")
+        assert "13n" not in before  # Earlier snapshot is never mutated
+
+    def test_rescan_picks_up_new_files(self, icon_dir):
+        index = IconIndex(str(icon_dir))
+        icon_dir.joinpath("weather_icon_50d.png").write_bytes(b"png")
+
+        index.scan()
+
+        assert "50d" in index
+
+    def test_all_icon_codes(self):
+        assert len(ALL_ICON_CODES) == 18
+        assert {"09d", "11d", "13n", "50n"} <= set(ALL_ICON_CODES)
+
+    def test_prefetch_fetches_missing_codes_in_background(self, icon_dir):
+        index = IconIndex(str(icon_dir))
+        fetched = []
+
+        futures = index.prefetch(lambda code: fetched.append(code) or code, codes=["01d", "09d", "13n"])
+        results = {code: future.result(timeout=5) for code, future in futures.items()}
+
+        assert results == {"09d": "09d", "13n": "13n"}
+        assert sorted(fetched) == ["09d", "13n"]
+
+    def test_fetch_in_background_deduplicates_pending(self, icon_dir):
+        index = IconIndex(str(icon_dir))
+        release = threading.Event()
+
+        first = index.fetch_in_background("09d", lambda code: release.wait(5))
+        second = index.fetch_in_background("09d", lambda code: None)
+        release.set()
+
+        assert first is second
+        first.result(timeout=5)
@@ -5,6 +5,8 @@ import pytest
 import os
 import requests
 from src.scripts.weather_script import WeatherScript
+from src.scripts.weather_cache import WeatherCache
+from src.scripts.weather_icons import IconIndex
 
 @pytest.fixture
 def weather_script():
@@ -67,24 +69,25 @@ def mock_get_weather_not_found():
 
 
 @pytest.fixture()
-def icon_path_mocks(mocker):
+def icon_path_mocks(mocker, weather_script):
     """Fixture for common mocks used in get_icon_path tests."""
-    mock_get_resource_path = mocker.patch("src.scripts.weather_script.get_resource_path")
     weather_dir = os.path.join("mocked_path", "assets", "weather")
-    mock_get_resource_path.return_value = weather_dir
+    weather_script.icon_index = IconIndex(weather_dir)
 
     mock_exists = mocker.patch("src.scripts.weather_script.os.path.exists")
 
     mock_makedirs = mocker.patch("src.scripts.weather_script.os.makedirs")
 
-    mock_get = mocker.patch("src.scripts.weather_script.requests.get")
+    mock_replace = mocker.patch("src.scripts.weather_script.os.replace")
+
+    mock_get = mocker.patch("scripts.http_transport.get")
 
     mock_open_file = mocker.patch("builtins.open", mocker.mock_open())
 
     return {
-        "get_resource_path": mock_get_resource_path,
         "exists": mock_exists,
         "makedirs": mock_makedirs,
+        "replace": mock_replace,
         "get": mock_get,
         "open": mock_open_file,
         "weather_dir": weather_dir
@@ -100,25 +103,49 @@ class TestWeatherScript:
             """Test get_weather with successful API response."""
             mock_response_data, mock_status_code = mock_get_weather_success
 
-            mock_get = mocker.patch("requests.get")
+            mock_get = mocker.patch("scripts.http_transport.get")
             mock_get.return_value.status_code = mock_status_code
             mock_get.return_value.json.return_value = mock_response_data
+            weather_script.icon_index = IconIndex(os.path.join("mocked_path", "assets", "weather"))
+            weather_script.icon_index.add("04n", "weather_icon_04n.png")
 
             result = weather_script.get_weather("Iceland")
 
             assert result == {
-                "icon_path": weather_script.get_icon_path("04n"),
+                "icon_path": "weather_icon_04n.png",
+                "icon_code": "04n",
                 "weather": "Clouds",
                 "temperature": -7.78,
                 "humidity": 96,
                 "description": "overcast clouds",
+                "observed_at": 1763577120,
+            }
+
+        def test_get_weather_requests_only_used_fields(self, weather_script, mocker, mock_get_weather_success):
+            """Test that the proxy is asked for a projection with every field the result reads."""
+            mock_response_data, mock_status_code = mock_get_weather_success
+            mock_get = mocker.patch("scripts.http_transport.get")
+            mock_get.return_value.status_code = mock_status_code
+            mock_get.return_value.json.return_value = {
+                "dt": mock_response_data["dt"],
+                "weather": [{key: mock_response_data["weather"][0][key] for key in ("main", "description", "icon")}],
+                "main": {key: mock_response_data["main"][key] for key in ("temp", "humidity")},
             }
+            mocker.patch.object(weather_script, "get_icon_path", return_value=None)
+
+            result = weather_script.get_weather("Iceland")
+
+            assert mock_get.call_args.kwargs["params"]["fields"] == (
+                "dt,weather.main,weather.description,weather.icon,main.temp,main.humidity"
+            )
+            assert result["temperature"] == -7.78
+            assert result["observed_at"] == 1763577120
 
         def test_get_weather_not_found(self, weather_script, mocker, mock_get_weather_not_found):
             """Test get_weather with 404 API response."""
             mock_response_data, mock_status_code = mock_get_weather_not_found
 
-            mock_get = mocker.patch("requests.get")
+            mock_get = mocker.patch("scripts.http_transport.get")
             mock_get.return_value.status_code = mock_status_code
             mock_get.return_value.json.return_value = mock_response_data
 
@@ -128,29 +155,261 @@ class TestWeatherScript:
 
         def test_get_weather_request_exception(self, weather_script, mocker):
             """Test get_weather handling of RequestException."""
-            mock_get = mocker.patch("requests.get")
+            mock_get = mocker.patch("scripts.http_transport.get")
             mock_get.side_effect = Exception("Request failed")
 
             result = weather_script.get_weather("Iceland")
 
             assert result == {"error": "Exception occurred while fetching data"}
 
+    class TestWeatherCaching:
+        """Tests for the response cache in front of get_weather."""
+
+        @pytest.fixture()
+        def cached_script(self, mocker):
+            clock = mocker.Mock(return_value=1000.0)
+            script = WeatherScript(cache=WeatherCache(ttl=60, stale_ttl=300, clock=clock))
+            mocker.patch.object(script, "get_icon_path", return_value=None)
+            return script, clock
+
+        def test_repeated_lookup_served_from_cache(self, cached_script, mocker, mock_get_weather_success):
+            """Test that equivalent locations only hit the upstream once while fresh."""
+            script, _ = cached_script
+            mock_response_data, mock_status_code = mock_get_weather_success
+            mock_get = mocker.patch("scripts.http_transport.get")
+            mock_get.return_value.status_code = mock_status_code
+            mock_get.return_value.json.return_value = mock_response_data
+
+            first = script.get_weather("Iceland")
+            second = script.get_weather("  iceland ")
+
+            assert first == second
+            mock_get.assert_called_once()
+
+        def test_errors_are_not_cached(self, cached_script, mocker):
+            """Test that failed lookups go upstream again next time."""
+            script, _ = cached_script
+            mock_get = mocker.patch("scripts.http_transport.get")
+            mock_get.return_value.status_code = 404
+
+            script.get_weather("Nowhere")
+            script.get_weather("Nowhere")
+
+            assert mock_get.call_count == 2
+
+        def test_stale_entry_served_while_refreshing(self, cached_script, mocker, mock_get_weather_success):
+            """Test that a stale entry is returned immediately and refreshed in the background."""
+            script, clock = cached_script
+            script.cache.set("iceland", {"weather": "Old"})
+            clock.return_value += 120
+            mock_response_data, mock_status_code = mock_get_weather_success
+            mock_get = mocker.patch("scripts.http_transport.get")
+            mock_get.return_value.status_code = mock_status_code
+            mock_get.return_value.json.return_value = mock_response_data
+
+            result = script.get_weather("Iceland")
+            for thread in list(script._refreshes.values()):
+                thread.join(timeout=5)
+
+            assert result == {"weather": "Old"}
+            assert script.cache.get("iceland").value["weather"] == "Clouds"
+
+        def test_stale_entry_served_when_upstream_fails(self, cached_script, mocker):
+            """Test that an expired entry is served instead of an upstream error."""
+            script, clock = cached_script
+            script.cache.set("iceland", {"weather": "Old"})
+            clock.return_value += 1000
+            mocker.patch("scripts.http_transport.get", side_effect=Exception("Upstream down"))
+
+            result = script.get_weather("Iceland")
+
+            assert result == {"weather": "Old"}
+
+        def test_revalidate_fetches_instead_of_serving_stale(self, cached_script, mocker, mock_get_weather_success):
+            """Test that revalidate=True returns the upstream's observation, not the stale entry."""
+            script, clock = cached_script
+            script.cache.set("iceland", {"weather": "Old", "observed_at": 1763570000})
+            clock.return_value += 120
+            mock_response_data, mock_status_code = mock_get_weather_success
+            mock_get = mocker.patch("scripts.http_transport.get")
+            mock_get.return_value.status_code = mock_status_code
+            mock_get.return_value.json.return_value = mock_response_data
+
+            result = script.get_weather("Iceland", revalidate=True)
+
+            assert result["observed_at"] == 1763577120
+            assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"1763570000"'}
+            assert script._refreshes == {}
+            assert script.get_stats()["revalidations"] == 1
+
+        def test_expired_entry_revalidated_with_304(self, cached_script, mocker):
+            """Test that a 304 from the proxy keeps the cached observation and renews it."""
+            script, clock = cached_script
+            cached = {"weather": "Clouds", "observed_at": 1763577120}
+            script.cache.set("iceland", cached)
+            clock.return_value += 1000
+            mock_get = mocker.patch("scripts.http_transport.get")
+            mock_get.return_value.status_code = 304
+
+            result = script.get_weather("Iceland")
+
+            assert result is cached
+            assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"1763577120"'}
+            assert script.cache.is_fresh(script.cache.get("iceland"))
+            assert script.get_stats()["revalidated"] == 1
+
+        def test_first_request_is_unconditional(self, cached_script, mocker, mock_get_weather_success):
+            """Test that no validator is sent when nothing is cached."""
+            script, _ = cached_script
+            mock_response_data, mock_status_code = mock_get_weather_success
+            mock_get = mocker.patch("scripts.http_transport.get")
+            mock_get.return_value.status_code = mock_status_code
+            mock_get.return_value.json.return_value = mock_response_data
+
+            script.get_weather("Iceland")
+
+            assert mock_get.call_args.kwargs["headers"] == {}
+
+        def test_get_stats_reports_hit_rate(self, cached_script, mocker, mock_get_weather_success):
+            """Test that equivalent spellings count as cache hits in get_stats."""
+            script, _ = cached_script
+            mock_response_data, mock_status_code = mock_get_weather_success
+            mock_get = mocker.patch("scripts.http_transport.get")
+            mock_get.return_value.status_code = mock_status_code
+            mock_get.return_value.json.return_value = mock_response_data
+
+            for location in ("Iceland", "iceland", " ICELAND ", "Iceland"):
+                script.get_weather(location)
+            stats = script.get_stats()
+
+            assert stats["misses"] == 1
+            assert stats["fresh_hits"] == 3
+            assert stats["hit_rate"] == 0.75
+            assert stats["canonical_lookups"] == 4
+
+    class TestGetWeatherMany:
+        """Tests for the get_weather_many batch method."""
+
+        def test_yields_result_per_location(self, weather_script, mocker):
+            """Test that every location is yielded with its own result."""
+            def fake_get_weather(location, revalidate=False):
+                if location == "Nowhere":
+                    return {"error": "Location not found"}
+                return {"weather": f"Clear in {location}"}
+            mocker.patch.object(weather_script, "get_weather", side_effect=fake_get_weather)
+
+            results = dict(weather_script.get_weather_many(["Oslo", "Nowhere", "Paris"], max_workers=2))
+
+            assert results == {
+                "Oslo": {"weather": "Clear in Oslo"},
+                "Nowhere": {"error": "Location not found"},
+                "Paris": {"weather": "Clear in Paris"},
+            }
+
+        def test_unexpected_exception_becomes_error_result(self, weather_script, mocker):
+            """Test that an exception for one location does not abort the batch."""
+            def fake_get_weather(location, revalidate=False):
+                if location == "Broken":
+                    raise RuntimeError("boom")
+                return {"weather": "Clear"}
+            mocker.patch.object(weather_script, "get_weather", side_effect=fake_get_weather)
+
+            results = dict(weather_script.get_weather_many(["Broken", "Oslo"]))
+
+            assert results["Broken"] == {"error": "Exception occurred while fetching data"}
+            assert results["Oslo"] == {"weather": "Clear"}
+
+        def test_empty_batch(self, weather_script):
+            """Test that an empty batch yields nothing."""
+            assert list(weather_script.get_weather_many([])) == []
+
+    class TestGetIconPathNonBlocking:
+        """Tests for get_icon_path with wait=False and icon prefetching."""
+
+        @pytest.fixture()
+        def script_with_index(self, weather_script, mocker):
+            weather_script.icon_index = IconIndex(os.path.join("mocked_path", "assets", "weather"))
+            mock_fetch = mocker.patch.object(weather_script.icon_index, "fetch_in_background")
+            return weather_script, mock_fetch
+
+        def test_missing_icon_is_queued_not_downloaded(self, script_with_index, mocker):
+            """Test that a missing icon is queued for background download and None is returned."""
+            script, mock_fetch = script_with_index
+            mock_get = mocker.patch("scripts.http_transport.get")
+
+            result = script.get_icon_path("09d", wait=False)
+
+            assert result is None
+            mock_get.assert_not_called()
+            mock_fetch.assert_called_once()
+            assert mock_fetch.call_args.args[0] == "09d"
+
+        def test_indexed_icon_returned_without_queueing(self, script_with_index):
+            """Test that an indexed icon is returned directly."""
+            script, mock_fetch = script_with_index
+            script.icon_index.add("09d", "weather_icon_09d.png")
+
+            assert script.get_icon_path("09d", wait=False) == "weather_icon_09d.png"
+            mock_fetch.assert_not_called()
+
+        def test_get_weather_does_not_wait_for_icon(self, weather_script, mocker, mock_get_weather_success):
+            """Test that get_weather asks for the icon without blocking."""
+            mock_response_data, mock_status_code = mock_get_weather_success
+            mock_get = mocker.patch("scripts.http_transport.get")
+            mock_get.return_value.status_code = mock_status_code
+            mock_get.return_value.json.return_value = mock_response_data
+            mock_icon = mocker.patch.object(weather_script, "get_icon_path", return_value=None)
+
+            weather_script.get_weather("Iceland")
+
+            mock_icon.assert_called_once_with("04n", wait=False)
+
+        def test_icon_downloaded_in_background_is_served_from_cache(
+            self, weather_script, icon_path_mocks, mocker, mock_get_weather_success
+        ):
+            """Test that a cached result picks up its icon once the background download stores it."""
+            mock_response_data, mock_status_code = mock_get_weather_success
+            weather_response = mocker.Mock(status_code=mock_status_code)
+            weather_response.json.return_value = mock_response_data
+            icon_response = mocker.Mock(status_code=200, content=b"icon_data")
+            icon_path_mocks["get"].side_effect = [weather_response, icon_response]
+            mock_fetch = mocker.spy(weather_script.icon_index, "fetch_in_background")
+
+            first = weather_script.get_weather("Iceland")
+            mock_fetch.spy_return.result(timeout=5)
+            second = weather_script.get_weather("Iceland")
+
+            expected_icon_path = os.path.join(icon_path_mocks["weather_dir"], "weather_icon_04n.png")
+            assert first["icon_path"] is None
+            assert second["icon_path"] == expected_icon_path
+            assert weather_script.cache_stats["fresh_hits"] == 1
+            assert icon_path_mocks["get"].call_count == 2
+
+        def test_prefetch_icons_queues_missing_codes(self, script_with_index):
+            """Test that prefetch queues only the codes missing from the index."""
+            script, mock_fetch = script_with_index
+            script.icon_index.add("01d", "weather_icon_01d.png")
+
+            futures = script.prefetch_icons(codes=["01d", "09d", "11n"])
+
+            assert set(futures) == {"09d", "11n"}
+            assert [call.args[0] for call in mock_fetch.call_args_list] == ["09d", "11n"]
+
     class TestGetIconPath:
         """Tests for WeatherScript get_icon_path method."""
 
         def test_get_icon_path_already_exists(self, weather_script, icon_path_mocks):
-            """Test get_icon_path when icon already exists."""
+            """Test get_icon_path when icon is already indexed."""
             icon_code = "04n"
             mocks = icon_path_mocks
             expected_icon_path = os.path.join(mocks["weather_dir"], f"weather_icon_{icon_code}.png")
-
-            mocks["exists"].return_value = True
-            mocks["get"].return_value = None
+            weather_script.icon_index.add(icon_code, expected_icon_path)
 
             result = weather_script.get_icon_path(icon_code)
 
             assert result == expected_icon_path
             mocks["get"].assert_not_called()
+            mocks["exists"].assert_not_called()
             mocks["makedirs"].assert_not_called()
             mocks["open"].assert_not_called()
 
@@ -170,10 +429,30 @@ class TestWeatherScript:
             
             assert result == expected_icon_path
             mocks["get"].assert_called_once_with(f"https://openweathermap.org/img/wn/{icon_code}@2x.png")
-            mocks["open"].assert_called_once_with(expected_icon_path, "wb")
+            partial_path = mocks["open"].call_args.args[0]
+            assert partial_path.startswith(expected_icon_path)
+            mocks["open"].assert_called_once_with(partial_path, "wb")
             mocks["open"]().write.assert_called_once_with(b"fake_icon_data")
+            mocks["replace"].assert_called_once_with(partial_path, expected_icon_path)
             mocks["makedirs"].assert_not_called()
 
+        def test_get_icon_path_download_updates_index(self, weather_script, icon_path_mocks, mocker):
+            """Test that a downloaded icon is served from the index on the next lookup."""
+            icon_code = "11d"
+            mocks = icon_path_mocks
+            mocks["exists"].return_value = True
+            mock_response = mocker.Mock()
+            mock_response.status_code = 200
+            mock_response.content = b"fake_icon_data"
+            mocks["get"].return_value = mock_response
+
+            first = weather_script.get_icon_path(icon_code)
+            second = weather_script.get_icon_path(icon_code)
+
+            assert first == second
+            assert icon_code in weather_script.icon_index
+            mocks["get"].assert_called_once()
+
         @pytest.mark.parametrize("status_code", [404, 500])
         def test_get_icon_path_download_failure(self, weather_script, icon_path_mocks, mocker, status_code):
             """Test get_icon_path when icon download fails."""
@@ -218,8 +497,9 @@ class TestWeatherScript:
             """Test get_icon_path with various icon codes."""
             mocks = icon_path_mocks
             expected_icon_path = os.path.join(mocks["weather_dir"], f"weather_icon_{icon_code}.png")
+            if is_valid:
+                weather_script.icon_index.add(icon_code, expected_icon_path)
 
-            mocks["exists"].return_value = True
             mocks["get"].return_value = None
 
             result = weather_script.get_icon_path(icon_code)
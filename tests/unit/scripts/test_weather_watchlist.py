@@ -0,0 +1,142 @@
+"""
+Tests for weather_watchlist.py
+"""
+import random
+import pytest
+from src.scripts.weather_watchlist import (
+    DEFAULT_INTERVAL,
+    INITIAL_SPREAD,
+    JITTER,
+    UPSTREAM_LAG,
+    WatchlistScheduler,
+)
+
+
+@pytest.fixture()
+def clock(mocker):
+    """Fixture for a controllable clock."""
+    return mocker.Mock(return_value=1000.0)
+
+
+@pytest.fixture()
+def scheduler(clock):
+    """Fixture for a WatchlistScheduler with a fixed random seed."""
+    return WatchlistScheduler(
+        min_interval=300, max_interval=3600, max_due_per_tick=4, clock=clock, rng=random.Random(1)
+    )
+
+
+def observation(observed_at, temperature=10.0, weather="Clouds"):
+    return {
+        "weather": weather,
+        "temperature": temperature,
+        "description": weather.lower(),
+        "observed_at": observed_at,
+    }
+
+
+def refresh(scheduler, location, result):
+    """Marks location in flight and records result, as one scheduler round trip."""
+    scheduler.get(location).in_flight = True
+    scheduler.record(location, result)
+    return scheduler.get(location)
+
+
+class TestWatchlistScheduler:
+    """Tests for WatchlistScheduler."""
+
+    def test_new_cities_are_spread_out(self, scheduler, clock):
+        for n in range(40):
+            scheduler.add(f"city {n}")
+
+        due_times = [scheduler.get(f"city {n}").next_due for n in range(40)]
+        assert all(1000.0 <= due <= 1000.0 + INITIAL_SPREAD for due in due_times)
+        assert len(set(due_times)) == 40
+
+    def test_due_is_bounded_per_tick(self, scheduler, clock):
+        for n in range(10):
+            scheduler.add(f"city {n}")
+        clock.return_value += INITIAL_SPREAD
+
+        first = scheduler.due()
+        second = scheduler.due()
+
+        assert len(first) == 4
+        assert len(second) == 4
+        assert not set(first) & set(second)
+
+    def test_in_flight_cities_are_not_due_again(self, scheduler, clock):
+        scheduler.add("Paris,FR")
+        clock.return_value += INITIAL_SPREAD
+
+        assert scheduler.due() == ["Paris,FR"]
+        assert scheduler.due() == []
+
+    def test_hidden_cities_are_paused(self, scheduler, clock):
+        scheduler.add("Paris,FR")
+        scheduler.set_visible("Paris,FR", False)
+        clock.return_value += INITIAL_SPREAD
+
+        assert scheduler.due() == []
+        assert scheduler.next_due_in() is None
+
+        scheduler.set_visible("Paris,FR", True)
+        assert scheduler.due() == ["Paris,FR"]
+
+    def test_changing_weather_refreshes_sooner(self, scheduler, clock):
+        scheduler.add("Paris,FR")
+        refresh(scheduler, "Paris,FR", observation(1000, temperature=10.0))
+        clock.return_value += 600
+        city = refresh(scheduler, "Paris,FR", observation(1600, temperature=14.0, weather="Rain"))
+
+        assert city.interval < DEFAULT_INTERVAL
+
+    def test_steady_weather_backs_off(self, scheduler, clock):
+        scheduler.add("Paris,FR")
+        refresh(scheduler, "Paris,FR", observation(1000))
+        clock.return_value += 600
+        city = refresh(scheduler, "Paris,FR", observation(1600))
+
+        assert city.interval > DEFAULT_INTERVAL
+
+    def test_unchanged_observation_time_backs_off(self, scheduler, clock):
+        scheduler.add("Paris,FR")
+        refresh(scheduler, "Paris,FR", observation(1000))
+        interval = scheduler.get("Paris,FR").interval
+        clock.return_value += 600
+        city = refresh(scheduler, "Paris,FR", observation(1000, temperature=20.0))
+
+        assert city.interval > interval
+        assert city.last_result["temperature"] == 10.0
+
+    def test_not_due_before_next_observation_expected(self, scheduler, clock):
+        scheduler.add("Paris,FR")
+        refresh(scheduler, "Paris,FR", observation(1000))
+        clock.return_value = 2800.0
+        city = refresh(scheduler, "Paris,FR", observation(2800, temperature=15.0, weather="Rain"))
+
+        assert city.update_period == 1800
+        assert city.next_due >= 2800 + 1800 + UPSTREAM_LAG
+
+    def test_errors_back_off(self, scheduler):
+        scheduler.add("Nowhere")
+        city = refresh(scheduler, "Nowhere", {"error": "Location not found"})
+
+        assert city.interval == DEFAULT_INTERVAL * 1.5
+        assert not city.in_flight
+
+    def test_interval_is_clamped(self, scheduler):
+        scheduler.add("Nowhere")
+        for _ in range(20):
+            city = refresh(scheduler, "Nowhere", {"error": 500})
+
+        assert city.interval == 3600
+        assert city.next_due <= 1000 + 3600 * (1 + JITTER)
+
+    def test_removed_city_results_are_ignored(self, scheduler):
+        scheduler.add("Paris,FR")
+        scheduler.remove("Paris,FR")
+        scheduler.record("Paris,FR", observation(1000))
+
+        assert "Paris,FR" not in scheduler
+        assert len(scheduler) == 0
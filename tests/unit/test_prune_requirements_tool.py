@@ -0,0 +1,162 @@
+"""
+Tests for prune_requirements_tool.py
+"""
+import ast
+import io
+import os
+import textwrap
+import pytest
+import prune_requirements_tool as tool
+
+
+@pytest.fixture(autouse=True)
+def real_files(mocker):
+    """The tool reads real source and requirements files, so undo the unit-wide open() mock."""
+    mocker.patch("builtins.open", io.open)
+
+
+def collect(source, package=""):
+    collector = tool.ImportCollector(package)
+    collector.visit(ast.parse(textwrap.dedent(source)))
+    return collector.imports
+
+
+def write_tree(root, files):
+    for path, source in files.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(textwrap.dedent(source))
+
+
+@pytest.fixture()
+def source_tree(tmp_path):
+    """A small target: a handler, a local module and a package with relative imports."""
+    write_tree(tmp_path, {
+        "handler.py": """
+            import json
+            import helpers
+            from pkg import sub
+            try:
+                import brotli
+            except ImportError:
+                brotli = None
+            import urllib3
+        """,
+        "helpers.py": "import yaml\n",
+        "pkg/__init__.py": "",
+        "pkg/sub.py": "from .inner import thing\n",
+        "pkg/inner.py": "from PIL import Image\nthing = None\n",
+        "unused.py": "import numpy\n",
+    })
+    return tmp_path
+
+
+class TestImportCollector:
+    """Tests for collecting imports from one module."""
+
+    def test_plain_imports(self):
+        assert collect("import os, urllib3.util\n") == [("os", False), ("urllib3.util", False)]
+
+    def test_from_import_may_be_submodule(self):
+        assert collect("from pkg import sub\n") == [("pkg", False), ("pkg.sub", None)]
+
+    @pytest.mark.parametrize("source, package, expected", [
+        ("from . import sub\n", "pkg", [("pkg", False), ("pkg.sub", None)]),
+        ("from .inner import thing\n", "pkg", [("pkg.inner", False), ("pkg.inner.thing", None)]),
+        ("from ..other import name\n", "pkg.sub", [("pkg.other", False), ("pkg.other.name", None)]),
+    ])
+    def test_relative_imports(self, source, package, expected):
+        assert collect(source, package) == expected
+
+    @pytest.mark.parametrize("handler", [
+        "except ImportError:",
+        "except ModuleNotFoundError:",
+        "except (ValueError, ImportError):",
+    ])
+    def test_guarded_imports_are_optional(self, handler):
+        source = f"try:\n    import brotli\n{handler}\n    brotli = None\n"
+
+        assert collect(source) == [("brotli", True)]
+
+    @pytest.mark.parametrize("handler", ["except Exception:", "except:", "except ValueError:"])
+    def test_broad_handlers_do_not_guard(self, handler):
+        source = f"try:\n    import brotli\n{handler}\n    brotli = None\n"
+
+        assert collect(source) == [("brotli", False)]
+
+    def test_fallback_imports_are_required(self):
+        source = """
+            try:
+                import tomllib
+            except ImportError:
+                import tomli as tomllib
+        """
+
+        assert collect(source) == [("tomllib", True), ("tomli", False)]
+
+
+class TestImportClosure:
+    """Tests for following imports through a target's local modules."""
+
+    def test_follows_local_modules(self, source_tree):
+        local_files, third_party = tool.import_closure([str(source_tree / "handler.py")], [str(source_tree)])
+
+        assert {os.path.relpath(path, source_tree) for path in local_files} == {
+            "handler.py", "helpers.py",
+            os.path.join("pkg", "__init__.py"), os.path.join("pkg", "sub.py"), os.path.join("pkg", "inner.py"),
+        }
+        assert sorted(third_party) == ["PIL", "brotli", "urllib3", "yaml"]
+
+    def test_optional_only_when_every_import_is_guarded(self, source_tree):
+        (source_tree / "helpers.py").write_text("import yaml\nimport brotli\n")
+
+        _, third_party = tool.import_closure([str(source_tree / "handler.py")], [str(source_tree)])
+
+        assert third_party["brotli"]["optional"] is False
+        assert len(third_party["brotli"]["importers"]) == 2
+
+
+class TestReadRequirements:
+    """Tests for reading requirements.txt."""
+
+    LINES = "requests==2.32.3\n# A comment\nPyYAML>=6  # config\n\nTyping_Extensions\n"
+
+    @pytest.mark.parametrize("encoding", ["utf-16", "utf-16-be", "utf-8"])
+    def test_encodings(self, tmp_path, encoding):
+        data = self.LINES.encode(encoding)
+        if encoding == "utf-16-be":
+            data = b"\xfe\xff" + data
+        path = tmp_path / "requirements.txt"
+        path.write_bytes(data)
+
+        assert tool.read_requirements(str(path)) == {
+            "requests": "requests==2.32.3",
+            "pyyaml": "PyYAML>=6",
+            "typing-extensions": "Typing_Extensions",
+        }
+
+
+class TestAnalyzeTarget:
+    """Tests for classifying a target's distributions."""
+
+    def test_classification(self, source_tree):
+        installed = {"PIL": ["Pillow"], "yaml": ["PyYAML"], "brotli": ["Brotli"], "urllib3": ["urllib3"]}
+        declared = {"pillow": "Pillow==11.0.0"}
+
+        report = tool.analyze_target(
+            [str(source_tree / "handler.py")], [str(source_tree)], {"urllib3"}, declared,
+            installed=installed, extras={"pyyaml": "config"},
+        )
+
+        assert report["requirements"] == {"pillow": "Pillow==11.0.0"}
+        assert sorted(report["optional"]) == ["brotli", "pyyaml"]
+        assert sorted(report["runtime_provided"]) == ["urllib3"]
+        assert report["undeclared"] == []
+        assert report["local_modules"] == 5
+
+    def test_undeclared_requirements(self, source_tree):
+        report = tool.analyze_target(
+            [str(source_tree / "handler.py")], [str(source_tree)], set(), {}, installed={},
+        )
+
+        assert report["undeclared"] == ["pillow", "pyyaml", "urllib3"]
+        assert report["requirements"] == {"pillow": "pillow", "pyyaml": "pyyaml", "urllib3": "urllib3"}